@@ -0,0 +1,251 @@
+"""Password hashing, signed access tokens and their revocation list.
+
+Tokens are HS256 JWTs carrying the user id, so checking one costs an HMAC
+and a dictionary lookup: no database round-trip and no password KDF per
+request. The KDF only runs at login.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.database.listener import REVOKED_TOKENS_CHANNEL, NotificationListener, listener
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Off by default: the API stays open until clients send tokens
+AUTH_ENABLED = os.getenv("AUTH_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# "kid:secret,kid:secret,...". The first key signs new tokens; the others are
+# still accepted, so a key can be rotated out once its tokens have expired
+AUTH_SIGNING_KEYS = os.getenv("AUTH_SIGNING_KEYS", "")
+
+# Lifetime of an access token, in seconds
+AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", "3600"))
+
+# PBKDF2-SHA256 work factor for new password hashes; older hashes are upgraded at login
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+
+PASSWORD_HASH_SCHEME = "pbkdf2_sha256"
+
+class InvalidTokenError(Exception):
+    pass
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def hash_password(password: str, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{PASSWORD_HASH_SCHEME}${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    if hashed_password.startswith(PASSWORD_HASH_SCHEME + "$"):
+        try:
+            _, iterations, salt, digest = hashed_password.split("$")
+            expected = _b64decode(digest)
+            actual = hashlib.pbkdf2_hmac("sha256", password.encode(), _b64decode(salt), int(iterations))
+        except (ValueError, binascii.Error):
+            return False
+        return hmac.compare_digest(actual, expected)
+    # Unsalted SHA-256 hex digests, stored before passwords were hashed with PBKDF2
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    if not hashed_password.startswith(PASSWORD_HASH_SCHEME + "$"):
+        return True
+    try:
+        return int(hashed_password.split("$")[1]) < PASSWORD_HASH_ITERATIONS
+    except (IndexError, ValueError):
+        return True
+
+@lru_cache(maxsize=1)
+def dummy_password_hash() -> str:
+    """Verified against when the email is unknown, so a failed login takes as long either way."""
+    return hash_password(secrets.token_urlsafe(16))
+
+class TokenCodec:
+    """Issues and verifies HS256 JWTs signed with one of a set of keys, picked by the kid header."""
+
+    def __init__(self, keys: List[Tuple[str, bytes]], ttl_seconds: int = AUTH_TOKEN_TTL):
+        if not keys:
+            raise ValueError("At least one signing key is required")
+        self.keys = dict(keys)
+        self.signing_kid = keys[0][0]
+        self.ttl_seconds = ttl_seconds
+        # True when no keys were configured and a random one was generated
+        self.ephemeral = False
+        # Encoded header -> kid. Only headers this codec writes are accepted,
+        # which also keeps the cache as small as the key set
+        self._headers = {
+            _b64encode(json.dumps({"alg": "HS256", "typ": "JWT", "kid": kid}, separators=(",", ":")).encode()): kid
+            for kid in self.keys
+        }
+        self._signing_header = next(header for header, kid in self._headers.items() if kid == self.signing_kid)
+
+    @classmethod
+    def from_env(cls, spec: str = AUTH_SIGNING_KEYS, ttl_seconds: int = AUTH_TOKEN_TTL) -> "TokenCodec":
+        keys = []
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            kid, separator, secret = item.partition(":")
+            if not separator or not kid or not secret:
+                raise ValueError("AUTH_SIGNING_KEYS entries must look like kid:secret")
+            keys.append((kid, secret.encode()))
+        if not keys:
+            # Random per process (shared by preloaded gunicorn workers): tokens
+            # stop working on restart. Fine for development only
+            keys.append(("ephemeral", secrets.token_bytes(32)))
+        codec = cls(keys, ttl_seconds)
+        codec.ephemeral = not spec.strip()
+        return codec
+
+    def _sign(self, kid: str, signing_input: str) -> str:
+        return _b64encode(hmac.new(self.keys[kid], signing_input.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, user_id: int, now: Optional[float] = None) -> Tuple[str, dict]:
+        now = int(now if now is not None else time.time())
+        claims = {"sub": str(user_id), "iat": now, "exp": now + self.ttl_seconds, "jti": secrets.token_hex(16)}
+        signing_input = self._signing_header + "." + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return signing_input + "." + self._sign(self.signing_kid, signing_input), claims
+
+    def decode(self, token: str, now: Optional[float] = None) -> dict:
+        try:
+            header, payload, signature = token.split(".")
+        except ValueError:
+            raise InvalidTokenError("Malformed token")
+        kid = self._headers.get(header)
+        if kid is None:
+            raise InvalidTokenError("Unknown signing key")
+        if not hmac.compare_digest(signature, self._sign(kid, header + "." + payload)):
+            raise InvalidTokenError("Bad signature")
+        try:
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, binascii.Error):
+            raise InvalidTokenError("Malformed token")
+        # Callers read sub, jti and exp without checking them
+        if not (
+            isinstance(claims, dict)
+            and isinstance(claims.get("sub"), str) and claims["sub"].isascii() and claims["sub"].isdigit()
+            and isinstance(claims.get("jti"), str)
+            and isinstance(claims.get("exp"), (int, float))
+        ):
+            raise InvalidTokenError("Missing or invalid claims")
+        if claims["exp"] <= (now if now is not None else time.time()):
+            raise InvalidTokenError("Token expired")
+        return claims
+
+class RevocationList:
+    """jti -> exp of the revoked, unexpired tokens, mirrored from revoked_token in every worker.
+
+    Revocations arrive through NOTIFY; the full list is reloaded whenever the
+    listener (re)connects, since notifications sent while it was down are lost.
+    Checking a token is one dictionary lookup. Expired entries are dropped in
+    batches, once the list has doubled since the last prune, so adding stays
+    O(1) amortized.
+    """
+
+    def __init__(self, listener: Optional[NotificationListener] = None, prune_threshold: int = 1024):
+        self._revoked: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._prune_threshold = prune_threshold
+        self._prune_at = prune_threshold
+        if listener is not None:
+            listener.subscribe(REVOKED_TOKENS_CHANNEL, self._on_notification)
+            listener.on_connect(self.load)
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def add(self, jti: str, exp: int) -> None:
+        with self._lock:
+            # A single item assignment: safe next to is_revoked, which takes no lock
+            self._revoked[jti] = exp
+            if len(self._revoked) >= self._prune_at:
+                self._prune()
+
+    def replace(self, entries: Iterable[Tuple[str, int]]) -> None:
+        with self._lock:
+            self._revoked = dict(entries)
+            self._prune()
+
+    def _prune(self) -> None:
+        # Called with the lock held. Copy-on-write, so is_revoked never sees a dict being rebuilt
+        now = time.time()
+        self._revoked = {key: value for key, value in self._revoked.items() if value > now}
+        self._prune_at = max(self._prune_threshold, 2 * len(self._revoked))
+
+    def load(self) -> None:
+        from app.database.session import SessionLocal
+        from app.repositories.token_repository import TokenRepository
+
+        db = SessionLocal()
+        try:
+            entries = TokenRepository(db).get_revoked()
+        finally:
+            db.close()
+        self.replace(entries)
+        logger.debug("Revoked tokens loaded", revoked=len(entries))
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def _on_notification(self, payload: str) -> None:
+        entry = json.loads(payload)
+        self.add(entry["jti"], int(entry["exp"]))
+
+token_codec = TokenCodec.from_env()
+revocation_list = RevocationList(listener)
+
+def check_auth_config() -> None:
+    """Refuse to start with authentication on but no configured signing keys."""
+    if AUTH_ENABLED and token_codec.ephemeral:
+        raise RuntimeError("AUTH_ENABLED requires AUTH_SIGNING_KEYS")
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def require_token(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> dict:
+    """Claims of the request's bearer token; 401 when missing, invalid, expired or revoked.
+
+    async only so FastAPI runs it on the event loop: it does no I/O, and a
+    threadpool hop would cost far more than the check itself.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        claims = token_codec.decode(credentials.credentials)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    if revocation_list.is_revoked(claims["jti"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    request.state.user_id = int(claims["sub"])
+    return claims
+
+async def authenticate(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[dict]:
+    """Router dependency: require_token when AUTH_ENABLED, a no-op otherwise."""
+    if not AUTH_ENABLED:
+        return None
+    return await require_token(request, credentials)
@@ -0,0 +1,359 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Prefix of every cache key; bump it to orphan all entries at once (e.g. after a data fix)
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "library:v1")
+
+# Every EntityCache, by namespace, for the /metrics endpoint
+caches: Dict[str, "EntityCache"] = {}
+
+class SharedBackend(ABC):
+    """Byte store shared between workers. Errors are handled by the caller."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+class LocalBackend(SharedBackend):
+    """In-process stand-in for a shared backend, for development and single-process runs."""
+
+    def __init__(self):
+        self._values: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._values[key]
+                return None
+            return item[1]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+class RedisBackend(SharedBackend):
+    def __init__(self, url: str):
+        # Optional dependency, only needed when CACHE_URL points at redis
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._client.set(key, value, px=int(ttl_seconds * 1000))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+def backend_from_url(url: Optional[str]) -> Optional[SharedBackend]:
+    """CACHE_URL: unset for per-worker caching only, local:// for the stand-in, redis://... for Redis."""
+    if not url:
+        return None
+    if url.startswith("local://"):
+        return LocalBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported CACHE_URL scheme: {url}")
+
+class _Flight:
+    __slots__ = ("done", "value", "failed", "discard")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+        # Set when the key is invalidated mid-load: the result is returned but not stored
+        self.discard = False
+
+class EntityCache:
+    """Cache-aside store for single-entity reads, keyed by primary key.
+
+    Values are JSON-serializable dicts built by the repository. Lookups go to
+    the worker's LRU first (bounded by max_entries and local_ttl), then to the
+    shared backend when one is configured, and only then to the loader.
+    Concurrent misses on the same key share one loader call (single-flight).
+
+    Keys carry the entity's snapshot `version`, so a deploy that changes the
+    snapshot shape never reads entries written by the previous one. Writers
+    call put() or invalidate(); other workers' LRUs are not notified, which is
+    why local_ttl stays short.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: int,
+        local_ttl: float = 30.0,
+        max_entries: int = 10000,
+        shared_ttl: float = 300.0,
+        backend: Optional[SharedBackend] = None,
+        wait_timeout: float = 5.0,
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.local_ttl = local_ttl
+        self.max_entries = max_entries
+        self.shared_ttl = shared_ttl
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "shared_errors": 0,
+        }
+        caches[namespace] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.local_ttl > 0 and self.max_entries > 0
+
+    def key(self, entity_id) -> str:
+        return f"{CACHE_KEY_PREFIX}:{self.namespace}:v{self.version}:{entity_id}"
+
+    def get_or_load(self, entity_id, loader: Callable[[], Optional[dict]]) -> Optional[dict]:
+        """Cached value for entity_id, calling loader() on a miss. None results are not cached."""
+        if not self.enabled:
+            return loader()
+
+        key = self.key(entity_id)
+        with self._lock:
+            value = self._get_local(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not owner:
+            if flight.done.wait(self.wait_timeout) and not flight.failed:
+                return flight.value
+            # The first caller failed or is stuck: load with our own session
+            return loader()
+
+        value = None
+        try:
+            value = self._get_shared(key)
+            if value is not None:
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+            else:
+                with self._lock:
+                    self._stats["misses"] += 1
+                value = loader()
+                if value is not None and not flight.discard:
+                    self._set_shared(key, value)
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if not flight.failed and value is not None and not flight.discard:
+                    self._set_local(key, value)
+            flight.value = None if flight.failed else value
+            flight.done.set()
+        return value
+
+    def put(self, entity_id, value: dict) -> None:
+        """Write-through after a create or update."""
+        if not self.enabled:
+            return
+        key = self.key(entity_id)
+        with self._lock:
+            self._discard_flight(key)
+            self._set_local(key, value)
+        self._set_shared(key, value)
+
+    def invalidate(self, entity_id) -> None:
+        if not self.enabled:
+            return
+        key = self.key(entity_id)
+        with self._lock:
+            self._discard_flight(key)
+            self._entries.pop(key, None)
+            self._stats["invalidations"] += 1
+        if self.backend is not None:
+            try:
+                self.backend.delete(key)
+            except Exception as e:
+                self._shared_error("delete", key, e)
+
+    def clear(self) -> None:
+        """Drop this worker's entries (the shared backend keeps its own until they expire)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["shared_hits"]) / lookups, 4) if lookups else None
+        return stats
+
+    def _discard_flight(self, key: str) -> None:
+        flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.discard = True
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    def _set_local(self, key: str, value: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.local_ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _get_shared(self, key: str) -> Optional[dict]:
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            self._shared_error("get", key, e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def _set_shared(self, key: str, value: dict) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, json.dumps(value, separators=(",", ":")).encode(), self.shared_ttl)
+        except Exception as e:
+            self._shared_error("set", key, e)
+
+    def _shared_error(self, operation: str, key: str, error: Exception) -> None:
+        # The shared backend is an optimization: fall back to the database
+        with self._lock:
+            self._stats["shared_errors"] += 1
+        logger.warning("Shared cache unavailable", operation=operation, cache_key=key, error=str(error))
+
+class CountCache:
+    """List totals per worker, recounted at most once every ttl seconds.
+
+    Keys are tuples whose first item is a group ("books", "loans", ...).
+    Writers invalidate whole groups after committing, so a worker sees its
+    own writes at once; other workers' totals lag by at most ttl. Concurrent
+    misses on the same key share one count, and a count that started before
+    an invalidation of its group is returned but not stored.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: Dict[tuple, tuple] = {}
+        self._generations: Dict[str, int] = {}
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    def get_or_count(self, key: tuple, counter: Callable[[], int]) -> int:
+        if self.ttl <= 0:
+            return counter()
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                value = self._get(key)
+                if value is not None:
+                    # Counted by the caller we queued behind
+                    self._stats["coalesced"] += 1
+                    return value
+                self._stats["misses"] += 1
+                generation = self._generations.get(key[0], 0)
+            value = counter()
+            with self._lock:
+                if self._generations.get(key[0], 0) == generation:
+                    self._values[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, *groups: str) -> None:
+        with self._lock:
+            for group in groups:
+                self._generations[group] = self._generations.get(group, 0) + 1
+            for key in [key for key in self._values if key[0] in groups]:
+                del self._values[key]
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._values))
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else None
+        return stats
+
+    def _get(self, key: tuple) -> Optional[int]:
+        item = self._values.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[1]
+
+shared_backend = backend_from_url(os.getenv("CACHE_URL"))
+
+# Totals behind the paginated lists; COUNT_CACHE_TTL=0 counts on every request
+count_cache = CountCache(float(os.getenv("COUNT_CACHE_TTL", "5")))
+
+def entity_cache(namespace: str, version: int) -> EntityCache:
+    """EntityCache configured from the environment (ENTITY_CACHE_TTL=0 disables caching)."""
+    return EntityCache(
+        namespace,
+        version,
+        local_ttl=float(os.getenv("ENTITY_CACHE_TTL", "30")),
+        max_entries=int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000")),
+        shared_ttl=float(os.getenv("CACHE_SHARED_TTL", "300")),
+        backend=shared_backend,
+    )
@@ -0,0 +1,291 @@
+"""Command line entry points.
+
+Usage: python -m app.cli <command> [options]
+"""
+import argparse
+import sys
+from app.logging_config import configure_logging, get_logger
+from app.models import author, book, book_copy, book_related, hold, idempotency_key, loan, loan_archive, outbox_event, report, revoked_token, user, user_loan_summary  # noqa: F401 - register every mapper before querying
+
+logger = get_logger(__name__)
+
+def export_command(args) -> int:
+    from app.services.export_service import ExportService
+
+    service = ExportService(batch_size=args.batch_size)
+    if args.entity == "loans":
+        chunks = service.export_loans(args.format, status=args.status, user_id=args.user_id, include_archived=args.include_archived)
+    elif args.entity == "books":
+        chunks = service.export_books(args.format, available=args.available)
+    else:
+        chunks = service.export_users(args.format)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+def reconcile_availability_command(args) -> int:
+    from app.database.session import SessionLocal
+    from app.repositories.book_repository import BookRepository
+
+    db = SessionLocal()
+    try:
+        repaired = BookRepository(db).reconcile_availability()
+    finally:
+        db.close()
+    logger.info("Book availability reconciled", repaired_rows=repaired)
+    return 0
+
+def reconcile_loan_summaries_command(args) -> int:
+    from app.database.session import SessionLocal
+    from app.repositories.user_repository import UserRepository
+
+    db = SessionLocal()
+    try:
+        repaired = UserRepository(db).reconcile_loan_summaries()
+    finally:
+        db.close()
+    logger.info("User loan summaries reconciled", repaired_users=repaired)
+    return 0
+
+def archive_loans_command(args) -> int:
+    from app.database.session import SessionLocal
+    from app.repositories.loan_repository import LoanRepository
+    from app.services.loan_service import LoanService
+
+    db = SessionLocal()
+    try:
+        LoanService(LoanRepository(db)).archive_returned_loans(args.months, args.batch_size)
+    finally:
+        db.close()
+    return 0
+
+def refresh_reports_command(args) -> int:
+    import time
+    from app.database.session import SessionLocal
+    from app.repositories.report_repository import ReportRepository
+    from app.services.report_service import ReportService
+
+    full = args.full
+    while True:
+        db = SessionLocal()
+        try:
+            ReportService(ReportRepository(db)).refresh(full=full, lookback_days=args.lookback_days)
+        finally:
+            db.close()
+        if not args.every:
+            return 0
+        full = False
+        time.sleep(args.every)
+
+def refresh_related_command(args) -> int:
+    import time
+    from app.database.session import SessionLocal
+    from app.repositories.recommendation_repository import RecommendationRepository
+    from app.services.recommendation_service import RecommendationService
+
+    full = args.full
+    while True:
+        db = SessionLocal()
+        try:
+            RecommendationService(RecommendationRepository(db)).refresh(
+                full=full,
+                lookback_days=args.lookback_days,
+                min_shared=args.min_shared
+            )
+        finally:
+            db.close()
+        if not args.every:
+            return 0
+        full = False
+        time.sleep(args.every)
+
+def expire_holds_command(args) -> int:
+    import time
+    from app.database.session import SessionLocal
+    from app.repositories.hold_repository import HoldRepository
+    from app.services.hold_service import HoldService
+
+    while True:
+        db = SessionLocal()
+        try:
+            HoldService(HoldRepository(db)).expire_holds(args.batch_size)
+        finally:
+            db.close()
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+def relay_outbox_command(args) -> int:
+    import time
+    from datetime import timedelta
+    from app.database.session import SessionLocal
+    from app.outbox import OUTBOX_BATCH_SIZE, OUTBOX_SINK, OutboxRelay, create_sink
+
+    relay = OutboxRelay(SessionLocal, create_sink(args.sink or OUTBOX_SINK), batch_size=args.batch_size or OUTBOX_BATCH_SIZE)
+    keep = timedelta(hours=args.keep_hours)
+    try:
+        while True:
+            try:
+                published = relay.drain()
+            except Exception as e:
+                # Nothing was marked published; the batch is retried on the next pass
+                logger.error("Outbox relay failed", error=str(e), **relay.stats())
+                if not args.every:
+                    return 1
+            else:
+                purged = relay.purge(keep) if args.keep_hours else 0
+                if published or purged or not args.every:
+                    logger.info("Outbox relayed", relayed=published, purged=purged, **relay.stats())
+            if not args.every:
+                return 0
+            time.sleep(args.every)
+    finally:
+        relay.sink.close()
+
+def purge_deleted_command(args) -> int:
+    import time
+    from app.database.session import SessionLocal
+    from app.repositories.book_repository import BookRepository
+    from app.repositories.user_repository import UserRepository
+    from app.services.book_service import BookService
+    from app.services.user_service import UserService
+
+    while True:
+        db = SessionLocal()
+        try:
+            # Users first: purging them removes their loans, which can free deleted books too
+            UserService(UserRepository(db)).purge_deleted_users(args.older_than_days, args.batch_size)
+            BookService(BookRepository(db)).purge_deleted_books(args.older_than_days, args.batch_size)
+        finally:
+            db.close()
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+def purge_idempotency_keys_command(args) -> int:
+    import time
+    from app.database.session import SessionLocal
+    from app.repositories.idempotency_repository import IdempotencyRepository
+
+    while True:
+        db = SessionLocal()
+        try:
+            purged = 0
+            while True:
+                deleted = IdempotencyRepository(db).purge_expired(args.batch_size)
+                purged += deleted
+                if deleted < args.batch_size:
+                    break
+        finally:
+            db.close()
+        if purged or not args.every:
+            logger.info("Expired idempotency keys purged", purged=purged)
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+def migrate_command(args) -> int:
+    from app.database.migrations import upgrade
+    from app.database.session import engine
+
+    upgrade(engine, args.revision)
+    return 0
+
+def seed_command(args) -> int:
+    from pathlib import Path
+    from sqlalchemy import text
+    from app.database.session import engine
+
+    seed_sql = Path(__file__).resolve().parent / "database" / "seed.sql"
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT EXISTS (SELECT 1 FROM author)")).scalar():
+            logger.info("Database already has data, skipping seed")
+            return 0
+        connection.exec_driver_sql(seed_sql.read_text(encoding="utf-8"))
+    logger.info("Sample data loaded", source=str(seed_sql))
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Digital Library API maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export = subparsers.add_parser("export", help="Stream a full table as NDJSON or CSV")
+    export.add_argument("entity", choices=["loans", "books", "users"])
+    export.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export.add_argument("--status", choices=["active", "overdue"], help="Loans only: same scopes as the list endpoints")
+    export.add_argument("--user-id", type=int, help="Loans only: restrict to one user")
+    export.add_argument("--available", action=argparse.BooleanOptionalAction, default=None, help="Books only: only available (--available) or unavailable (--no-available) books")
+    export.add_argument("--include-archived", action=argparse.BooleanOptionalAction, default=True, help="Loans only: include archived loans")
+    export.add_argument("--output", default="-", help="Output file, '-' for stdout")
+    export.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per cursor round-trip")
+    export.set_defaults(handler=export_command)
+
+    reconcile = subparsers.add_parser("reconcile-availability", help="Repair copy statuses and book availability counters from active loans and holds")
+    reconcile.set_defaults(handler=reconcile_availability_command)
+
+    summaries = subparsers.add_parser("reconcile-loan-summaries", help="Rebuild per-user loan counters from loan and loan_archive")
+    summaries.set_defaults(handler=reconcile_loan_summaries_command)
+
+    archive = subparsers.add_parser("archive-loans", help="Move loans returned more than N months ago to loan_archive")
+    archive.add_argument("--months", type=int, default=6, help="Archive loans returned longer ago than this")
+    archive.add_argument("--batch-size", type=int, default=1000, help="Loans moved per transaction")
+    archive.set_defaults(handler=archive_loans_command)
+
+    reports = subparsers.add_parser("refresh-reports", help="Bring the /reports daily rollups up to date")
+    reports.add_argument("--full", action="store_true", help="Rebuild every day instead of the recent window")
+    reports.add_argument("--lookback-days", type=int, default=2, help="Days before the last refresh rebuilt again")
+    reports.add_argument("--every", type=float, help="Keep running, refreshing every this many seconds")
+    reports.set_defaults(handler=refresh_reports_command)
+
+    related = subparsers.add_parser("refresh-related", help="Recompute the /books/{id}/related neighbours from the loan history")
+    related.add_argument("--full", action="store_true", help="Recompute every book instead of those borrowed by recently active users")
+    related.add_argument("--lookback-days", type=int, default=1, help="Days before the last refresh whose loans count as new")
+    related.add_argument("--min-shared", type=int, default=1, help="Fewest shared readers for a book to be listed")
+    related.add_argument("--every", type=float, help="Keep running, refreshing every this many seconds")
+    related.set_defaults(handler=refresh_related_command)
+
+    holds = subparsers.add_parser("expire-holds", help="Pass books on from ready holds whose pickup deadline passed")
+    holds.add_argument("--batch-size", type=int, default=100, help="Holds expired per transaction")
+    holds.add_argument("--every", type=float, help="Keep running, checking every this many seconds")
+    holds.set_defaults(handler=expire_holds_command)
+
+    outbox = subparsers.add_parser("relay-outbox", help="Publish pending outbox events to a sink, at least once")
+    outbox.add_argument("--sink", default=None, help="file:<path> (NDJSON) or queue; defaults to OUTBOX_SINK")
+    outbox.add_argument("--batch-size", type=int, default=None, help="Events published per transaction; defaults to OUTBOX_BATCH_SIZE")
+    outbox.add_argument("--keep-hours", type=float, default=24, help="Delete events published longer ago than this, 0 to keep them")
+    outbox.add_argument("--every", type=float, help="Keep running, polling every this many seconds")
+    outbox.set_defaults(handler=relay_outbox_command)
+
+    purge = subparsers.add_parser("purge-deleted", help="Hard-delete users and books soft-deleted more than N days ago")
+    purge.add_argument("--older-than-days", type=float, default=30, help="Purge rows deleted longer ago than this")
+    purge.add_argument("--batch-size", type=int, default=100, help="Rows removed per transaction")
+    purge.add_argument("--every", type=float, help="Keep running, purging every this many seconds")
+    purge.set_defaults(handler=purge_deleted_command)
+
+    idempotency = subparsers.add_parser("purge-idempotency-keys", help="Delete expired Idempotency-Key outcomes")
+    idempotency.add_argument("--batch-size", type=int, default=1000, help="Keys deleted per transaction")
+    idempotency.add_argument("--every", type=float, help="Keep running, purging every this many seconds")
+    idempotency.set_defaults(handler=purge_idempotency_keys_command)
+
+    migrate = subparsers.add_parser("migrate", help="Apply schema migrations (stamps init.sql-era databases at the baseline first)")
+    migrate.add_argument("--revision", default="head", help="Target revision")
+    migrate.set_defaults(handler=migrate_command)
+
+    seed = subparsers.add_parser("seed", help="Load the sample data into an empty database")
+    seed.set_defaults(handler=seed_command)
+
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging(stream=sys.stderr)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
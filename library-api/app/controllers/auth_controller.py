@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from app.auth import require_token
+from app.database.session import SessionLocal
+from app.services.auth_service import AuthService
+from app.repositories.token_repository import TokenRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.auth import LoginRequest, Token
+from app.logging_config import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.post("/auth/token", response_model=Token, responses={
+    200: {"description": "Bearer access token"},
+    401: {"description": "Invalid email or password"},
+    500: {"description": "Internal server error"}
+})
+def login(credentials: LoginRequest, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Issuing access token", request_id=request_id, user_email=credentials.email)
+
+    try:
+        return AuthService(UserRepository(db), TokenRepository(db)).login(credentials.email, credentials.password)
+    except HTTPException as e:
+        logger.warning(
+            "Login failed - business logic error",
+            request_id=request_id,
+            user_email=credentials.email,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error issuing access token", request_id=request_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error issuing access token", request_id=request_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.post("/auth/logout", status_code=status.HTTP_204_NO_CONTENT, response_class=Response, responses={
+    204: {"description": "The token is revoked in every worker"},
+    401: {"description": "Missing, invalid, expired or already revoked token"},
+    500: {"description": "Internal server error"}
+})
+def logout(claims: dict = Depends(require_token), db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Revoking access token", request_id=request_id, user_id=claims["sub"])
+
+    try:
+        AuthService(UserRepository(db), TokenRepository(db)).logout(claims)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except SQLAlchemyError as e:
+        logger.error("Database error revoking access token", request_id=request_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error revoking access token", request_id=request_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
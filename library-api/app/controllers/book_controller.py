@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.database.session import SessionLocal
 from app.services.book_service import BookService
+from app.services.recommendation_service import RecommendationService, TOP_K
 from app.repositories.book_repository import BookRepository
 from app.repositories.author_repository import AuthorRepository
-from app.schemas.book import Book, BookCreate, BookAvailability
-from app.schemas.pagination import PaginatedResponse
+from app.repositories.recommendation_repository import RecommendationRepository
+from app.schemas.book import Book, BookCreate, BookAvailability, RelatedBooks
+from app.schemas.pagination import PaginatedResponse, page_response
 from app.logging_config import get_logger
 import math
 
@@ -21,24 +25,38 @@ def get_db():
         db.close()
 
 @router.get("/books", response_model=PaginatedResponse[Book], responses={
-    200: {"description": "Successful response with paginated books"},
+    200: {"description": "Successful response with paginated books; with fields, items hold only those fields"},
+    400: {"description": "Unknown field requested"},
     500: {"description": "Internal server error"}
 })
-def get_books(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), db: Session = Depends(get_db), request: Request = None):
+def get_books(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    available: Optional[bool] = Query(None, description="Only books that are (or are not) available for loan"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,author.name"),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     request_id = getattr(request.state, 'request_id', None) if request else None
     
     logger.info(
         "Getting books list",
         request_id=request_id,
         page=page,
-        size=size
+        size=size,
+        available=available,
+        fields=fields
     )
     
     try:
         skip = (page - 1) * size
         service = BookService(BookRepository(db))
-        books = service.get_all_books(skip, size)
-        total = service.get_books_count()
+        if fields:
+            # Sparse fieldset: only the requested columns are selected and serialized
+            books = service.get_books_fields(service.parse_fields(fields), skip, size, available)
+        else:
+            books = service.get_all_books(skip, size, available)
+        total = service.get_books_count(available)
         pages = math.ceil(total / size)
         
         logger.info(
@@ -48,13 +66,12 @@ def get_books(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), d
             returned_count=len(books)
         )
         
-        return PaginatedResponse(
-            items=books,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        if fields:
+            # Items are partial books, so they bypass the response model
+            return JSONResponse(content={"items": books, "total": total, "page": page, "size": size, "pages": pages})
+        return page_response(Book, books, total, page, size, pages)
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         logger.error(
             "Database error getting books",
@@ -136,6 +153,59 @@ def create_book(book: BookCreate, db: Session = Depends(get_db), request: Reques
             detail="Internal server error"
         )
 
+@router.get("/books/availability", response_model=List[BookAvailability], responses={
+    200: {"description": "Availability of each requested book that exists"},
+    400: {"description": "More than 100 IDs requested"},
+    500: {"description": "Internal server error"}
+})
+def check_books_availability(ids: List[int] = Query([], description="Up to 100 book IDs, e.g. ?ids=1&ids=2"), db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+    
+    logger.info(
+        "Checking availability for multiple books",
+        request_id=request_id,
+        book_count=len(ids)
+    )
+    
+    if len(ids) > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At most 100 book IDs can be checked at once"
+        )
+    
+    try:
+        service = BookService(BookRepository(db))
+        availability = service.check_availability_batch(ids)
+        
+        logger.info(
+            "Books availability checked",
+            request_id=request_id,
+            requested_count=len(ids),
+            found_count=len(availability)
+        )
+        
+        return availability
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error checking availability",
+            request_id=request_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error checking availability",
+            request_id=request_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 @router.get("/books/{book_id}/availability", response_model=BookAvailability, responses={
     200: {"description": "Book availability information"},
     404: {"description": "Book not found"},
@@ -158,7 +228,7 @@ def check_book_availability(book_id: int, db: Session = Depends(get_db), request
             "Book availability checked",
             request_id=request_id,
             book_id=book_id,
-            available=availability.available
+            available=availability["available"]
         )
         
         return availability
@@ -255,3 +325,96 @@ def get_book(book_id: int, db: Session = Depends(get_db), request: Request = Non
             detail="Internal server error"
         )
 
+
+@router.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response, responses={
+    204: {"description": "Book deleted"},
+    400: {"description": "Book has copies on loan"},
+    404: {"description": "Book not found"},
+    500: {"description": "Internal server error"}
+})
+def delete_book(book_id: int, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Deleting book", request_id=request_id, book_id=book_id)
+
+    try:
+        BookService(BookRepository(db)).delete_book(book_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except HTTPException as e:
+        logger.warning(
+            "Book deletion failed - business logic error",
+            request_id=request_id,
+            book_id=book_id,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error deleting book", request_id=request_id, book_id=book_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error deleting book", request_id=request_id, book_id=book_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/books/{book_id}/related", response_model=RelatedBooks, responses={
+    200: {"description": "Books most often borrowed by the same readers, precomputed by refresh-related"},
+    404: {"description": "Book not found"},
+    500: {"description": "Internal server error"}
+})
+def get_related_books(
+    book_id: int,
+    limit: int = Query(10, ge=1, le=TOP_K),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+    
+    logger.info(
+        "Getting related books",
+        request_id=request_id,
+        book_id=book_id,
+        limit=limit
+    )
+    
+    try:
+        service = RecommendationService(RecommendationRepository(db), BookRepository(db))
+        related = service.get_related(book_id, limit)
+        
+        logger.info(
+            "Related books retrieved",
+            request_id=request_id,
+            book_id=book_id,
+            returned_count=len(related.items)
+        )
+        
+        return related
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error getting related books",
+            request_id=request_id,
+            book_id=book_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error getting related books",
+            request_id=request_id,
+            book_id=book_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
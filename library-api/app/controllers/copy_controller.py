@@ -0,0 +1,127 @@
+import math
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from app.database.session import SessionLocal
+from app.services.copy_service import CopyService
+from app.repositories.copy_repository import CopyRepository
+from app.schemas.copy import Copy, CopyCreate
+from app.schemas.pagination import PaginatedResponse, page_response
+from app.logging_config import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/books/{book_id}/copies", response_model=PaginatedResponse[Copy], responses={
+    200: {"description": "Paginated copies of the book, withdrawn ones included"},
+    500: {"description": "Internal server error"}
+})
+def get_copies(
+    book_id: int,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Getting book copies", request_id=request_id, book_id=book_id, page=page, size=size)
+
+    try:
+        skip = (page - 1) * size
+        service = CopyService(CopyRepository(db))
+        copies = service.get_copies(book_id, skip, size)
+        total = service.get_copies_count(book_id)
+
+        logger.info("Book copies retrieved successfully", request_id=request_id, book_id=book_id, total_copies=total)
+
+        return page_response(Copy, copies, total, page, size, math.ceil(total / size))
+    except SQLAlchemyError as e:
+        logger.error("Database error getting book copies", request_id=request_id, book_id=book_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error getting book copies", request_id=request_id, book_id=book_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.post("/books/{book_id}/copies", response_model=List[Copy], responses={
+    201: {"description": "Copies added; they serve waiting holds first, then go on the shelf"},
+    404: {"description": "Book not found"},
+    500: {"description": "Internal server error"}
+})
+def add_copies(book_id: int, copies: CopyCreate, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Adding book copies", request_id=request_id, book_id=book_id, count=copies.count)
+
+    try:
+        return CopyService(CopyRepository(db)).add_copies(book_id, copies.count)
+    except HTTPException as e:
+        logger.warning(
+            "Adding copies failed - business logic error",
+            request_id=request_id,
+            book_id=book_id,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error adding book copies", request_id=request_id, book_id=book_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error adding book copies", request_id=request_id, book_id=book_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.delete("/books/{book_id}/copies/{copy_id}", response_model=Copy, responses={
+    200: {"description": "Copy withdrawn from circulation"},
+    400: {"description": "Copy is lent out or reserved for a hold"},
+    404: {"description": "Copy not found"},
+    500: {"description": "Internal server error"}
+})
+def withdraw_copy(book_id: int, copy_id: int, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Withdrawing book copy", request_id=request_id, book_id=book_id, copy_id=copy_id)
+
+    try:
+        return CopyService(CopyRepository(db)).withdraw_copy(book_id, copy_id)
+    except HTTPException as e:
+        logger.warning(
+            "Copy withdrawal failed - business logic error",
+            request_id=request_id,
+            copy_id=copy_id,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error withdrawing book copy", request_id=request_id, copy_id=copy_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error withdrawing book copy", request_id=request_id, copy_id=copy_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
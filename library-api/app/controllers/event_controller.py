@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from app.events import Subscription, event_broker
+from app.logging_config import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+# Comment line sent when no event arrived for this long, so proxies keep the stream open
+KEEPALIVE_SECONDS = 15
+
+# Reconnection delay suggested to EventSource clients
+RETRY_MILLISECONDS = 3000
+
+async def _event_frames(subscription: Subscription, request_id):
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            event = await subscription.get(KEEPALIVE_SECONDS)
+            if subscription.evicted:
+                logger.warning("Event stream evicted as a slow consumer", request_id=request_id)
+                yield "event: evicted\ndata: {}\n\n"
+                return
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            event_type, payload = event
+            yield f"event: {event_type}\ndata: {payload}\n\n"
+    finally:
+        event_broker.unsubscribe(subscription)
+        logger.info("Event stream closed", request_id=request_id)
+
+@router.get("/events", response_class=StreamingResponse, responses={
+    200: {
+        "content": {"text/event-stream": {}},
+        "description": "Server-sent events: loan.created and loan.returned, each with the book's availability afterwards"
+    }
+})
+async def stream_events(request: Request = None):
+    """Push channel for availability changes, instead of polling the books.
+
+    A client that falls too far behind receives an `evicted` event and is
+    disconnected; it should reconnect and re-read what it displays.
+    """
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Opening event stream", request_id=request_id)
+
+    subscription = event_broker.subscribe()
+    return StreamingResponse(
+        _event_frames(subscription, request_id),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events are forwarded as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
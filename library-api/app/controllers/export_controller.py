@@ -0,0 +1,70 @@
+from typing import Optional
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from app.services.export_service import ExportService, EXPORT_MEDIA_TYPES
+from app.logging_config import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+FORMAT_PATTERN = "^(ndjson|csv)$"
+
+def _streaming_response(chunks, entity: str, fmt: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{fmt}"'}
+    )
+
+@router.get("/export/loans", summary="Export loans", description="Stream every loan matching the filters as NDJSON or CSV", responses={
+    200: {"description": "Streamed loans"},
+    422: {"description": "Invalid format or filter"}
+})
+def export_loans(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN, description="Output format"),
+    status: Optional[str] = Query(None, pattern="^(active|overdue)$", description="Same scopes as /loans/active and /loans/overdue"),
+    user_id: Optional[int] = Query(None, description="Only loans of this user"),
+    include_archived: bool = Query(True, description="Include loans moved to the archive (ignored with a status filter)"),
+    request: Request = None
+):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info(
+        "Exporting loans",
+        request_id=request_id,
+        format=format,
+        status=status,
+        user_id=user_id,
+        include_archived=include_archived
+    )
+
+    chunks = ExportService().export_loans(format, status=status, user_id=user_id, include_archived=include_archived)
+    return _streaming_response(chunks, "loans", format)
+
+@router.get("/export/books", summary="Export books", description="Stream the whole catalog as NDJSON or CSV", responses={
+    200: {"description": "Streamed books"},
+    422: {"description": "Invalid format"}
+})
+def export_books(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN, description="Output format"),
+    available: Optional[bool] = Query(None, description="Same filter as /books: only books that are (or are not) available for loan"),
+    request: Request = None
+):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Exporting books", request_id=request_id, format=format, available=available)
+
+    chunks = ExportService().export_books(format, available=available)
+    return _streaming_response(chunks, "books", format)
+
+@router.get("/export/users", summary="Export users", description="Stream every user as NDJSON or CSV", responses={
+    200: {"description": "Streamed users"},
+    422: {"description": "Invalid format"}
+})
+def export_users(format: str = Query("ndjson", pattern=FORMAT_PATTERN, description="Output format"), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Exporting users", request_id=request_id, format=format)
+
+    chunks = ExportService().export_users(format)
+    return _streaming_response(chunks, "users", format)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.cache import caches, count_cache
+from app.database.probe import db_probe
+from app.events import event_broker
+from app.middleware.coalescing import request_coalescer
+from app.schemas.health import HealthStatus, Metrics, ReadinessStatus
+
+router = APIRouter()
+
+# Probes and metrics are served outside /api/v1, never touch the database themselves and are
+# not logged by LoggingMiddleware (see HEALTH_PATHS in main.py).
+
+@router.get("/health", response_model=HealthStatus)
+def health():
+    """Liveness: the process is up and serving requests."""
+    return HealthStatus(status="ok")
+
+@router.get(
+    "/ready",
+    response_model=ReadinessStatus,
+    responses={503: {"model": ReadinessStatus, "description": "Database unreachable or probe stale"}}
+)
+def ready():
+    """Readiness: the last background database probe succeeded recently."""
+    report = ReadinessStatus(
+        status="ready" if db_probe.ready else "unavailable",
+        database={
+            "ok": db_probe.ok,
+            "latency_ms": db_probe.latency_ms,
+            "checked_at": db_probe.checked_at,
+            "stale": db_probe.stale,
+            "error": db_probe.error,
+        },
+        pool=db_probe.pool_status(),
+    )
+    if not db_probe.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=report.model_dump(mode="json"))
+    return report
+
+@router.get("/metrics", response_model=Metrics)
+def metrics():
+    """Counters of this worker since it started."""
+    return Metrics(
+        caches={name: cache.stats() for name, cache in caches.items()},
+        counts=count_cache.stats(),
+        coalescing=request_coalescer.stats(),
+        events=event_broker.stats()
+    )
@@ -0,0 +1,199 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from app.database.listener import HOLD_READY_CHANNEL, listener
+from app.database.session import SessionLocal
+from app.services.hold_service import HoldService
+from app.repositories.hold_repository import HoldRepository
+from app.schemas.hold import Hold, HoldCreate
+from app.logging_config import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+# Longest a long-poll waits between two reads of the hold, in case a
+# notification was missed (e.g. while the listener reconnects)
+RECHECK_SECONDS = 10
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _read_hold(hold_id: int) -> Hold:
+    # A short-lived session per read: a long-poll must not keep a pooled
+    # connection checked out while it waits
+    db = SessionLocal()
+    try:
+        return HoldService(HoldRepository(db)).get_hold(hold_id)
+    finally:
+        db.close()
+
+@router.post("/books/{book_id}/holds", response_model=Hold, responses={
+    201: {"description": "Hold placed; position is its place in the book's queue"},
+    400: {"description": "Book is available, or the user already holds it"},
+    404: {"description": "Book or user not found"},
+    500: {"description": "Internal server error"}
+})
+def place_hold(book_id: int, hold: HoldCreate, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info(
+        "Placing hold",
+        request_id=request_id,
+        book_id=book_id,
+        user_id=hold.user_id
+    )
+
+    try:
+        service = HoldService(HoldRepository(db))
+        placed = service.place_hold(book_id, hold.user_id)
+
+        logger.info(
+            "Hold placed successfully",
+            request_id=request_id,
+            hold_id=placed.id,
+            position=placed.position
+        )
+
+        return placed
+    except HTTPException as e:
+        logger.warning(
+            "Hold placement failed - business logic error",
+            request_id=request_id,
+            book_id=book_id,
+            user_id=hold.user_id,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error placing hold",
+            request_id=request_id,
+            book_id=book_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error placing hold",
+            request_id=request_id,
+            book_id=book_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/holds/{hold_id}", response_model=Hold, responses={
+    200: {"description": "Hold status"},
+    404: {"description": "Hold not found"},
+    500: {"description": "Internal server error"}
+})
+def get_hold(hold_id: int, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Getting hold by ID", request_id=request_id, hold_id=hold_id)
+
+    try:
+        return HoldService(HoldRepository(db)).get_hold(hold_id)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error getting hold", request_id=request_id, hold_id=hold_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error getting hold", request_id=request_id, hold_id=hold_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/holds/{hold_id}/wait", response_model=Hold, responses={
+    200: {"description": "The hold once it leaves the waiting state, or as it is when the timeout elapses"},
+    404: {"description": "Hold not found"},
+    500: {"description": "Internal server error"}
+})
+async def wait_for_hold(
+    hold_id: int,
+    timeout: int = Query(30, ge=1, le=60, description="Seconds to wait for the book to be handed over"),
+    request: Request = None
+):
+    """Long-poll: answers as soon as a return makes the hold ready (or it is cancelled/expired).
+
+    The wait holds no database connection; it is woken by the hold_ready
+    notification sent when the return commits.
+    """
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Waiting for hold", request_id=request_id, hold_id=hold_id, timeout=timeout)
+
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            hold = await run_in_threadpool(_read_hold, hold_id)
+            remaining = deadline - time.monotonic()
+            if hold.status != "waiting" or remaining <= 0:
+                logger.info("Hold wait finished", request_id=request_id, hold_id=hold_id, hold_status=hold.status)
+                return hold
+            await listener.wait(HOLD_READY_CHANNEL, str(hold_id), min(remaining, RECHECK_SECONDS))
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error waiting for hold", request_id=request_id, hold_id=hold_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error waiting for hold", request_id=request_id, hold_id=hold_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.delete("/holds/{hold_id}", response_model=Hold, responses={
+    200: {"description": "Hold cancelled; a book reserved for it passes to the next holder"},
+    404: {"description": "Open hold not found"},
+    500: {"description": "Internal server error"}
+})
+def cancel_hold(hold_id: int, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Cancelling hold", request_id=request_id, hold_id=hold_id)
+
+    try:
+        return HoldService(HoldRepository(db)).cancel_hold(hold_id)
+    except HTTPException as e:
+        logger.warning(
+            "Hold cancellation failed - business logic error",
+            request_id=request_id,
+            hold_id=hold_id,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error cancelling hold", request_id=request_id, hold_id=hold_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error cancelling hold", request_id=request_id, hold_id=hold_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.database.session import SessionLocal
 from app.services.loan_service import LoanService
 from app.repositories.loan_repository import LoanRepository
-from app.schemas.loan import Loan, LoanCreate, LoanReturn
-from app.schemas.pagination import PaginatedResponse
+from app.schemas.loan import (
+    Loan,
+    LoanCreate,
+    LoanReturn,
+    LoanBatchCreate,
+    LoanBatchCreateResult,
+    LoanBatchReturn,
+    LoanBatchReturnResult,
+)
+from app.schemas.pagination import PaginatedResponse, page_response
+from app.idempotency import idempotency_store
+from app.repositories.idempotency_repository import IdempotencyRepository
 from app.logging_config import get_logger
 import math
 
@@ -23,21 +34,28 @@ def get_db():
     200: {"description": "Successful response with paginated loans"},
     500: {"description": "Internal server error"}
 })
-def get_loans(page: int = Query(1, ge=1, description="Page number"), size: int = Query(10, ge=1, le=100, description="Items per page"), db: Session = Depends(get_db), request: Request = None):
+def get_loans(
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(10, ge=1, le=100, description="Items per page"),
+    include_archived: bool = Query(True, description="Include loans moved to the archive; false reads only recent loans"),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     request_id = getattr(request.state, 'request_id', None) if request else None
     
     logger.info(
         "Getting loans list",
         request_id=request_id,
         page=page,
-        size=size
+        size=size,
+        include_archived=include_archived
     )
     
     try:
         skip = (page - 1) * size
         service = LoanService(LoanRepository(db))
-        loans = service.get_all_loans(skip, size)
-        total = service.get_loans_count()
+        loans = service.get_all_loans(skip, size, include_archived)
+        total = service.get_loans_count(include_archived)
         pages = math.ceil(total / size)
         
         logger.info(
@@ -47,13 +65,7 @@ def get_loans(page: int = Query(1, ge=1, description="Page number"), size: int =
             returned_count=len(loans)
         )
         
-        return PaginatedResponse(
-            items=loans,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return page_response(Loan, loans, total, page, size, pages)
     except SQLAlchemyError as e:
         logger.error(
             "Database error getting loans",
@@ -79,20 +91,47 @@ def get_loans(page: int = Query(1, ge=1, description="Page number"), size: int =
     201: {"description": "Loan created successfully"},
     400: {"description": "Book not available or user has 3 active loans"},
     404: {"description": "Book or user not found"},
+    409: {"description": "A request with the same Idempotency-Key is still being processed"},
+    422: {"description": "Idempotency-Key reused with a different request body"},
     500: {"description": "Internal server error"}
 })
-def create_loan(loan: LoanCreate, db: Session = Depends(get_db), request: Request = None):
+def create_loan(
+    loan: LoanCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     request_id = getattr(request.state, 'request_id', None) if request else None
     
     logger.info(
         "Creating new loan",
         request_id=request_id,
         user_id=loan.user_id,
-        book_id=loan.book_id
+        book_id=loan.book_id,
+        idempotency_key=idempotency_key
     )
     
     try:
         service = LoanService(LoanRepository(db))
+        if idempotency_key:
+            outcome = idempotency_store.execute(
+                "loans",
+                # Keys are per caller: the authenticated user, or anonymous
+                str(getattr(request.state, "user_id", "")),
+                idempotency_key,
+                loan.model_dump_json().encode(),
+                lambda: Loan.model_validate(service.create_loan(loan)),
+                IdempotencyRepository(db)
+            )
+            logger.info(
+                "Idempotent loan request completed",
+                request_id=request_id,
+                idempotency_key=idempotency_key,
+                replayed=outcome.replayed,
+                status_code=outcome.status_code
+            )
+            return outcome.to_response()
+
         created_loan = service.create_loan(loan)
         
         logger.info(
@@ -140,6 +179,101 @@ def create_loan(loan: LoanCreate, db: Session = Depends(get_db), request: Reques
             detail="Internal server error"
         )
 
+@router.post("/loans/batch", response_model=LoanBatchCreateResult, summary="Check out several books", description="Create up to 100 loans in one transaction. Items that fail validation are reported and skipped; the rest are created.", responses={
+    200: {"description": "Per-item result of the batch"},
+    422: {"description": "Invalid batch (empty or more than 100 items)"},
+    500: {"description": "Internal server error"}
+})
+def create_loans_batch(batch: LoanBatchCreate, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+    
+    logger.info(
+        "Creating loans in batch",
+        request_id=request_id,
+        item_count=len(batch.items)
+    )
+    
+    try:
+        service = LoanService(LoanRepository(db))
+        result = service.create_loans_batch(batch.items)
+        
+        logger.info(
+            "Batch loans processed",
+            request_id=request_id,
+            created=result["created"],
+            failed=result["failed"]
+        )
+        
+        return result
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error creating loans in batch",
+            request_id=request_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error creating loans in batch",
+            request_id=request_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.put("/loans/batch/return", response_model=LoanBatchReturnResult, summary="Return several books", description="Return up to 100 active loans in one transaction, with fines calculated for each.", responses={
+    200: {"description": "Per-item result of the batch with fine calculation"},
+    422: {"description": "Invalid batch (empty or more than 100 items)"},
+    500: {"description": "Internal server error"}
+})
+def return_books_batch(batch: LoanBatchReturn, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+    
+    logger.info(
+        "Processing batch book return",
+        request_id=request_id,
+        item_count=len(batch.loan_ids)
+    )
+    
+    try:
+        service = LoanService(LoanRepository(db))
+        result = service.return_books_batch(batch.loan_ids)
+        
+        logger.info(
+            "Batch return processed",
+            request_id=request_id,
+            returned=result["returned"],
+            failed=result["failed"],
+            total_fines=result["total_fines"]
+        )
+        
+        return result
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error returning books in batch",
+            request_id=request_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error returning books in batch",
+            request_id=request_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 @router.put("/loans/{loan_id}/return", response_model=LoanReturn, responses={
     200: {"description": "Book returned successfully with fine calculation"},
     404: {"description": "Active loan not found"},
@@ -162,7 +296,7 @@ def return_book(loan_id: int, db: Session = Depends(get_db), request: Request =
             "Book returned successfully",
             request_id=request_id,
             loan_id=loan_id,
-            fine_amount=float(loan.fine_amount) if loan.fine_amount else 0.0,
+            fine_amount=str(loan.fine_amount),
             return_date=loan.return_date.isoformat() if loan.return_date else None
         )
         
@@ -230,13 +364,7 @@ def get_active_loans(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=
             returned_count=len(loans)
         )
         
-        return PaginatedResponse(
-            items=loans,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return page_response(Loan, loans, total, page, size, pages)
     except SQLAlchemyError as e:
         logger.error(
             "Database error getting active loans",
@@ -286,13 +414,7 @@ def get_overdue_loans(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le
             returned_count=len(loans)
         )
         
-        return PaginatedResponse(
-            items=loans,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return page_response(Loan, loans, total, page, size, pages)
     except SQLAlchemyError as e:
         logger.error(
             "Database error getting overdue loans",
@@ -319,7 +441,14 @@ def get_overdue_loans(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le
     404: {"description": "User not found"},
     500: {"description": "Internal server error"}
 })
-def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), db: Session = Depends(get_db), request: Request = None):
+def get_user_loans(
+    user_id: int,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(True, description="Include loans moved to the archive; false reads only recent loans"),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     request_id = getattr(request.state, 'request_id', None) if request else None
     
     logger.info(
@@ -327,14 +456,15 @@ def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(1
         request_id=request_id,
         user_id=user_id,
         page=page,
-        size=size
+        size=size,
+        include_archived=include_archived
     )
     
     try:
         skip = (page - 1) * size
         service = LoanService(LoanRepository(db))
-        loans = service.get_user_loans(user_id, skip, size)
-        total = service.get_user_loans_count(user_id)
+        loans = service.get_user_loans(user_id, skip, size, include_archived)
+        total = service.get_user_loans_count(user_id, include_archived)
         pages = math.ceil(total / size)
         
         logger.info(
@@ -345,13 +475,7 @@ def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(1
             returned_count=len(loans)
         )
         
-        return PaginatedResponse(
-            items=loans,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return page_response(Loan, loans, total, page, size, pages)
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -0,0 +1,115 @@
+from datetime import date
+from typing import Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from app.database.session import SessionLocal
+from app.services.loan_service import LoanService
+from app.services.report_service import ReportService
+from app.repositories.loan_repository import LoanRepository
+from app.repositories.report_repository import ReportRepository
+from app.schemas.report import CirculationReport, FineRevenueReport, NationalityReport, ProjectedFinesReport, TopBooksReport
+from app.logging_config import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+REPORT_RESPONSES = {
+    400: {"description": "Invalid report window"},
+    500: {"description": "Internal server error"}
+}
+
+START_QUERY = Query(None, description="First day (UTC), defaults to 29 days before end")
+END_QUERY = Query(None, description="Last day (UTC), defaults to today")
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _report(name: str, request: Request, build: Callable, **params):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info(f"Getting {name} report", request_id=request_id, **params)
+
+    try:
+        report = build()
+        logger.info(f"{name.capitalize()} report retrieved", request_id=request_id, returned_count=len(report.items))
+        return report
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"Database error getting {name} report", request_id=request_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error getting {name} report", request_id=request_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/reports/loans-per-day", response_model=CirculationReport, responses=REPORT_RESPONSES)
+def get_loans_per_day(
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    service = ReportService(ReportRepository(db))
+    return _report("loans per day", request, lambda: service.get_circulation(start, end), start=start, end=end)
+
+@router.get("/reports/top-books", response_model=TopBooksReport, responses=REPORT_RESPONSES)
+def get_top_books(
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    period: int = Query(30, description="Days ending on the last refresh (7, 30, 90 or 365); used when start and end are omitted"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    service = ReportService(ReportRepository(db))
+    return _report(
+        "top books",
+        request,
+        lambda: service.get_top_books(start, end, limit, period),
+        start=start,
+        end=end,
+        period=period,
+        limit=limit
+    )
+
+@router.get("/reports/fine-revenue", response_model=FineRevenueReport, responses=REPORT_RESPONSES)
+def get_fine_revenue(
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    service = ReportService(ReportRepository(db))
+    return _report("fine revenue", request, lambda: service.get_fine_revenue(start, end), start=start, end=end)
+
+@router.get("/reports/overdue-by-nationality", response_model=NationalityReport, responses=REPORT_RESPONSES)
+def get_overdue_by_nationality(
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    service = ReportService(ReportRepository(db))
+    return _report("overdue by nationality", request, lambda: service.get_by_nationality(start, end), start=start, end=end)
+
+@router.get(
+    "/reports/projected-fines",
+    response_model=ProjectedFinesReport,
+    summary="Fines owed if every overdue loan came back now",
+    description="Prices all active overdue loans under the current fine policy in one query, grouped by the borrowers' fine tier. Read live from loan, not from the rollups.",
+    responses={500: REPORT_RESPONSES[500]}
+)
+def get_projected_fines(db: Session = Depends(get_db), request: Request = None):
+    service = LoanService(LoanRepository(db))
+    return _report("projected fines", request, lambda: ProjectedFinesReport(**service.get_projected_fines()))
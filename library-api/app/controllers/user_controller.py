@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.database.session import SessionLocal
@@ -6,9 +7,12 @@ from app.services.user_service import UserService
 from app.services.loan_service import LoanService
 from app.repositories.user_repository import UserRepository
 from app.repositories.loan_repository import LoanRepository
-from app.schemas.user import UserResponse, UserCreate
+from app.schemas.user import UserResponse, UserCreate, UserListItem, UserLoanSummary
 from app.schemas.loan import Loan
-from app.schemas.pagination import PaginatedResponse
+from app.schemas.pagination import PaginatedResponse, page_response
+from app.auth import authenticate
+from app.idempotency import idempotency_store
+from app.repositories.idempotency_repository import IdempotencyRepository
 from app.logging_config import get_logger
 import math
 
@@ -22,7 +26,7 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/users", response_model=PaginatedResponse[UserResponse], responses={
+@router.get("/users", response_model=PaginatedResponse[UserResponse], dependencies=[Depends(authenticate)], responses={
     200: {"description": "Successful response with paginated users"},
     500: {"description": "Internal server error"}
 })
@@ -50,13 +54,7 @@ def get_users(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), d
             returned_count=len(users)
         )
         
-        return PaginatedResponse(
-            items=users,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return page_response(UserListItem, users, total, page, size, pages)
     except SQLAlchemyError as e:
         logger.error(
             "Database error getting users",
@@ -78,23 +76,51 @@ def get_users(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), d
             detail="Internal server error"
         )
 
+# Registration stays open when AUTH_ENABLED; the other user routes need a token
 @router.post("/users", response_model=UserResponse, responses={
     201: {"description": "User created successfully"},
     400: {"description": "Invalid input data or email already exists"},
+    409: {"description": "A request with the same Idempotency-Key is still being processed"},
+    422: {"description": "Idempotency-Key reused with a different request body"},
     500: {"description": "Internal server error"}
 })
-def create_user(user: UserCreate, db: Session = Depends(get_db), request: Request = None):
+def create_user(
+    user: UserCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     request_id = getattr(request.state, 'request_id', None) if request else None
     
     logger.info(
         "Creating new user",
         request_id=request_id,
         user_name=user.name,
-        user_email=user.email
+        user_email=user.email,
+        idempotency_key=idempotency_key
     )
     
     try:
         service = UserService(UserRepository(db))
+        if idempotency_key:
+            outcome = idempotency_store.execute(
+                "users",
+                # Keys are per caller: the authenticated user, or anonymous
+                str(getattr(request.state, "user_id", "")),
+                idempotency_key,
+                user.model_dump_json().encode(),
+                lambda: UserResponse.model_validate(service.create_user(user)),
+                IdempotencyRepository(db)
+            )
+            logger.info(
+                "Idempotent user request completed",
+                request_id=request_id,
+                idempotency_key=idempotency_key,
+                replayed=outcome.replayed,
+                status_code=outcome.status_code
+            )
+            return outcome.to_response()
+
         created_user = service.create_user(user)
         
         logger.info(
@@ -140,7 +166,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db), request: Reques
             detail="Internal server error"
         )
 
-@router.get("/users/{user_id}", response_model=UserResponse, responses={
+@router.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(authenticate)], responses={
     200: {"description": "User details retrieved successfully"},
     404: {"description": "User not found"},
     500: {"description": "Internal server error"}
@@ -201,12 +227,116 @@ def get_user(user_id: int, db: Session = Depends(get_db), request: Request = Non
             detail="Internal server error"
         )
 
-@router.get("/users/{user_id}/loans", response_model=PaginatedResponse[Loan], responses={
+@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response, dependencies=[Depends(authenticate)], responses={
+    204: {"description": "User deleted"},
+    400: {"description": "User has active loans"},
+    404: {"description": "User not found"},
+    500: {"description": "Internal server error"}
+})
+def delete_user(user_id: int, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+
+    logger.info("Deleting user", request_id=request_id, user_id=user_id)
+
+    try:
+        UserService(UserRepository(db)).delete_user(user_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except HTTPException as e:
+        logger.warning(
+            "User deletion failed - business logic error",
+            request_id=request_id,
+            user_id=user_id,
+            error=e.detail,
+            status_code=e.status_code
+        )
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error deleting user", request_id=request_id, user_id=user_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error("Unexpected error deleting user", request_id=request_id, user_id=user_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/users/{user_id}/summary", response_model=UserLoanSummary, dependencies=[Depends(authenticate)], responses={
+    200: {"description": "User's loan counters"},
+    404: {"description": "User not found"},
+    500: {"description": "Internal server error"}
+})
+def get_user_summary(user_id: int, db: Session = Depends(get_db), request: Request = None):
+    request_id = getattr(request.state, 'request_id', None) if request else None
+    
+    logger.info(
+        "Getting user loan summary",
+        request_id=request_id,
+        user_id=user_id
+    )
+    
+    try:
+        service = UserService(UserRepository(db))
+        summary = service.get_loan_summary(user_id)
+        if not summary:
+            logger.warning(
+                "User not found for loan summary",
+                request_id=request_id,
+                user_id=user_id
+            )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        logger.info(
+            "User loan summary retrieved",
+            request_id=request_id,
+            user_id=user_id,
+            active_loans=summary.active_loans
+        )
+        
+        return summary
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error getting user loan summary",
+            request_id=request_id,
+            user_id=user_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred"
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error getting user loan summary",
+            request_id=request_id,
+            user_id=user_id,
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/users/{user_id}/loans", response_model=PaginatedResponse[Loan], dependencies=[Depends(authenticate)], responses={
     200: {"description": "User's loan history retrieved successfully"},
     404: {"description": "User not found"},
     500: {"description": "Internal server error"}
 })
-def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), db: Session = Depends(get_db), request: Request = None):
+def get_user_loans(
+    user_id: int,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(True, description="Include loans moved to the archive; false reads only recent loans"),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     request_id = getattr(request.state, 'request_id', None) if request else None
     
     logger.info(
@@ -214,13 +344,16 @@ def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(1
         request_id=request_id,
         user_id=user_id,
         page=page,
-        size=size
+        size=size,
+        include_archived=include_archived
     )
     
     try:
+        # The summary read checks the user exists and carries the all-time loan
+        # total, so the full history needs no separate user lookup or COUNT
         user_service = UserService(UserRepository(db))
-        user = user_service.get_user(user_id)
-        if not user:
+        summary = user_service.get_loan_summary(user_id)
+        if not summary:
             logger.warning(
                 "User not found for loan history",
                 request_id=request_id,
@@ -233,8 +366,11 @@ def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(1
 
         skip = (page - 1) * size
         loan_service = LoanService(LoanRepository(db))
-        loans = loan_service.get_user_loans(user_id, skip, size)
-        total = loan_service.get_user_loans_count(user_id)
+        loans = loan_service.get_user_loans(user_id, skip, size, include_archived)
+        if include_archived:
+            total = summary.total_loans
+        else:
+            total = loan_service.get_user_loans_count(user_id)
         pages = math.ceil(total / size)
         
         logger.info(
@@ -245,13 +381,7 @@ def get_user_loans(user_id: int, page: int = Query(1, ge=1), size: int = Query(1
             returned_count=len(loans)
         )
         
-        return PaginatedResponse(
-            items=loans,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
+        return page_response(Loan, loans, total, page, size, pages)
     except HTTPException:
         raise
     except SQLAlchemyError as e:
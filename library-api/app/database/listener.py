@@ -0,0 +1,134 @@
+import asyncio
+import select
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from app.database.session import engine
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+HOLD_READY_CHANNEL = "hold_ready"
+LIBRARY_EVENTS_CHANNEL = "library_events"
+REVOKED_TOKENS_CHANNEL = "revoked_tokens"
+
+class NotificationListener:
+    """LISTENs on Postgres channels from a daemon thread, waking asyncio waiters and subscribers.
+
+    Writers call pg_notify(channel, payload) inside their transaction, so a
+    notification is only delivered once the change is committed. The listener
+    holds one connection of its own, detached from the pool. When it is down,
+    wait() simply times out; callers re-read the database after every wait,
+    so a lost notification only delays them.
+    """
+
+    def __init__(self, engine: Engine, channels: Iterable[str], reconnect_delay: float = 2.0):
+        self.engine = engine
+        self.channels = list(channels)
+        self.reconnect_delay = reconnect_delay
+        self._waiters: Dict[Tuple[str, str], List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._connect_callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.reconnect_delay + 1)
+            self._thread = None
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Call callback(payload) for every notification on channel.
+
+        Callbacks run on the listener thread and must return quickly.
+        """
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def on_connect(self, callback: Callable[[], None]) -> None:
+        """Call callback() on the listener thread each time LISTEN is (re)established.
+
+        Subscribers that mirror database state reload it here: notifications
+        sent while the listener was down are lost.
+        """
+        with self._lock:
+            self._connect_callbacks.append(callback)
+
+    async def wait(self, channel: str, payload: str, timeout: float) -> bool:
+        """Wait up to timeout seconds for pg_notify(channel, payload); True when it arrived."""
+        key = (channel, payload)
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(key, []).append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(key, [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    self._waiters.pop(key, None)
+
+    def _notify(self, channel: str, payload: str) -> None:
+        with self._lock:
+            waiters = self._waiters.pop((channel, payload), [])
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+        for callback in subscribers:
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.warning("Notification subscriber failed", channel=channel, error=str(e))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                dbapi_connection = connection.driver_connection
+                connection.detach()
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    for channel in self.channels:
+                        cursor.execute(f'LISTEN "{channel}"')
+                logger.debug("Listening for database notifications", channels=self.channels)
+                with self._lock:
+                    connect_callbacks = list(self._connect_callbacks)
+                for callback in connect_callbacks:
+                    try:
+                        callback()
+                    except Exception as e:
+                        logger.warning("Listener connect callback failed", error=str(e))
+                while not self._stop.is_set():
+                    if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        notification = dbapi_connection.notifies.pop(0)
+                        self._notify(notification.channel, notification.payload)
+            except Exception as e:
+                logger.warning("Database listener disconnected", error=str(e))
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+# One listener per process, started by the app lifespan (i.e. in each gunicorn worker)
+listener = NotificationListener(engine, [HOLD_READY_CHANNEL, LIBRARY_EVENTS_CHANNEL, REVOKED_TOKENS_CHANNEL])
@@ -0,0 +1,87 @@
+"""Schema version helpers around the Alembic scripts in migrations/.
+
+Alembic is imported inside the functions so the API only pays for it when a
+check or upgrade actually runs.
+"""
+import os
+from pathlib import Path
+from typing import List
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision matching the schema the original app/database/init.sql created
+BASELINE_REVISION = "0001_baseline"
+
+class PendingMigrationsError(RuntimeError):
+    def __init__(self, pending: List[str]):
+        super().__init__(
+            f"Database schema is behind the code, pending migrations: {', '.join(pending)}. "
+            "Run `python -m app.cli migrate`."
+        )
+        self.pending = pending
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    return config
+
+def pending_migrations(connection: Connection) -> List[str]:
+    """Revisions between the database's current version and head, oldest first."""
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(alembic_config())
+    current = MigrationContext.configure(connection).get_current_heads()
+    if set(current) == set(script.get_heads()):
+        return []
+    revisions = script.iterate_revisions("heads", current or "base")
+    return [revision.revision for revision in reversed(list(revisions))]
+
+def check_migrations(engine: Engine, mode: str = None) -> None:
+    """Compare the database with the migration scripts at startup.
+
+    mode comes from MIGRATION_CHECK: "error" (default) refuses to start with
+    pending migrations, "warn" only logs them, "off" skips the check.
+    """
+    mode = (mode or os.getenv("MIGRATION_CHECK", "error")).lower()
+    if mode == "off":
+        return
+
+    with engine.connect() as connection:
+        pending = pending_migrations(connection)
+    if not pending:
+        logger.info("Database schema is up to date")
+        return
+
+    if mode == "warn":
+        logger.warning("Database schema has pending migrations", pending=pending)
+        return
+    raise PendingMigrationsError(pending)
+
+def upgrade(engine: Engine, revision: str = "head") -> None:
+    """Apply migrations up to revision.
+
+    A database created by the old init.sql has the baseline tables but no
+    alembic_version row; it is stamped at the baseline first so only the
+    later revisions run against it. The revisions right after the baseline
+    add what later versions of init.sql created, skipping what is there.
+    """
+    from alembic import command
+
+    config = alembic_config()
+    config.attributes["url"] = engine.url.render_as_string(hide_password=False)
+    with engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+    if "alembic_version" not in tables and "loan" in tables:
+        logger.info("Stamping existing schema at baseline", revision=BASELINE_REVISION)
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, revision)
+    logger.info("Database migrated", revision=revision)
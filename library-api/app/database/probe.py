@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.database.session import engine
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class DatabaseProbe:
+    """Runs `SELECT 1` on a background thread and keeps the last result.
+
+    Readiness probes read the cached result instead of touching the database,
+    so probing every few seconds per replica costs nothing. The result counts
+    as stale after `max_age` seconds, which also catches a hung probe thread
+    (for example one waiting on an exhausted pool).
+    """
+
+    def __init__(self, engine: Engine, interval: float = 5.0, max_age: Optional[float] = None):
+        self.engine = engine
+        self.interval = interval
+        self.max_age = max_age if max_age is not None else interval * 3
+        self.ok = False
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self._checked_monotonic: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            if self.ok or self.checked_at is None:
+                logger.warning("Database probe failed", error=str(e))
+            self.ok, self.latency_ms, self.error = False, None, str(e).splitlines()[0]
+        else:
+            if not self.ok and self.checked_at is not None:
+                logger.info("Database probe recovered")
+            self.ok, self.error = True, None
+            self.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.checked_at = datetime.now(timezone.utc)
+        self._checked_monotonic = time.monotonic()
+        return self.ok
+
+    @property
+    def stale(self) -> bool:
+        return self._checked_monotonic is None or time.monotonic() - self._checked_monotonic > self.max_age
+
+    @property
+    def ready(self) -> bool:
+        return self.ok and not self.stale
+
+    def pool_status(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # QueuePool reports overflow relative to pool_size (negative until the pool is full)
+            "overflow": max(0, pool.overflow()),
+        }
+
+    def start(self) -> None:
+        """Probe once, then keep probing every `interval` seconds until stop()."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="db-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+# One probe per process, started by the app lifespan (i.e. in each gunicorn worker)
+db_probe = DatabaseProbe(engine, interval=float(os.getenv("HEALTH_PROBE_INTERVAL", "5")))
@@ -0,0 +1,93 @@
+-- Sample data for a fresh database, loaded by `python -m app.cli seed` after `migrate`
+
+INSERT INTO author (name, biography, nationality) VALUES 
+('Machado de Assis', 'Escritor brasileiro, considerado um dos maiores da literatura nacional', 'Brasileira'),
+('Clarice Lispector', 'Escritora brasileira nascida na Ucrânia', 'Brasileira'),
+('José Saramago', 'Escritor português, Prêmio Nobel de Literatura', 'Portuguesa'),
+('Gabriel García Márquez', 'Escritor colombiano, mestre do realismo mágico', 'Colombiana'),
+('George Orwell', 'Escritor britânico, autor de distopias clássicas', 'Britânica'),
+('J.K. Rowling', 'Escritora britânica, criadora de Harry Potter', 'Britânica'),
+('Stephen King', 'Escritor americano, mestre do terror', 'Americana'),
+('Agatha Christie', 'Escritora britânica, rainha do crime', 'Britânica')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO "user" (name, email, hashed_password) VALUES 
+('João Silva', 'joao@email.com', 'pbkdf2_sha256$600000$dRxewdKR4qYPV6NUVWrEug$QCglchyER4gsXjr6IvbQNdKFK2Tsa9iuCd69917xTDs'),
+('Maria Santos', 'maria@email.com', 'pbkdf2_sha256$600000$Aqyc0deNpJ0X9iiBHGPk3w$NgTsZdKR7ffj59aw0k3UbhPgTtwnKf59HGsMXHPqVCE'),
+('Pedro Oliveira', 'pedro@email.com', 'pbkdf2_sha256$600000$xzf2dqbGhuc5QK4Zdmew4w$y6_CaTSdNtXtD0WD9m6nlwBOk5EvJDq3G7UMsUPaUbs'),
+('Ana Costa', 'ana@email.com', 'pbkdf2_sha256$600000$Ygbs6CXAW_EAw3G6w2O1Ow$pj34Bvmkf6okWx_LpKYv_husr7eLNU-VuiJqmRYDYFI'),
+('Carlos Ferreira', 'carlos@email.com', 'pbkdf2_sha256$600000$ygN8p9AGkDIH0iitQdKrmw$AE9uWrcXShw7y76L66CFNO5yMZs9aRYzk6O29IUefVc')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO book (name, description, pages, author_id) VALUES 
+('Dom Casmurro', 'Romance clássico da literatura brasileira', 256, 1),
+('A Hora da Estrela', 'Romance sobre Macabéa', 87, 2),
+('Memorial do Convento', 'Romance histórico sobre a construção do Convento de Mafra', 358, 3),
+('Cem Anos de Solidão', 'Obra-prima do realismo mágico', 432, 4),
+('1984', 'Distopia sobre totalitarismo e vigilância', 328, 5),
+('Harry Potter e a Pedra Filosofal', 'Primeiro livro da saga do bruxinho', 223, 6),
+('O Iluminado', 'Terror psicológico no Hotel Overlook', 447, 7),
+('Assassinato no Expresso do Oriente', 'Mistério clássico de Hercule Poirot', 256, 8),
+('Quincas Borba', 'Romance realista brasileiro', 312, 1),
+('Água Viva', 'Narrativa experimental e poética', 96, 2),
+('Ensaio sobre a Cegueira', 'Alegoria sobre a condição humana', 310, 3),
+('O Amor nos Tempos do Cólera', 'Romance sobre amor e tempo', 368, 4),
+('A Revolução dos Bichos', 'Fábula política sobre poder', 112, 5),
+('Harry Potter e a Câmara Secreta', 'Segunda aventura de Harry Potter', 251, 6),
+('Carrie', 'Primeiro romance publicado de Stephen King', 199, 7),
+('Morte no Nilo', 'Mistério ambientado no Egito', 288, 8)
+ON CONFLICT DO NOTHING;
+
+-- One physical copy of each sample book
+INSERT INTO book_copy (book_id)
+SELECT id FROM book ORDER BY id;
+
+-- Sample loan data, each on its book's copy
+INSERT INTO loan (book_id, copy_id, user_id, loan_date, due_date, return_date, fine_amount, status)
+SELECT v.book_id, book_copy.id, v.user_id, v.loan_date::timestamp, v.due_date::timestamp,
+       v.return_date::timestamp, v.fine_amount, v.status
+FROM (VALUES
+-- Active loans
+(1, 1, '2024-01-15 10:00:00', '2024-02-15 23:59:59', NULL, 0.0, 'active'),
+(3, 2, '2024-01-20 14:30:00', '2024-02-20 23:59:59', NULL, 0.0, 'active'),
+(5, 3, '2024-01-25 09:15:00', '2024-02-25 23:59:59', NULL, 0.0, 'active'),
+
+-- Overdue loans (not returned)
+(7, 4, '2023-12-01 11:00:00', '2024-01-01 23:59:59', NULL, 0.0, 'active'),
+(9, 5, '2023-11-15 16:45:00', '2023-12-15 23:59:59', NULL, 0.0, 'active'),
+
+-- Loans returned on time
+(2, 1, '2023-12-01 10:00:00', '2024-01-01 23:59:59', '2023-12-28 15:30:00', 0.0, 'returned'),
+(4, 2, '2023-11-10 14:00:00', '2023-12-10 23:59:59', '2023-12-05 10:20:00', 0.0, 'returned'),
+(6, 3, '2023-10-15 09:30:00', '2023-11-15 23:59:59', '2023-11-10 14:45:00', 0.0, 'returned'),
+
+-- Loans returned late (with fine)
+(8, 4, '2023-10-01 12:00:00', '2023-11-01 23:59:59', '2023-11-08 16:30:00', 14.0, 'returned'),
+(10, 5, '2023-09-15 11:30:00', '2023-10-15 23:59:59', '2023-10-25 09:15:00', 20.0, 'returned'),
+
+-- Additional loan history
+(11, 1, '2023-08-01 10:15:00', '2023-09-01 23:59:59', '2023-08-28 14:20:00', 0.0, 'returned'),
+(12, 2, '2023-07-10 15:45:00', '2023-08-10 23:59:59', '2023-08-15 11:30:00', 10.0, 'returned')
+) AS v (book_id, user_id, loan_date, due_date, return_date, fine_amount, status)
+JOIN book_copy ON book_copy.book_id = v.book_id
+ON CONFLICT DO NOTHING;
+
+-- Derive the maintained availability state from the sample loans
+UPDATE book_copy SET status = 'on_loan'
+FROM loan
+WHERE loan.copy_id = book_copy.id AND loan.status = 'active';
+
+UPDATE book
+SET total_copies = counts.total_copies, available_copies = counts.available_copies
+FROM (
+    SELECT book_id, count(*) AS total_copies, count(*) FILTER (WHERE status = 'available') AS available_copies
+    FROM book_copy GROUP BY book_id
+) AS counts
+WHERE counts.book_id = book.id;
+
+-- Derive the per-user loan counters from the sample loans
+INSERT INTO user_loan_summary (user_id, active_loans, total_loans, outstanding_fines)
+SELECT user_id, count(*) FILTER (WHERE status = 'active'), count(*), coalesce(sum(fine_amount), 0)
+FROM loan
+GROUP BY user_id
+ON CONFLICT DO NOTHING;
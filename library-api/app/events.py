@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.database.listener import LIBRARY_EVENTS_CHANNEL, NotificationListener, listener
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Events queued per open stream; a client that falls this far behind is dropped
+EVENTS_BUFFER_SIZE = int(os.getenv("EVENTS_BUFFER_SIZE", "100"))
+
+# "postgres" fans events out to every worker through NOTIFY; "local" keeps them
+# in this process (development, single-process runs)
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "postgres")
+
+# One NOTIFY per event (payloads are capped at 8000 bytes), all in one statement
+NOTIFY_SQL = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+# (event type, JSON payload)
+Event = Tuple[str, str]
+
+class Subscription:
+    """Bounded queue of the events for one open stream, owned by the event loop serving it."""
+
+    def __init__(self, buffer_size: int):
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=buffer_size)
+        self.evicted = False
+
+    def offer(self, event: Event) -> bool:
+        """Queue an event (on the owning loop); a full queue evicts the subscription."""
+        if self.evicted:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.evicted = True
+            # Drop the backlog and wake the stream so it can tell the client and close
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """The next event, or None when timeout elapses first or the subscription was evicted."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class EventBroker:
+    """Broadcasts change events to the streams open in this worker.
+
+    Publishers NOTIFY after committing their change, and every worker's
+    NotificationListener hands the payload to its broker, which fans it out to
+    the local subscriptions. Each subscription buffers at most buffer_size
+    events; one that falls further behind is evicted rather than slowing the
+    others or growing without bound, and its client must reconnect and re-read
+    what it displays.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = EVENTS_BUFFER_SIZE,
+        backend: str = EVENTS_BACKEND,
+        listener: Optional[NotificationListener] = None,
+        channel: str = LIBRARY_EVENTS_CHANNEL
+    ):
+        if backend not in ("postgres", "local"):
+            raise ValueError(f"Unsupported events backend: {backend}")
+        self.buffer_size = buffer_size
+        self.backend = backend
+        self.channel = channel
+        self._subscriptions: Dict[asyncio.AbstractEventLoop, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._published = 0
+        self._delivered = 0
+        self._evicted = 0
+        if backend == "postgres" and listener is not None:
+            listener.subscribe(channel, self._deliver)
+
+    def subscribe(self) -> Subscription:
+        """Open a subscription; must be called from the event loop that will read it."""
+        subscription = Subscription(self.buffer_size)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.loop, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.loop)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.loop]
+
+    def publish(self, db: Session, events: List[dict]) -> None:
+        """Broadcast events describing changes the caller has already committed.
+
+        The NOTIFY is committed on the caller's session, without expiring the
+        objects it loaded; a second connection per request could exhaust the
+        pool under load. Errors are logged, not raised: the change itself
+        succeeded, and clients that miss an event catch up on their next read.
+        """
+        if not events:
+            return
+        payloads = [json.dumps(event, default=str) for event in events]
+        with self._lock:
+            self._published += len(payloads)
+        if self.backend == "local":
+            for payload in payloads:
+                self._deliver(payload)
+            return
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.execute(NOTIFY_SQL, {"channel": self.channel, "payloads": payloads})
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning("Failed to publish events", event_count=len(payloads), error=str(e))
+        finally:
+            db.expire_on_commit = expire_on_commit
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+                "published": self._published,
+                "delivered": self._delivered,
+                "evicted": self._evicted,
+            }
+
+    def _deliver(self, payload: str) -> None:
+        # Called from the listener thread (or the publisher, for the local backend)
+        try:
+            event = (json.loads(payload)["type"], payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event", payload=payload[:200])
+            return
+        with self._lock:
+            loops = list(self._subscriptions)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._fan_out, loop, event)
+            except RuntimeError:
+                # The loop was closed with subscriptions still registered
+                with self._lock:
+                    self._subscriptions.pop(loop, None)
+
+    def _fan_out(self, loop: asyncio.AbstractEventLoop, event: Event) -> None:
+        # Runs on loop, the only place its subscriptions' queues are touched
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(loop, ()))
+        delivered, evicted = 0, []
+        for subscription in subscriptions:
+            if subscription.offer(event):
+                delivered += 1
+            elif subscription.evicted:
+                evicted.append(subscription)
+        for subscription in evicted:
+            self.unsubscribe(subscription)
+        with self._lock:
+            self._delivered += delivered
+            self._evicted += len(evicted)
+        if evicted:
+            logger.warning("Evicted slow event consumers", evicted=len(evicted), buffer_size=self.buffer_size)
+
+# One broker per process, fed by the process' listener
+event_broker = EventBroker(listener=listener)
@@ -0,0 +1,99 @@
+"""Overdue fines: exact Decimal amounts under a policy configured from the environment.
+
+A loan is charged per full day past its due date, after a grace period, at
+its borrower's tier rate and up to the tier's cap. The same rules run in
+Python when a loan is returned and in SQL (LoanRepository.project_fines)
+when every active loan is priced at once.
+"""
+import os
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Charged per day overdue, in reais
+FINE_DAILY_RATE = os.getenv("FINE_DAILY_RATE", "2.00")
+
+# Days past the due date that are not charged
+FINE_GRACE_DAYS = int(os.getenv("FINE_GRACE_DAYS", "0"))
+
+# Most a single loan can be charged; unset for no cap
+FINE_MAX = os.getenv("FINE_MAX", "")
+
+# "tier:rate[:max],..." overriding the rate and cap for users in those tiers,
+# e.g. "student:1.00:20.00,staff:0". A tier without a max keeps FINE_MAX; users
+# in any other tier pay the defaults
+FINE_TIERS = os.getenv("FINE_TIERS", "")
+
+DEFAULT_TIER = "standard"
+
+CENT = Decimal("0.01")
+
+def to_money(value) -> Decimal:
+    """value as a Decimal rounded half-up to the cent; floats go through their shortest repr."""
+    if isinstance(value, float):
+        value = repr(value)
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+class FineRate(NamedTuple):
+    daily_rate: Decimal
+    # None: no cap
+    max_fine: Optional[Decimal] = None
+
+class FinePolicy:
+    def __init__(
+        self,
+        daily_rate: Decimal,
+        grace_days: int = 0,
+        max_fine: Optional[Decimal] = None,
+        tiers: Optional[Dict[str, FineRate]] = None,
+    ):
+        tiers = dict(tiers or {})
+        rates = [FineRate(daily_rate, max_fine), *tiers.values()]
+        if grace_days < 0 or any(rate.daily_rate < 0 or (rate.max_fine is not None and rate.max_fine < 0) for rate in rates):
+            raise ValueError("Fine rates, caps and grace days cannot be negative")
+        self.default_rate = FineRate(to_money(daily_rate), to_money(max_fine) if max_fine is not None else None)
+        self.grace_days = grace_days
+        # A tier without its own cap keeps the default one
+        self.tiers = {
+            name: FineRate(to_money(rate.daily_rate), to_money(rate.max_fine) if rate.max_fine is not None else self.default_rate.max_fine)
+            for name, rate in tiers.items()
+        }
+
+    @classmethod
+    def from_env(
+        cls,
+        daily_rate: str = FINE_DAILY_RATE,
+        grace_days: int = FINE_GRACE_DAYS,
+        max_fine: str = FINE_MAX,
+        tiers: str = FINE_TIERS,
+    ) -> "FinePolicy":
+        parsed = {}
+        for item in filter(None, (part.strip() for part in tiers.split(","))):
+            name, _, rest = item.partition(":")
+            rate, _, cap = rest.partition(":")
+            if not name or not rate:
+                raise ValueError("FINE_TIERS entries must look like tier:rate or tier:rate:max")
+            parsed[name] = FineRate(to_money(rate), to_money(cap) if cap else None)
+        return cls(Decimal(daily_rate), grace_days, Decimal(max_fine) if max_fine.strip() else None, parsed)
+
+    def rate_for(self, tier: Optional[str]) -> FineRate:
+        return self.tiers.get(tier, self.default_rate)
+
+    def days_charged(self, due_date: datetime, now: datetime) -> int:
+        if now <= due_date:
+            return 0
+        return max((now - due_date).days - self.grace_days, 0)
+
+    def fine(self, due_date: datetime, now: Optional[datetime] = None, tier: Optional[str] = None) -> Decimal:
+        rate = self.rate_for(tier)
+        fine = self.days_charged(due_date, now or datetime.utcnow()) * rate.daily_rate
+        if rate.max_fine is not None:
+            fine = min(fine, rate.max_fine)
+        return fine.quantize(CENT)
+
+    def fines(self, loans: Iterable[Tuple[datetime, Optional[str]]], now: Optional[datetime] = None) -> List[Decimal]:
+        """Fines of (due_date, tier) pairs, all priced at the same instant."""
+        now = now or datetime.utcnow()
+        return [self.fine(due_date, now, tier) for due_date, tier in loans]
+
+fine_policy = FinePolicy.from_env()
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from app.logging_config import get_logger
+from app.repositories.idempotency_repository import IdempotencyRepository
+
+logger = get_logger(__name__)
+
+class _Entry:
+    __slots__ = ("fingerprint", "status_code", "body", "expires_at", "done", "abandoned")
+
+    def __init__(self, fingerprint: bytes, expires_at: float):
+        self.fingerprint = fingerprint
+        self.status_code = 0
+        self.body = b""
+        self.expires_at = expires_at
+        self.done = threading.Event()
+        self.abandoned = False
+
+class IdempotentOutcome:
+    __slots__ = ("status_code", "body", "replayed")
+
+    def __init__(self, status_code: int, body: bytes, replayed: bool):
+        self.status_code = status_code
+        self.body = body
+        self.replayed = replayed
+
+    def to_response(self) -> Response:
+        headers = {"Idempotent-Replayed": "true"} if self.replayed else None
+        return Response(content=self.body, status_code=self.status_code, media_type="application/json", headers=headers)
+
+class IdempotencyStore:
+    """Remembers the outcome of requests sent with an Idempotency-Key header.
+
+    Keys are scoped by endpoint and by caller (the authenticated user id, or
+    "" for anonymous requests), so one client's key never replays another's
+    response. Only a digest of the request body and the serialized response
+    are kept per key. A retry with the same key and body replays the stored
+    response; a duplicate that arrives while the first request is still running
+    waits until that one finishes instead of running the create path again.
+    Client errors (4xx) are remembered too, while server errors and unexpected
+    exceptions release the key so the request can be retried.
+
+    Given an IdempotencyRepository, keys are claimed in Postgres in the
+    transaction of the create itself (see IdempotencyRepository.claim), which
+    covers retries that reach another worker. The in-process map in front of
+    it lets retries and duplicates on the same worker skip the database.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_entries: int = 10000, wait_timeout: float = 30.0, poll_interval: float = 0.05):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._entries: "OrderedDict[Tuple[str, str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def execute(
+        self,
+        scope: str,
+        principal: str,
+        key: str,
+        payload: bytes,
+        handler: Callable[[], BaseModel],
+        repository: Optional[IdempotencyRepository] = None,
+    ) -> IdempotentOutcome:
+        """Run handler once per (scope, principal, key); handler must use repository's session."""
+        fingerprint = hashlib.blake2b(payload, digest_size=16).digest()
+        entry_key = (scope, principal, key)
+
+        while True:
+            entry, owner = self._claim(entry_key, fingerprint)
+            if owner:
+                return self._run(entry_key, entry, handler, repository)
+
+            if entry.fingerprint != fingerprint:
+                logger.warning("Idempotency key reused with a different payload", scope=scope, idempotency_key=key)
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+            if not entry.done.wait(self.wait_timeout):
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+            if not entry.abandoned:
+                logger.debug("Replaying idempotent response", scope=scope, idempotency_key=key, status_code=entry.status_code)
+                return IdempotentOutcome(entry.status_code, entry.body, replayed=True)
+            # The first attempt failed without a cacheable outcome: try to take over.
+
+    def _claim(self, entry_key: Tuple[str, str, str], fingerprint: bytes) -> Tuple[_Entry, bool]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(entry_key)
+            if entry is not None and not entry.abandoned:
+                return entry, False
+            entry = _Entry(fingerprint, now + self.ttl_seconds)
+            self._entries[entry_key] = entry
+            self._entries.move_to_end(entry_key)
+            return entry, True
+
+    def _claim_stored(self, entry_key: Tuple[str, str, str], entry: _Entry, repository: IdempotencyRepository) -> Optional[IdempotentOutcome]:
+        """None once the key is claimed in the database, else the outcome another worker stored for it."""
+        scope, principal, key = entry_key
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            stored = repository.claim(scope, principal, key, entry.fingerprint, self._expires_at())
+            if stored is None:
+                return None
+            if stored.fingerprint != entry.fingerprint:
+                self._abandon(entry_key, entry)
+                logger.warning("Idempotency key reused with a different payload", scope=scope, idempotency_key=key)
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+            if stored.status_code is not None:
+                self._complete(entry, stored.status_code, stored.body)
+                logger.debug("Replaying stored idempotent response", scope=scope, idempotency_key=key, status_code=stored.status_code)
+                return IdempotentOutcome(stored.status_code, stored.body, replayed=True)
+            # Committed by another worker, which has not stored the outcome yet
+            if time.monotonic() >= deadline:
+                self._abandon(entry_key, entry)
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+            time.sleep(self.poll_interval)
+
+    def _run(
+        self,
+        entry_key: Tuple[str, str, str],
+        entry: _Entry,
+        handler: Callable[[], BaseModel],
+        repository: Optional[IdempotencyRepository],
+    ) -> IdempotentOutcome:
+        scope, principal, key = entry_key
+        if repository is not None:
+            try:
+                stored = self._claim_stored(entry_key, entry, repository)
+            except HTTPException:
+                raise
+            except BaseException:
+                repository.release()
+                self._abandon(entry_key, entry)
+                raise
+            if stored is not None:
+                return stored
+
+        try:
+            result = handler()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                if repository is not None:
+                    repository.release()
+                self._abandon(entry_key, entry)
+                raise
+            body = json.dumps({"detail": e.detail}, separators=(",", ":")).encode()
+            if repository is not None:
+                repository.remember(scope, principal, key, entry.fingerprint, self._expires_at(), e.status_code, body)
+            self._complete(entry, e.status_code, body)
+            raise
+        except BaseException:
+            if repository is not None:
+                repository.release()
+            self._abandon(entry_key, entry)
+            raise
+
+        body = result.model_dump_json().encode()
+        if repository is not None:
+            # The claim committed with the create; a failure here leaves it pending, never re-run
+            try:
+                repository.complete(scope, principal, key, 200, body)
+            except Exception as e:
+                logger.error("Could not store idempotent response", scope=scope, idempotency_key=key, error=str(e))
+        self._complete(entry, 200, body)
+        return IdempotentOutcome(entry.status_code, entry.body, replayed=False)
+
+    def _expires_at(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+
+    def _complete(self, entry: _Entry, status_code: int, body: bytes) -> None:
+        entry.status_code = status_code
+        entry.body = body
+        entry.done.set()
+
+    def _abandon(self, entry_key: Tuple[str, str, str], entry: _Entry) -> None:
+        with self._lock:
+            entry.abandoned = True
+            if self._entries.get(entry_key) is entry:
+                del self._entries[entry_key]
+        entry.done.set()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the oldest finished ones until a new entry fits in max_entries.
+
+        Entries still running are skipped rather than evicted, since their
+        duplicates wait on them; there are at most as many as requests in
+        flight, so the scan stays short and max_entries holds beyond them.
+        """
+        excess = len(self._entries) + 1 - self.max_entries
+        doomed = []
+        for entry_key, entry in self._entries.items():
+            # Entries share one TTL and are kept in creation order, so the expired ones come first
+            if excess <= 0 and entry.expires_at > now:
+                break
+            if entry.done.is_set():
+                doomed.append(entry_key)
+                excess -= 1
+        for entry_key in doomed:
+            del self._entries[entry_key]
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+)
@@ -1,35 +1,38 @@
 import structlog
 import logging
-import logging.handlers
 import sys
 import os
 from pathlib import Path
+from typing import TextIO
 
-def configure_logging() -> None:
-    """Configure structured logging for the application."""
+def configure_logging(stream: TextIO = sys.stdout) -> None:
+    """Configure structured logging for the application.
+
+    Log lines go to stream; the CLI passes sys.stderr so they don't mix with exported data.
+    """
     
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     log_format = os.getenv("LOG_FORMAT", "console").lower()
     app_name = os.getenv("APP_NAME", "digital-library-api")
     
-    # Create logs directory
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+    handlers = [logging.StreamHandler(stream)]
     
-    # Configure file handler
-    file_handler = logging.handlers.RotatingFileHandler(
-        log_dir / "app.log",
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
-    )
+    # File logging is opt-in: LOG_FILE=logs/app.log adds a rotating file for the stdlib log records
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        from logging.handlers import RotatingFileHandler
+        
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(RotatingFileHandler(
+            log_file,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5
+        ))
     
     # Configure logging
     logging.basicConfig(
         level=getattr(logging, log_level, logging.INFO),
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            file_handler
-        ],
+        handlers=handlers,
         format="%(message)s"
     )
     
@@ -45,12 +48,13 @@ def configure_logging() -> None:
     if log_format == "json":
         processors.append(structlog.processors.JSONRenderer())
     else:
+        # Pretty exceptions come from rich when it is installed (requirements-dev.txt)
         processors.append(structlog.dev.ConsoleRenderer(colors=True))
     
     structlog.configure(
         processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, log_level, logging.INFO)),
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=structlog.PrintLoggerFactory(stream),
         cache_logger_on_first_use=True,
     )
 
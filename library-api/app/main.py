@@ -1,29 +1,72 @@
 # main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from app.controllers.book_controller import router as book_router
 from app.controllers.user_controller import router as user_router
 from app.controllers.loan_controller import router as loan_router
 from app.controllers.author_controller import router as author_router
+from app.controllers.export_controller import router as export_router
+from app.controllers.report_controller import router as report_router
+from app.controllers.copy_controller import router as copy_router
+from app.controllers.hold_controller import router as hold_router
+from app.controllers.event_controller import router as event_router
+from app.controllers.health_controller import router as health_router
+from app.controllers.auth_controller import router as auth_router
+from app.auth import authenticate, check_auth_config
+from app.middleware.coalescing import COALESCE_REQUESTS, CoalescingMiddleware
 from app.middleware.logging import LoggingMiddleware
+from app.database.migrations import check_migrations
+from app.database.listener import listener
+from app.database.probe import db_probe
+from app.database.session import engine
 from app.logging_config import configure_logging, get_logger
 
-# Configure logging
-configure_logging()
 logger = get_logger(__name__)
 
+# Orchestrator probes and metrics scrapes, excluded from request logging
+HEALTH_PATHS = ("/health", "/ready", "/metrics")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Refuse to serve against a schema older than the models (MIGRATION_CHECK=warn|off to relax)
+    check_migrations(engine)
+    # Refuse to start with AUTH_ENABLED but no signing keys
+    check_auth_config()
+    db_probe.start()
+    listener.start()
+    yield
+    listener.stop()
+    db_probe.stop()
+
 def create_app() -> FastAPI:
+    configure_logging()
+
     app = FastAPI(
         title="Digital Library API",
         version="1.0.0",
-        description="API REST for digital library management"
+        description="API REST for digital library management",
+        lifespan=lifespan
     )
 
-    app.add_middleware(LoggingMiddleware)
+    # Added first so it sits inside LoggingMiddleware: coalesced requests are still logged
+    if COALESCE_REQUESTS:
+        app.add_middleware(CoalescingMiddleware)
+    app.add_middleware(LoggingMiddleware, skip_paths=HEALTH_PATHS)
 
-    app.include_router(book_router, prefix="/api/v1", tags=["Livros"])
-    app.include_router(author_router, prefix="/api/v1", tags=["Autores"])
+    # Bearer token required on every /api/v1 route when AUTH_ENABLED, except
+    # login and user registration (see user_controller)
+    protected = [Depends(authenticate)]
+    app.include_router(auth_router, prefix="/api/v1", tags=["Autenticação"])
+    app.include_router(book_router, prefix="/api/v1", tags=["Livros"], dependencies=protected)
+    app.include_router(copy_router, prefix="/api/v1", tags=["Exemplares"], dependencies=protected)
+    app.include_router(author_router, prefix="/api/v1", tags=["Autores"], dependencies=protected)
     app.include_router(user_router, prefix="/api/v1", tags=["Usuários"])
-    app.include_router(loan_router, prefix="/api/v1", tags=["Empréstimos"])
+    app.include_router(loan_router, prefix="/api/v1", tags=["Empréstimos"], dependencies=protected)
+    app.include_router(hold_router, prefix="/api/v1", tags=["Reservas"], dependencies=protected)
+    app.include_router(event_router, prefix="/api/v1", tags=["Eventos"], dependencies=protected)
+    app.include_router(export_router, prefix="/api/v1", tags=["Exportação"], dependencies=protected)
+    app.include_router(report_router, prefix="/api/v1", tags=["Relatórios"], dependencies=protected)
+    app.include_router(health_router, tags=["Saúde"])
 
     logger.info("Digital Library API started")
     return app
@@ -0,0 +1,167 @@
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Off switch for request coalescing (COALESCE_REQUESTS=false)
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "true").lower() in ("1", "true", "yes")
+
+# Largest response body shared between coalesced requests; bigger ones are sent to their own request only
+COALESCE_MAX_BODY_BYTES = int(os.getenv("COALESCE_MAX_BODY_BYTES", str(1024 * 1024)))
+
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+class _Flight:
+    __slots__ = ("done", "response", "followers")
+
+    def __init__(self):
+        self.done = asyncio.Event()
+        # (http.response.start message, body) once the response is known to be shareable
+        self.response: Optional[Tuple[Message, bytes]] = None
+        self.followers = 0
+
+class RequestCoalescer:
+    """In-flight GET requests of this worker, by what makes their responses identical.
+
+    Only touched from the event loop, so it needs no locks. A write that
+    completes bumps the generation, which is part of every key: a GET that
+    arrives after a write never joins a flight that started before it, so
+    clients still read their own writes.
+    """
+
+    def __init__(self, max_body_bytes: int = COALESCE_MAX_BODY_BYTES):
+        self.max_body_bytes = max_body_bytes
+        self.flights: Dict[tuple, _Flight] = {}
+        self._generation = 0
+        self._stats = {
+            # GETs that could have been coalesced
+            "requests": 0,
+            # Of those, how many ran the endpoint and how many reused a concurrent run
+            "executions": 0,
+            "coalesced": 0,
+            # Runs whose response could not be shared (streamed, too large, 5xx or failed);
+            # their followers ran the endpoint themselves
+            "unshareable": 0,
+        }
+
+    def key(self, scope: Scope) -> tuple:
+        authorization = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+        return (self._generation, scope["path"], scope["query_string"], authorization)
+
+    def write_completed(self) -> None:
+        self._generation += 1
+
+    def count(self, name: str) -> None:
+        self._stats[name] += 1
+
+    def stats(self) -> dict:
+        stats = dict(self._stats, in_flight=len(self.flights))
+        stats["collapse_ratio"] = round(stats["coalesced"] / stats["requests"], 4) if stats["requests"] else None
+        return stats
+
+request_coalescer = RequestCoalescer()
+
+class CoalescingMiddleware:
+    """Collapses identical concurrent GETs under path_prefix into one endpoint run.
+
+    The first request (the leader) runs the app; identical requests arriving
+    while it runs wait for it and get a copy of its response. Requests are
+    identical when path, raw query string and Authorization header match,
+    so one caller never sees a response computed under another's credentials.
+
+    Only responses sent as a single body message of at most max_body_bytes
+    are shared, and only when their status is below 500. Event streams,
+    streamed exports, oversized bodies and server errors go to the leader
+    untouched, and waiting followers then run the app themselves, as they do
+    when the leader raises.
+    """
+
+    def __init__(self, app: ASGIApp, coalescer: RequestCoalescer = request_coalescer, path_prefix: str = "/api/v1/"):
+        self.app = app
+        self.coalescer = coalescer
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] != "GET":
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if scope["method"] not in SAFE_METHODS:
+                    self.coalescer.write_completed()
+            return
+
+        coalescer = self.coalescer
+        coalescer.count("requests")
+        key = coalescer.key(scope)
+        flight = coalescer.flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            await flight.done.wait()
+            if flight.response is not None:
+                coalescer.count("coalesced")
+                start, body = flight.response
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            coalescer.count("executions")
+            await self.app(scope, receive, send)
+            return
+
+        flight = coalescer.flights[key] = _Flight()
+        coalescer.count("executions")
+        start: Optional[Message] = None
+        passthrough = False
+
+        def release(response: Optional[Tuple[Message, bytes]]) -> None:
+            # Later arrivals start a new flight; current followers get this response, or run themselves
+            if coalescer.flights.get(key) is flight:
+                del coalescer.flights[key]
+            if not flight.done.is_set():
+                if response is None:
+                    coalescer.count("unshareable")
+                flight.response = response
+                flight.done.set()
+
+        async def capture(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                # Server errors are not shared: followers retry the endpoint instead of all failing with the leader
+                if message["status"] >= 500 or any(
+                    name == b"content-type" and value.startswith(b"text/event-stream") for name, value in message.get("headers", ())
+                ):
+                    passthrough = True
+                    release(None)
+                    await send(message)
+                return
+            if message["type"] == "http.response.body" and start is not None:
+                body = message.get("body", b"")
+                if message.get("more_body", False) or len(body) > coalescer.max_body_bytes:
+                    passthrough = True
+                    release(None)
+                else:
+                    release((start, body))
+                await send(start)
+                await send(message)
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            release(None)
+            if flight.followers:
+                logger.debug("Coalesced requests", path=scope["path"], followers=flight.followers, shared=flight.response is not None)
@@ -1,19 +1,40 @@
 import time
 import uuid
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Iterable
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class LoggingMiddleware:
+    """Logs the start and end of every HTTP request and assigns it a request ID.
+
+    Written as a plain ASGI middleware rather than BaseHTTPMiddleware: the latter
+    re-streams every response through a task that is cancelled when the client
+    disconnects, so the server never sees the final body message. That hides
+    requests from uvicorn's request counter and breaks worker recycling
+    (gunicorn max_requests).
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: Iterable[str] = ()):
+        self.app = app
+        # Paths served without request logging (e.g. orchestrator probes)
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # Generate request ID
         request_id = str(uuid.uuid4())
-        
+
         # Start timing
         start_time = time.time()
-        
+
         # Log request
         logger.info(
             "Request started",
@@ -23,32 +44,24 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             client_ip=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent")
         )
-        
-        # Add request ID to state for use in endpoints
-        request.state.request_id = request_id
-        
+
+        # Add request ID to state for use in endpoints (request.state.request_id)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        status_code = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration = time.time() - start_time
-            
-            # Log response
-            logger.info(
-                "Request completed",
-                request_id=request_id,
-                method=request.method,
-                url=str(request.url),
-                status_code=response.status_code,
-                duration_ms=round(duration * 1000, 2)
-            )
-            
-            return response
-            
+            await self.app(scope, receive, send_with_status)
         except Exception as e:
             # Calculate duration
             duration = time.time() - start_time
-            
+
             # Log error
             logger.error(
                 "Request failed",
@@ -58,5 +71,20 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 error=str(e),
                 duration_ms=round(duration * 1000, 2)
             )
-            
-            raise
\ No newline at end of file
+
+            raise
+
+        # Calculate duration
+        duration = time.time() - start_time
+
+        # Log response
+        logger.info(
+            "Request completed",
+            request_id=request_id,
+            method=request.method,
+            url=str(request.url),
+            status_code=status_code,
+            # Set by app.auth for requests carrying a valid token
+            user_id=scope["state"].get("user_id"),
+            duration_ms=round(duration * 1000, 2)
+        )
@@ -1,15 +1,30 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Boolean, Column, Computed, DateTime, Index, Integer, String, Text, ForeignKey, text
 from sqlalchemy.orm import relationship
 from app.models import Base
 
 class Book(Base):
     __tablename__ = "book"
+    __table_args__ = (
+        Index("idx_book_author_id", "author_id"),
+        Index("idx_book_available", "id", postgresql_where=text("available = TRUE")),
+        # Listings and counts only read books that were not deleted
+        Index("idx_book_live", "id", postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_book_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     pages = Column(Integer, nullable=False)
     author_id = Column(Integer, ForeignKey("author.id"), nullable=False)
+    # Counters of book_copy rows, kept in step with them by LoanRepository and
+    # HoldRepository; repaired by BookRepository.reconcile_availability
+    total_copies = Column(Integer, nullable=False, default=0, server_default="0")
+    available_copies = Column(Integer, nullable=False, default=0, server_default="0")
+    available = Column(Boolean, Computed("available_copies > 0", persisted=True), nullable=False)
+    # Set by BookRepository.soft_delete; the row is kept for loan history and
+    # removed later by purge_deleted once nothing references it
+    deleted_at = Column(DateTime, nullable=True)
 
     author = relationship("Author")
 
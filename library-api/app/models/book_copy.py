@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func, text
+from app.models import Base
+
+class BookCopy(Base):
+    """One physical item of a book.
+
+    status is "available" (on the shelf), "on_loan" (the copy of an active
+    loan), "reserved" (held for the ready hold in hold_id) or "withdrawn".
+    Book.total_copies/available_copies count these rows and are updated in the
+    same transaction as every status change.
+    """
+    __tablename__ = "book_copy"
+    __table_args__ = (
+        Index("idx_book_copy_book_id", "book_id"),
+        # Free copies of a book, picked with FOR UPDATE SKIP LOCKED at checkout
+        Index("idx_book_copy_available", "book_id", "id", postgresql_where=text("status = 'available'")),
+        # At most one copy set aside per ready hold
+        Index("uq_book_copy_hold_id", "hold_id", unique=True, postgresql_where=text("hold_id IS NOT NULL")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False, default="available", server_default="available")
+    hold_id = Column(Integer, ForeignKey("hold.id"), nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer
+from app.models import Base
+
+class BookRelated(Base):
+    """Top-K books most often borrowed by the readers of book_id, rebuilt by RecommendationService.refresh."""
+    __tablename__ = "book_related"
+
+    book_id = Column(Integer, primary_key=True, autoincrement=False)
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    related_book_id = Column(Integer, nullable=False)
+    # Distinct users who borrowed both books
+    shared_readers = Column(Integer, nullable=False)
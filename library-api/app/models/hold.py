@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func, text
+from app.models import Base
+
+class Hold(Base):
+    """A patron's place in a book's queue.
+
+    Holds are served in id order per book: status goes from waiting to ready
+    when a return hands the book to its holder (HoldRepository.dispatch), then
+    to fulfilled when the holder checks it out, or to expired/cancelled.
+    """
+    __tablename__ = "hold"
+    __table_args__ = (
+        # The queue: waiting holds of a book in arrival order
+        Index("idx_hold_queue", "book_id", "id", postgresql_where=text("status = 'waiting'")),
+        # One open hold per patron and book
+        Index("uq_hold_open", "book_id", "user_id", unique=True, postgresql_where=text("status IN ('waiting', 'ready')")),
+        Index("idx_hold_ready_expires_at", "expires_at", postgresql_where=text("status = 'ready'")),
+        # Foreign key lookups when users or books are purged
+        Index("idx_hold_book_id", "book_id"),
+        Index("idx_hold_user_id", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    book_id = Column(Integer, ForeignKey("book.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    status = Column(String(20), nullable=False, default="waiting", server_default="waiting")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    ready_at = Column(DateTime, nullable=True)
+    # Pickup deadline of a ready hold
+    expires_at = Column(DateTime, nullable=True)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+from datetime import datetime
+from app.models import Base
+
+class IdempotencyKey(Base):
+    """The outcome of a create sent with an Idempotency-Key, shared by every worker.
+
+    The row is inserted in the transaction of the create it guards, so it
+    exists exactly when the create committed; status_code and body are filled
+    in right after. Rows are useless, and purged, once expires_at has passed.
+    """
+    __tablename__ = "idempotency_key"
+    __table_args__ = (
+        Index("idx_idempotency_key_expires_at", "expires_at"),
+    )
+
+    # "loans" or "users"
+    scope = Column(String(20), primary_key=True)
+    # User id of the authenticated caller, empty when the request was anonymous
+    principal = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # BLAKE2b digest of the request body
+    fingerprint = Column(LargeBinary, nullable=False)
+    # Null until the outcome is stored
+    status_code = Column(Integer, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
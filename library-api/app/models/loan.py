@@ -1,18 +1,31 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, String
+from sqlalchemy import Column, Index, Integer, ForeignKey, DateTime, Numeric, String, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models import Base
 
 class Loan(Base):
     __tablename__ = "loan"
+    __table_args__ = (
+        Index("idx_loan_book_id", "book_id"),
+        Index("idx_loan_user_id", "user_id"),
+        Index("idx_loan_status", "status"),
+        Index("idx_loan_returned_return_date", "return_date", postgresql_where=text("status = 'returned'")),
+        Index("idx_loan_active_loan_date", "loan_date", postgresql_where=text("status = 'active'")),
+        Index("idx_loan_loan_date", "loan_date"),
+        # A copy is lent to one patron at a time
+        Index("uq_loan_active_copy_id", "copy_id", unique=True, postgresql_where=text("status = 'active'")),
+        # Foreign key check when a purged book's copies are deleted
+        Index("idx_loan_copy_id", "copy_id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     book_id = Column(Integer, ForeignKey("book.id"), nullable=False)
+    copy_id = Column(Integer, ForeignKey("book_copy.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     loan_date = Column(DateTime, default=datetime.utcnow)
     due_date = Column(DateTime, nullable=False)
     return_date = Column(DateTime, nullable=True)
-    fine_amount = Column(Float, default=0.0)
+    fine_amount = Column(Numeric(10, 2), default=0)
     status = Column(String(20), default="active")
 
     book = relationship("Book")
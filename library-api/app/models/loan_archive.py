@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Index, Integer, DateTime, Numeric, String, func
+from app.models import Base
+
+class LoanArchive(Base):
+    """Returned loans moved out of loan by LoanRepository.archive_returned.
+
+    Same columns and ids as loan, without foreign keys, so history stays
+    queryable while the hot table only holds recent loans.
+    """
+    __tablename__ = "loan_archive"
+    __table_args__ = (
+        Index("idx_loan_archive_book_id", "book_id"),
+        Index("idx_loan_archive_user_id", "user_id"),
+        Index("idx_loan_archive_return_date", "return_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    book_id = Column(Integer, nullable=False)
+    copy_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=False)
+    loan_date = Column(DateTime)
+    due_date = Column(DateTime, nullable=False)
+    return_date = Column(DateTime, nullable=True)
+    fine_amount = Column(Numeric(10, 2), default=0)
+    status = Column(String(20), default="returned")
+    archived_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from app.models import Base
+
+class OutboxEvent(Base):
+    """A domain event, written in the transaction of the change it describes.
+
+    OutboxRelay publishes pending events in id order and then sets
+    published_at; published rows are purged after a retention period.
+    """
+    __tablename__ = "outbox_event"
+    __table_args__ = (
+        # The relay's queue
+        Index("idx_outbox_event_pending", "id", postgresql_where=text("published_at IS NULL")),
+        Index("idx_outbox_event_published_at", "published_at", postgresql_where=text("published_at IS NOT NULL")),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    # loan.created, loan.returned, book.created, book.deleted, user.created or user.deleted
+    event_type = Column(String(50), nullable=False)
+    # Id of the loan, book or user the event is about
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    published_at = Column(DateTime, nullable=True)
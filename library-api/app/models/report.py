@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Date, DateTime, Integer, Numeric, String
+from app.models import Base
+
+# Daily circulation rollups, rebuilt incrementally by ReportRepository.refresh.
+# A loan counts towards the day it was created (loans_created) and the day it
+# was returned (loans_returned, late_returns, fines_total).
+
+class ReportLoanDaily(Base):
+    __tablename__ = "report_loan_daily"
+
+    day = Column(Date, primary_key=True)
+    loans_created = Column(Integer, nullable=False, default=0, server_default="0")
+    loans_returned = Column(Integer, nullable=False, default=0, server_default="0")
+    late_returns = Column(Integer, nullable=False, default=0, server_default="0")
+    fines_total = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+
+class ReportBookDaily(Base):
+    __tablename__ = "report_book_daily"
+
+    day = Column(Date, primary_key=True)
+    book_id = Column(Integer, primary_key=True, autoincrement=False)
+    loans_created = Column(Integer, nullable=False, default=0, server_default="0")
+
+class ReportNationalityDaily(Base):
+    __tablename__ = "report_nationality_daily"
+
+    day = Column(Date, primary_key=True)
+    nationality = Column(String(100), primary_key=True)
+    loans_created = Column(Integer, nullable=False, default=0, server_default="0")
+    loans_returned = Column(Integer, nullable=False, default=0, server_default="0")
+    late_returns = Column(Integer, nullable=False, default=0, server_default="0")
+    fines_total = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+
+class ReportTopBooks(Base):
+    """Most borrowed books per fixed period (ReportRepository.TOP_BOOK_PERIODS), ending on the refresh day."""
+    __tablename__ = "report_top_books"
+
+    period_days = Column(Integer, primary_key=True, autoincrement=False)
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    book_id = Column(Integer, nullable=False)
+    loans = Column(Integer, nullable=False)
+
+class ReportRefresh(Base):
+    """Watermark of the last rollup refresh, one row per rollup set."""
+    __tablename__ = "report_refresh"
+
+    name = Column(String(50), primary_key=True)
+    refreshed_at = Column(DateTime, nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from datetime import datetime
+from app.models import Base
+
+class RevokedToken(Base):
+    """An access token revoked before its expiry; useless, and deleted, once expires_at has passed."""
+    __tablename__ = "revoked_token"
+    __table_args__ = (
+        Index("idx_revoked_token_expires_at", "expires_at"),
+    )
+
+    # The token's jti claim
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,10 +1,21 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String, text
 from app.models import Base
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        # A deleted user's email can be registered again
+        Index("uq_user_email", "email", unique=True, postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_user_live", "id", postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_user_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
-    email = Column(String(255), unique=True, nullable=False)
+    email = Column(String(255), nullable=False)
     hashed_password = Column(String(255), nullable=False)
+    # Selects the FinePolicy rate and cap (FINE_TIERS); unknown tiers pay the defaults
+    fine_tier = Column(String(20), nullable=False, default="standard", server_default="standard")
+    # Set by UserRepository.soft_delete; purge_deleted removes the user and
+    # their history after a retention period
+    deleted_at = Column(DateTime, nullable=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey
+from app.models import Base
+
+class UserLoanSummary(Base):
+    """Per-user loan counters, maintained by LoanRepository on checkout and return."""
+    __tablename__ = "user_loan_summary"
+
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    active_loans = Column(Integer, nullable=False, default=0, server_default="0")
+    total_loans = Column(Integer, nullable=False, default=0, server_default="0")
+    outstanding_fines = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
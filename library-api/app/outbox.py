@@ -0,0 +1,162 @@
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Callable, List
+from sqlalchemy.orm import Session
+from app.logging_config import get_logger
+from app.models.outbox_event import OutboxEvent
+from app.repositories.outbox_repository import OutboxRepository
+
+logger = get_logger(__name__)
+
+# Where the relay publishes: "file:<path>" appends NDJSON, "queue" keeps events
+# in an in-process queue (a stand-in for a broker, for development and tests)
+OUTBOX_SINK = os.getenv("OUTBOX_SINK", "file:outbox/events.ndjson")
+
+# Events claimed, published and marked per transaction
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+
+class OutboxSink(ABC):
+    """Destination of published events. publish must not return before the batch is safely handed over."""
+
+    @abstractmethod
+    def publish(self, messages: List[dict]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+class FileSink(OutboxSink):
+    """Appends one JSON document per line, synced to disk before the batch counts as published."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def publish(self, messages: List[dict]) -> None:
+        self._file.write("".join(json.dumps(message, separators=(",", ":")) + "\n" for message in messages))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+class QueueSink(OutboxSink):
+    """Bounded in-process queue; a consumer that stops draining it fails the relay's batches until it catches up."""
+
+    def __init__(self, maxsize: int = 10000, timeout: float = 5.0):
+        self.queue: "queue.Queue[dict]" = queue.Queue(maxsize=maxsize)
+        self.timeout = timeout
+
+    def publish(self, messages: List[dict]) -> None:
+        for message in messages:
+            self.queue.put(message, timeout=self.timeout)
+
+def create_sink(spec: str = OUTBOX_SINK) -> OutboxSink:
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec == "queue":
+        return QueueSink()
+    raise ValueError(f"Unsupported outbox sink: {spec}")
+
+def _message(event: OutboxEvent) -> dict:
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "aggregate_id": event.aggregate_id,
+        "occurred_at": event.created_at.isoformat(),
+        "payload": event.payload,
+    }
+
+class OutboxRelay:
+    """Moves committed outbox events to a sink, at least once.
+
+    Each batch is claimed with FOR UPDATE SKIP LOCKED, published, then marked
+    published in the same transaction. A crash or failed commit after the sink
+    accepted a batch publishes it again, so consumers must deduplicate on the
+    event id. Several relays can run side by side; each event is then
+    published in id order by one of them, but batches may interleave.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], sink: OutboxSink, batch_size: int = OUTBOX_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._published = 0
+        self._batches = 0
+        self._failures = 0
+        self._busy_seconds = 0.0
+        self._lag_seconds = 0.0
+
+    def relay_batch(self) -> int:
+        """Publish one batch; returns the number of events published. Sink errors propagate."""
+        db = self.session_factory()
+        try:
+            repository = OutboxRepository(db)
+            started = time.perf_counter()
+            events = repository.claim_pending(self.batch_size)
+            if not events:
+                db.rollback()
+                return 0
+            lag_seconds = (datetime.utcnow() - events[0].created_at).total_seconds()
+            self.sink.publish([_message(event) for event in events])
+            repository.mark_published([event.id for event in events])
+            db.commit()
+            elapsed = time.perf_counter() - started
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._published += len(events)
+            self._batches += 1
+            self._busy_seconds += elapsed
+            self._lag_seconds = lag_seconds
+        logger.debug("Outbox batch published", events=len(events), seconds=round(elapsed, 4))
+        return len(events)
+
+    def drain(self) -> int:
+        """Publish batches until the outbox is empty (or only rows locked by another relay remain)."""
+        total = 0
+        while True:
+            published = self.relay_batch()
+            total += published
+            if published < self.batch_size:
+                return total
+
+    def purge(self, keep: timedelta, batch_size: int = 10000) -> int:
+        """Delete events published longer ago than keep, batch_size rows per transaction."""
+        cutoff = datetime.utcnow() - keep
+        total = 0
+        while True:
+            db = self.session_factory()
+            try:
+                deleted = OutboxRepository(db).purge_published(cutoff, batch_size)
+            finally:
+                db.close()
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "published": self._published,
+                "batches": self._batches,
+                "failures": self._failures,
+                "events_per_second": round(self._published / self._busy_seconds, 1) if self._busy_seconds else 0.0,
+                # Age of the oldest event in the last batch when it was claimed
+                "lag_seconds": round(self._lag_seconds, 3),
+            }
@@ -1,8 +1,36 @@
 from sqlalchemy.orm import Session
+from app.cache import entity_cache
 from app.models.author import Author
 from app.schemas.author import AuthorCreate
 
+author_cache = entity_cache("author", version=1)
+
 class AuthorRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @staticmethod
+    def _snapshot(author: Author) -> dict:
+        return {
+            "id": author.id,
+            "name": author.name,
+            "biography": author.biography,
+            "nationality": author.nationality,
+        }
+
+    def get_by_id(self, author_id: int):
+        """Cached, detached Author; don't modify it or add it to a session."""
+        def load():
+            author = self.db.query(Author).filter(Author.id == author_id).first()
+            return self._snapshot(author) if author else None
+
+        values = author_cache.get_or_load(author_id, load)
+        return Author(**values) if values else None
+
+    def create(self, author: AuthorCreate):
+        db_author = Author(**author.dict())
+        self.db.add(db_author)
+        self.db.commit()
+        self.db.refresh(db_author)
+        author_cache.put(db_author.id, self._snapshot(db_author))
+        return db_author
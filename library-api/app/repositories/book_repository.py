@@ -1,41 +1,253 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import delete, exists, select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, joinedload
+from app.cache import count_cache, entity_cache
+from app.models.author import Author
 from app.models.book import Book
+from app.models.book_copy import BookCopy
+from app.models.book_related import BookRelated
+from app.models.hold import Hold
 from app.models.loan import Loan
+from app.models.loan_archive import LoanArchive
+from app.repositories.outbox_repository import OutboxRepository
 from app.schemas.book import BookCreate
 
+# Catalogue fields only: availability and copy counts change on every checkout
+# and are read with check_availability instead. Bump the version when the shape changes.
+book_cache = entity_cache("book", version=1)
+
+# Fields a listing can be narrowed to (?fields=...), and the column each one reads
+BOOK_FIELD_COLUMNS = {
+    "id": Book.id,
+    "name": Book.name,
+    "description": Book.description,
+    "pages": Book.pages,
+    "author_id": Book.author_id,
+    "author.id": Author.id,
+    "author.name": Author.name,
+    "author.biography": Author.biography,
+    "author.nationality": Author.nationality,
+}
+
+# Copy statuses from active loans and ready holds, then the book counters from
+# the copies; each statement only rewrites rows that drifted
+RECONCILE_COPIES_SQL = text("""
+    WITH actual AS (
+        SELECT book_copy.id,
+               CASE WHEN EXISTS (
+                        SELECT 1 FROM loan WHERE loan.copy_id = book_copy.id AND loan.status = 'active'
+                    ) THEN 'on_loan'
+                    WHEN EXISTS (
+                        SELECT 1 FROM hold WHERE hold.id = book_copy.hold_id AND hold.status = 'ready'
+                    ) THEN 'reserved'
+                    ELSE 'available' END AS status
+        FROM book_copy
+        WHERE book_copy.status <> 'withdrawn'
+    )
+    UPDATE book_copy
+    SET status = actual.status,
+        hold_id = CASE WHEN actual.status = 'reserved' THEN book_copy.hold_id END
+    FROM actual
+    WHERE book_copy.id = actual.id AND book_copy.status <> actual.status
+""")
+
+RECONCILE_AVAILABILITY_SQL = text("""
+    WITH actual AS (
+        SELECT book.id,
+               count(book_copy.id) FILTER (WHERE book_copy.status <> 'withdrawn') AS total_copies,
+               count(book_copy.id) FILTER (WHERE book_copy.status = 'available') AS available_copies
+        FROM book
+        LEFT JOIN book_copy ON book_copy.book_id = book.id
+        GROUP BY book.id
+    )
+    UPDATE book
+    SET total_copies = actual.total_copies, available_copies = actual.available_copies
+    FROM actual
+    WHERE book.id = actual.id
+      AND (book.total_copies <> actual.total_copies OR book.available_copies <> actual.available_copies)
+""")
+
+class BookInUseError(Exception):
+    def __init__(self, book_id: int):
+        super().__init__(f"Book {book_id} has copies on loan")
+        self.book_id = book_id
+
 class BookRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 10):
-        return self.db.query(Book).offset(skip).limit(limit).all()
+    def _filtered_query(self, available: Optional[bool] = None):
+        query = self.db.query(Book).filter(Book.deleted_at.is_(None))
+        if available is not None:
+            query = query.filter(Book.available == available)
+        return query
+
+    def get_fields(self, fields: List[str], skip: int = 0, limit: int = 10, available: Optional[bool] = None):
+        """Only the columns behind `fields` (keys of BOOK_FIELD_COLUMNS), joining author when one of its fields is asked for."""
+        query = self.db.query(*(BOOK_FIELD_COLUMNS[field].label(field) for field in fields))
+        if any(field.startswith("author.") for field in fields):
+            query = query.join(Author, Author.id == Book.author_id)
+        else:
+            query = query.select_from(Book)
+        query = query.filter(Book.deleted_at.is_(None))
+        if available is not None:
+            query = query.filter(Book.available == available)
+        return query.order_by(Book.id).offset(skip).limit(limit).all()
 
-    def get_total_count(self):
-        return self.db.query(Book).count()
+    def get_total_count(self, available: Optional[bool] = None):
+        return count_cache.get_or_count(("books", available), self._filtered_query(available).count)
+
+    def stream(self, batch_size: int = 1000, available: Optional[bool] = None):
+        """Iterate over all books (or only those that are, or are not, available) through a server-side cursor, batch_size rows at a time."""
+        return self._filtered_query(available).order_by(Book.id).yield_per(batch_size)
+
+    @staticmethod
+    def _snapshot(book: Book) -> dict:
+        author = book.author
+        return {
+            "id": book.id,
+            "name": book.name,
+            "description": book.description,
+            "pages": book.pages,
+            "author_id": book.author_id,
+            "author": {
+                "id": author.id,
+                "name": author.name,
+                "biography": author.biography,
+                "nationality": author.nationality,
+            } if author else None,
+        }
+
+    @staticmethod
+    def _from_snapshot(values: dict) -> Book:
+        values = dict(values)
+        author = values.pop("author")
+        return Book(**values, author=Author(**author) if author else None)
 
     def get_by_id(self, book_id: int):
-        return self.db.query(Book).filter(Book.id == book_id).first()
+        """Cached, detached Book without availability or copy counts; don't modify or add it to a session."""
+        def load():
+            book = self.db.query(Book).options(joinedload(Book.author)).filter(
+                Book.id == book_id,
+                Book.deleted_at.is_(None)
+            ).first()
+            return self._snapshot(book) if book else None
+
+        values = book_cache.get_or_load(book_id, load)
+        return self._from_snapshot(values) if values else None
 
     def create(self, book: BookCreate):
-        db_book = Book(**book.dict())
+        db_book = Book(
+            **book.dict(exclude={"copies"}),
+            total_copies=book.copies,
+            available_copies=book.copies
+        )
         self.db.add(db_book)
+        self.db.flush()
+        self.db.add_all([BookCopy(book_id=db_book.id) for _ in range(book.copies)])
+        OutboxRepository(self.db).add_book_created(db_book)
         self.db.commit()
         self.db.refresh(db_book)
+        book_cache.put(db_book.id, self._snapshot(db_book))
+        count_cache.invalidate("books")
         return db_book
 
-    def delete(self, book_id: int):
-        book = self.get_by_id(book_id)
-        if book:
-            self.db.delete(book)
-            self.db.commit()
+    def soft_delete(self, book_id: int) -> Optional[Book]:
+        """Take a book out of the catalogue; None when there is no such book.
+
+        Its open holds are cancelled and its copies withdrawn, so it can no
+        longer be lent or held. Raises BookInUseError while a copy is on loan,
+        or is being checked out or returned.
+        """
+        book = self.db.query(Book).filter(Book.id == book_id, Book.deleted_at.is_(None)).with_for_update().first()
+        if book is None:
+            self.db.rollback()
+            return None
+        # NOWAIT: a checkout locks its copy before the book, so waiting here could deadlock with it
+        try:
+            statuses = self.db.execute(
+                select(BookCopy.status).where(BookCopy.book_id == book_id).with_for_update(nowait=True)
+            ).scalars().all()
+        except OperationalError:
+            self.db.rollback()
+            raise BookInUseError(book_id)
+        if "on_loan" in statuses:
+            self.db.rollback()
+            raise BookInUseError(book_id)
+
+        self.db.execute(
+            update(Hold)
+            .where(Hold.book_id == book_id, Hold.status.in_(("waiting", "ready")))
+            .values(status="cancelled")
+        )
+        self.db.execute(
+            update(BookCopy)
+            .where(BookCopy.book_id == book_id, BookCopy.status != "withdrawn")
+            .values(status="withdrawn", hold_id=None)
+        )
+        book.total_copies = 0
+        book.available_copies = 0
+        book.deleted_at = datetime.utcnow()
+        OutboxRepository(self.db).add_book_deleted(book)
+        self.db.commit()
+        book_cache.invalidate(book_id)
+        count_cache.invalidate("books")
         return book
 
+    def purge_deleted(self, deleted_before: datetime, batch_size: int = 100) -> int:
+        """Hard-delete one batch of books soft-deleted before deleted_before; returns how many went.
+
+        Books that were ever lent stay as tombstones so loan history keeps
+        its references. Every delete goes through an indexed foreign key
+        column; book_copy rows follow through ON DELETE CASCADE.
+        """
+        book_ids = self.db.execute(
+            select(Book.id)
+            .where(
+                Book.deleted_at < deleted_before,
+                ~exists().where(Loan.book_id == Book.id),
+                ~exists().where(LoanArchive.book_id == Book.id)
+            )
+            .order_by(Book.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not book_ids:
+            self.db.rollback()
+            return 0
+        self.db.execute(delete(BookRelated).where(BookRelated.book_id.in_(book_ids)))
+        self.db.execute(delete(Hold).where(Hold.book_id.in_(book_ids)))
+        self.db.execute(delete(Book).where(Book.id.in_(book_ids)))
+        self.db.commit()
+        return len(book_ids)
+
     def check_availability(self, book_id: int):
-        active_loan = self.db.query(Loan).filter(
-            Loan.book_id == book_id,
-            Loan.status == "active"
-        ).first()
+        row = self.db.query(
+            Book.name, Book.available, Book.available_copies, Book.total_copies
+        ).filter(Book.id == book_id, Book.deleted_at.is_(None)).first()
+        if row is None:
+            return None
         return {
-            "available": active_loan is None,
-            "current_loan_id": active_loan.id if active_loan else None
-        }
\ No newline at end of file
+            "name": row.name,
+            "available": row.available,
+            "available_copies": row.available_copies,
+            "total_copies": row.total_copies
+        }
+
+    def get_availability_batch(self, book_ids: List[int]):
+        return self.db.query(
+            Book.id, Book.name, Book.available, Book.available_copies, Book.total_copies
+        ).filter(Book.id.in_(book_ids), Book.deleted_at.is_(None)).order_by(Book.id).all()
+
+    def reconcile_availability(self) -> int:
+        """Recompute copy statuses from loans and holds, and the book counters from copies.
+
+        Returns the number of repaired rows (copies and books).
+        """
+        repaired = self.db.execute(RECONCILE_COPIES_SQL).rowcount
+        repaired += self.db.execute(RECONCILE_AVAILABILITY_SQL).rowcount
+        self.db.commit()
+        count_cache.invalidate("books")
+        return repaired
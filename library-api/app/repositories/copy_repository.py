@@ -0,0 +1,71 @@
+from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.cache import count_cache
+from app.models.book import Book
+from app.models.book_copy import BookCopy
+from app.repositories.hold_repository import DEFAULT_PICKUP_HOURS, HoldRepository
+
+class CopyNotAvailableError(Exception):
+    def __init__(self, copy_id: int, status: str):
+        super().__init__(f"Copy {copy_id} is {status}")
+        self.copy_id = copy_id
+        self.status = status
+
+class CopyRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_book(self, book_id: int, skip: int = 0, limit: int = 10):
+        return self.db.query(
+            BookCopy.id, BookCopy.book_id, BookCopy.status, BookCopy.hold_id, BookCopy.created_at
+        ).filter(BookCopy.book_id == book_id).order_by(BookCopy.id).offset(skip).limit(limit).all()
+
+    def get_count_by_book(self, book_id: int) -> int:
+        return self.db.query(BookCopy).filter(BookCopy.book_id == book_id).count()
+
+    def add(self, book_id: int, count: int, pickup_hours: int = DEFAULT_PICKUP_HOURS) -> Optional[List[BookCopy]]:
+        """Add count copies to a book; None when it does not exist.
+
+        New copies are released like returned ones, so they go to waiting
+        holds before reaching the shelf.
+        """
+        book_id = self.db.execute(
+            select(Book.id).where(Book.id == book_id, Book.deleted_at.is_(None)).with_for_update()
+        ).scalar()
+        if book_id is None:
+            self.db.rollback()
+            return None
+        copies = [BookCopy(book_id=book_id) for _ in range(count)]
+        self.db.add_all(copies)
+        self.db.flush()
+        self.db.execute(update(Book).where(Book.id == book_id).values(total_copies=Book.total_copies + count))
+        copy_ids = [copy.id for copy in copies]
+        HoldRepository(self.db).release_copies(copy_ids, pickup_hours)
+        self.db.commit()
+        count_cache.invalidate("books")
+        return self.db.query(BookCopy).filter(BookCopy.id.in_(copy_ids)).order_by(BookCopy.id).populate_existing().all()
+
+    def withdraw(self, book_id: int, copy_id: int) -> Optional[BookCopy]:
+        """Take a copy on the shelf out of circulation; None when the book has no such copy."""
+        copy = self.db.query(BookCopy).filter(
+            BookCopy.id == copy_id,
+            BookCopy.book_id == book_id
+        ).with_for_update().first()
+        if copy is None or copy.status == "withdrawn":
+            self.db.rollback()
+            return None
+        if copy.status != "available":
+            status = copy.status
+            self.db.rollback()
+            raise CopyNotAvailableError(copy_id, status)
+        copy.status = "withdrawn"
+        self.db.execute(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(total_copies=Book.total_copies - 1, available_copies=Book.available_copies - 1)
+        )
+        self.db.commit()
+        count_cache.invalidate("books")
+        self.db.refresh(copy)
+        return copy
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import Integer, column, func, select, text, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.cache import count_cache
+from app.database.listener import HOLD_READY_CHANNEL
+from app.models.book import Book
+from app.models.book_copy import BookCopy
+from app.models.hold import Hold
+from app.models.user import User
+
+# Hours a dispatched copy stays reserved for its holder
+DEFAULT_PICKUP_HOURS = 48
+
+# Consume a ready hold and hand its reserved copy over to the checkout, in one round trip
+FULFILL_SQL = text("""
+    WITH fulfilled AS (
+        UPDATE hold SET status = 'fulfilled'
+        WHERE book_id = :book_id AND user_id = :user_id AND status = 'ready' AND expires_at > :now
+        RETURNING id
+    )
+    UPDATE book_copy SET status = 'on_loan', hold_id = NULL
+    FROM fulfilled
+    WHERE book_copy.hold_id = fulfilled.id
+    RETURNING book_copy.id
+""")
+
+class BookAvailableError(Exception):
+    def __init__(self, book_id: int):
+        super().__init__(f"Book {book_id} is available")
+        self.book_id = book_id
+
+class DuplicateHoldError(Exception):
+    def __init__(self, book_id: int, user_id: int):
+        super().__init__(f"User {user_id} already holds book {book_id}")
+        self.book_id = book_id
+        self.user_id = user_id
+
+class HoldTargetNotFoundError(Exception):
+    """The book or user of a new hold does not exist; entity is "Book" or "User"."""
+
+    def __init__(self, entity: str, entity_id: int):
+        super().__init__(f"{entity} {entity_id} not found")
+        self.entity = entity
+        self.entity_id = entity_id
+
+class HoldRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, hold_id: int):
+        return self.db.query(Hold).filter(Hold.id == hold_id).first()
+
+    def get_position(self, hold: Hold) -> Optional[int]:
+        """1-based place of a waiting hold in its book's queue (an idx_hold_queue range count)."""
+        if hold.status != "waiting":
+            return None
+        return self.db.query(func.count(Hold.id)).filter(
+            Hold.book_id == hold.book_id,
+            Hold.status == "waiting",
+            Hold.id <= hold.id
+        ).scalar()
+
+    def create(self, book_id: int, user_id: int) -> Hold:
+        # Lock the book row so a concurrent return cannot shelve a copy between
+        # the availability check and the insert (it would skip this hold);
+        # release_copies takes the same lock
+        available = self.db.execute(
+            select(Book.available).where(Book.id == book_id, Book.deleted_at.is_(None)).with_for_update()
+        ).scalar()
+        if available is None:
+            self.db.rollback()
+            raise HoldTargetNotFoundError("Book", book_id)
+        if available:
+            self.db.rollback()
+            raise BookAvailableError(book_id)
+        # Key-share lock, as a checkout does, so the user cannot be deleted under the hold
+        user_exists = self.db.execute(
+            select(User.id).where(User.id == user_id, User.deleted_at.is_(None)).with_for_update(key_share=True)
+        ).scalar() is not None
+        if not user_exists:
+            self.db.rollback()
+            raise HoldTargetNotFoundError("User", user_id)
+
+        hold = Hold(book_id=book_id, user_id=user_id)
+        self.db.add(hold)
+        try:
+            self.db.flush()
+        except IntegrityError as e:
+            self.db.rollback()
+            if "uq_hold_open" in str(e.orig):
+                raise DuplicateHoldError(book_id, user_id)
+            raise HoldTargetNotFoundError("User", user_id)
+        self.db.commit()
+        self.db.refresh(hold)
+        return hold
+
+    def cancel(self, hold_id: int, pickup_hours: int = DEFAULT_PICKUP_HOURS) -> Optional[Hold]:
+        """Cancel an open hold; a ready one passes its copy on. None when no open hold has this id."""
+        hold = self.db.query(Hold).filter(
+            Hold.id == hold_id,
+            Hold.status.in_(("waiting", "ready"))
+        ).with_for_update().first()
+        if hold is None:
+            self.db.rollback()
+            return None
+        was_ready = hold.status == "ready"
+        hold.status = "cancelled"
+        self.db.flush()
+        if was_ready:
+            self.release_copies(
+                self.db.execute(select(BookCopy.id).where(BookCopy.hold_id == hold.id)).scalars().all(),
+                pickup_hours
+            )
+        self.db.commit()
+        if was_ready:
+            count_cache.invalidate("books")
+        self.db.refresh(hold)
+        return hold
+
+    def dispatch(self, book_id: int, copy_id: int, pickup_hours: int = DEFAULT_PICKUP_HOURS) -> Optional[int]:
+        """Set a freed copy aside for the first waiting hold; returns its id, or None when nobody waits.
+
+        Waiting holds locked by another transaction (e.g. being cancelled) are
+        skipped rather than waited for. Not committed: runs inside the caller's
+        return transaction, and the holder is notified when it commits.
+        """
+        hold_id = self.db.execute(
+            select(Hold.id)
+            .where(Hold.book_id == book_id, Hold.status == "waiting")
+            .order_by(Hold.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if hold_id is None:
+            return None
+        now = datetime.utcnow()
+        self.db.execute(
+            update(Hold)
+            .where(Hold.id == hold_id)
+            .values(status="ready", ready_at=now, expires_at=now + timedelta(hours=pickup_hours))
+        )
+        self.db.execute(update(BookCopy).where(BookCopy.id == copy_id).values(status="reserved", hold_id=hold_id))
+        self.db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": HOLD_READY_CHANNEL, "payload": str(hold_id)})
+        return hold_id
+
+    def release_copies(self, copy_ids: Iterable[int], pickup_hours: int = DEFAULT_PICKUP_HOURS) -> List[int]:
+        """Free copies nobody has anymore: each goes to its book's next holder, or back on the shelf.
+
+        Copies handed to a holder stay out of available_copies, reserved for
+        them; shelved ones are added back. Returns the ids of the holds made
+        ready. Not committed.
+        """
+        copies = self.db.execute(
+            select(BookCopy.id, BookCopy.book_id).where(BookCopy.id.in_(set(copy_ids))).order_by(BookCopy.id)
+        ).all()
+        if not copies:
+            return []
+        # Same lock as create(), taken in id order so concurrent releases cannot deadlock
+        self.db.execute(
+            select(Book.id).where(Book.id.in_({row.book_id for row in copies})).order_by(Book.id).with_for_update()
+        ).all()
+
+        dispatched = []
+        shelved = {}
+        for row in copies:
+            hold_id = self.dispatch(row.book_id, row.id, pickup_hours)
+            if hold_id is not None:
+                dispatched.append(hold_id)
+            else:
+                shelved.setdefault(row.book_id, []).append(row.id)
+        if shelved:
+            self.db.execute(
+                update(BookCopy)
+                .where(BookCopy.id.in_([copy_id for ids in shelved.values() for copy_id in ids]))
+                .values(status="available", hold_id=None)
+            )
+            counts = values(
+                column("book_id", Integer), column("shelved", Integer), name="counts"
+            ).data([(book_id, len(ids)) for book_id, ids in shelved.items()])
+            self.db.execute(
+                update(Book)
+                .where(Book.id == counts.c.book_id)
+                .values(available_copies=Book.available_copies + counts.c.shelved)
+            )
+        return dispatched
+
+    def fulfill(self, book_id: int, user_id: int) -> Optional[int]:
+        """Consume the user's ready hold on the book at checkout; returns the copy set aside for it, or None. Not committed."""
+        return self.db.execute(
+            FULFILL_SQL, {"book_id": book_id, "user_id": user_id, "now": datetime.utcnow()}
+        ).scalar()
+
+    def expire_ready(self, pickup_hours: int = DEFAULT_PICKUP_HOURS, batch_size: int = 100) -> int:
+        """Expire ready holds past their pickup deadline and pass their copies on; returns how many expired."""
+        expired = self.db.execute(
+            select(Hold.id)
+            .where(Hold.status == "ready", Hold.expires_at <= datetime.utcnow())
+            .order_by(Hold.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not expired:
+            self.db.rollback()
+            return 0
+        expired_ids = [row.id for row in expired]
+        self.db.execute(update(Hold).where(Hold.id.in_(expired_ids)).values(status="expired"))
+        self.release_copies(
+            self.db.execute(select(BookCopy.id).where(BookCopy.hold_id.in_(expired_ids))).scalars().all(),
+            pickup_hours
+        )
+        self.db.commit()
+        count_cache.invalidate("books")
+        return len(expired)
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.idempotency_key import IdempotencyKey
+
+class IdempotencyRepository:
+    """Idempotency keys in Postgres, so a retry that reaches another worker is still recognised.
+
+    claim() leaves its row in the session's open transaction: the create that
+    runs next on the same session commits it, or rolls it back with itself.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _key(self, scope: str, principal: str, key: str):
+        return (IdempotencyKey.scope == scope, IdempotencyKey.principal == principal, IdempotencyKey.key == key)
+
+    def claim(self, scope: str, principal: str, key: str, fingerprint: bytes, expires_at: datetime) -> Optional[Row]:
+        """Take the key for this transaction; None when taken, else the existing (fingerprint, status_code, body).
+
+        A key still held by another open transaction makes this wait on the
+        primary key until that transaction ends. Expired keys are taken over.
+        When the key is not taken, the transaction is ended so no lock is kept.
+        """
+        now = datetime.utcnow()
+        stmt = insert(IdempotencyKey).values(
+            scope=scope, principal=principal, key=key, fingerprint=fingerprint, created_at=now, expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.scope, IdempotencyKey.principal, IdempotencyKey.key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "status_code": None,
+                "body": None,
+                "created_at": stmt.excluded.created_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now
+        ).returning(IdempotencyKey.key)
+        if self.db.execute(stmt).first() is not None:
+            return None
+        existing = self.db.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body)
+            .where(*self._key(scope, principal, key))
+        ).first()
+        self.db.rollback()
+        return existing
+
+    def complete(self, scope: str, principal: str, key: str, status_code: int, body: bytes) -> None:
+        """Store the outcome of a create that committed together with its claim."""
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(*self._key(scope, principal, key))
+            .values(status_code=status_code, body=body)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def remember(self, scope: str, principal: str, key: str, fingerprint: bytes, expires_at: datetime, status_code: int, body: bytes) -> None:
+        """Store a client error. Whatever the failed create left in the transaction, the claim included, is rolled back first."""
+        self.db.rollback()
+        self.db.execute(
+            insert(IdempotencyKey)
+            .values(
+                scope=scope, principal=principal, key=key, fingerprint=fingerprint, status_code=status_code,
+                body=body, created_at=datetime.utcnow(), expires_at=expires_at
+            )
+            .on_conflict_do_nothing()
+        )
+        self.db.commit()
+
+    def release(self) -> None:
+        """Roll back a failed create together with its claim, so a retry runs it again.
+
+        A claim that already committed with its create is kept, status_code
+        still null, so the create never runs twice; retries get 409 until it expires.
+        """
+        self.db.rollback()
+
+    def purge_expired(self, limit: int) -> int:
+        """Delete up to limit expired keys; returns how many went."""
+        doomed = (
+            select(IdempotencyKey.scope, IdempotencyKey.principal, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < datetime.utcnow())
+            .limit(limit)
+        )
+        deleted = self.db.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.scope, IdempotencyKey.principal, IdempotencyKey.key).in_(doomed))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return deleted
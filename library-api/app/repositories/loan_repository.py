@@ -1,70 +1,523 @@
+from itertools import chain
+from sqlalchemy import Integer, Numeric, String, column, exists, extract, func, literal, select, text, union_all, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from app.cache import count_cache
+from app.fines import FinePolicy
 from app.models.loan import Loan
+from app.models.loan_archive import LoanArchive
 from app.models.book import Book
+from app.models.book_copy import BookCopy
+from app.models.hold import Hold
 from app.models.user import User
+from app.models.user_loan_summary import UserLoanSummary
+from app.repositories.hold_repository import HoldRepository
+from app.repositories.outbox_repository import OutboxRepository
 from app.schemas.loan import LoanCreate
 from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+HISTORY_COLUMNS = ("id", "book_id", "copy_id", "user_id", "loan_date", "due_date", "return_date", "fine_amount", "status")
+
+# Listings select these instead of Loan entities: rows are cheaper to load and to serialize
+LOAN_COLUMNS = tuple(getattr(Loan, name) for name in HISTORY_COLUMNS)
+
+ARCHIVE_RETURNED_SQL = text("""
+    WITH moved AS (
+        DELETE FROM loan
+        WHERE id IN (
+            SELECT id FROM loan
+            WHERE status = 'returned'
+              AND return_date < now() - make_interval(months => :months)
+            ORDER BY id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, book_id, copy_id, user_id, loan_date, due_date, return_date, fine_amount, status
+    )
+    INSERT INTO loan_archive (id, book_id, copy_id, user_id, loan_date, due_date, return_date, fine_amount, status)
+    SELECT id, book_id, copy_id, user_id, loan_date, due_date, return_date, fine_amount, status FROM moved
+""")
+
+# Take the first free copy of a book and count it out, in one round trip. SKIP
+# LOCKED lets concurrent checkouts of a title claim different copies instead of
+# queueing on the same one.
+CLAIM_COPY_SQL = text("""
+    WITH picked AS (
+        SELECT id FROM book_copy
+        WHERE book_id = :book_id AND status = 'available'
+        ORDER BY id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ), claimed AS (
+        UPDATE book_copy SET status = 'on_loan'
+        FROM picked
+        WHERE book_copy.id = picked.id
+        RETURNING book_copy.id
+    ), counted AS (
+        UPDATE book SET available_copies = available_copies - 1
+        WHERE id = :book_id AND EXISTS (SELECT 1 FROM claimed)
+    )
+    SELECT id FROM claimed
+""")
+
+# Up to n free copies of each requested book, locked for a batch checkout
+LOCK_FREE_COPIES_SQL = text("""
+    SELECT copy.id, copy.book_id
+    FROM unnest(CAST(:book_ids AS integer[]), CAST(:wanted AS integer[])) AS wanted (book_id, n)
+    CROSS JOIN LATERAL (
+        SELECT id, book_id FROM book_copy
+        WHERE book_copy.book_id = wanted.book_id AND book_copy.status = 'available'
+        ORDER BY id
+        LIMIT wanted.n
+        FOR UPDATE SKIP LOCKED
+    ) AS copy
+""")
+
+class BookNotFoundError(Exception):
+    def __init__(self, book_id: int):
+        super().__init__(f"Book {book_id} not found")
+        self.book_id = book_id
+
+class BookUnavailableError(Exception):
+    def __init__(self, book_id: int):
+        super().__init__(f"Book {book_id} is not available")
+        self.book_id = book_id
+
+class UserNotFoundError(Exception):
+    def __init__(self, user_id: int):
+        super().__init__(f"User {user_id} not found")
+        self.user_id = user_id
+
+class LoanLimitExceededError(Exception):
+    def __init__(self, user_id: int, limit: int):
+        super().__init__(f"User {user_id} already has {limit} active loans")
+        self.user_id = user_id
+        self.limit = limit
 
 class LoanRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 10):
-        return self.db.query(Loan).offset(skip).limit(limit).all()
+    def _history(self, user_id: Optional[int] = None):
+        """Hot and archived loans as one UNION ALL subquery with the loan columns."""
+        selects = []
+        for table in (Loan, LoanArchive):
+            stmt = select(*(getattr(table, name) for name in HISTORY_COLUMNS))
+            if user_id is not None:
+                stmt = stmt.where(table.user_id == user_id)
+            selects.append(stmt)
+        return union_all(*selects).subquery("loan_history")
+
+    def get_all(self, skip: int = 0, limit: int = 10, include_archived: bool = False):
+        if not include_archived:
+            return self.db.execute(select(*LOAN_COLUMNS).order_by(Loan.id).offset(skip).limit(limit)).all()
+        # Loans keep their id in the archive, so id orders both tables alike and
+        # the pages come from a merge of the two primary keys
+        history = self._history()
+        return self.db.execute(select(history).order_by(history.c.id).offset(skip).limit(limit)).all()
 
-    def get_total_count(self):
-        return self.db.query(Loan).count()
+    def get_total_count(self, include_archived: bool = False):
+        def count():
+            total = self.db.query(Loan).count()
+            if include_archived:
+                total += self.db.query(LoanArchive).count()
+            return total
+        return count_cache.get_or_count(("loans", include_archived), count)
 
     def get_by_id(self, loan_id: int):
         return self.db.query(Loan).filter(Loan.id == loan_id).first()
 
-    def create(self, loan: LoanCreate):
+    def _reserve_loan_slot(self, user_id: int, max_active_loans: int) -> bool:
+        # One upsert both enforces the active-loan limit and bumps the counters.
+        # When the user is already at the limit the WHERE clause skips the
+        # update and nothing is returned. The row comes from the live user,
+        # key-share locked so a concurrent soft delete waits for this loan
+        # (and then refuses) or wins and leaves nothing to insert.
+        live_user = (
+            select(User.id, literal(1), literal(1))
+            .where(User.id == user_id, User.deleted_at.is_(None))
+            .with_for_update(key_share=True)
+        )
+        stmt = insert(UserLoanSummary).from_select(["user_id", "active_loans", "total_loans"], live_user)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserLoanSummary.user_id],
+            set_={
+                "active_loans": UserLoanSummary.active_loans + 1,
+                "total_loans": UserLoanSummary.total_loans + 1,
+            },
+            where=UserLoanSummary.active_loans < max_active_loans
+        ).returning(UserLoanSummary.user_id)
+        return self.db.execute(stmt).first() is not None
+
+    def create(self, loan: LoanCreate, max_active_loans: int = 3):
+        if not self._reserve_loan_slot(loan.user_id, max_active_loans):
+            user_exists = self.db.query(
+                exists().where(User.id == loan.user_id, User.deleted_at.is_(None))
+            ).scalar()
+            self.db.rollback()
+            if not user_exists:
+                raise UserNotFoundError(loan.user_id)
+            raise LoanLimitExceededError(loan.user_id, max_active_loans)
+
+        # A patron with a ready hold takes the copy set aside for them; anyone
+        # else claims a free copy, which is the availability check
+        copy_id = HoldRepository(self.db).fulfill(loan.book_id, loan.user_id)
+        if copy_id is None:
+            copy_id = self.db.execute(CLAIM_COPY_SQL, {"book_id": loan.book_id}).scalar()
+        if copy_id is None:
+            self.db.rollback()
+            if self.db.query(Book.id).filter(Book.id == loan.book_id, Book.deleted_at.is_(None)).first() is None:
+                raise BookNotFoundError(loan.book_id)
+            raise BookUnavailableError(loan.book_id)
+
         # Calculate due date as 14 days from now
         due_date = datetime.utcnow() + timedelta(days=14)
         
         loan_data = loan.dict()
         loan_data['due_date'] = due_date
+        loan_data['copy_id'] = copy_id
         
         db_loan = Loan(**loan_data)
         self.db.add(db_loan)
+        self.db.flush()
+        OutboxRepository(self.db).add_loan_events("loan.created", [db_loan])
         self.db.commit()
+        count_cache.invalidate("loans", "books")
         self.db.refresh(db_loan)
         return db_loan
 
-    def return_book(self, loan_id: int, fine_amount: float = 0.0):
-        loan = self.get_by_id(loan_id)
+    def return_book(self, loan_id: int, fine_amount: Decimal = Decimal("0.00")):
+        # Lock (and re-read) the loan so a concurrent return of it cannot
+        # shelve its copy twice
+        loan = self.db.query(Loan).filter(Loan.id == loan_id).populate_existing().with_for_update().first()
         if loan and loan.status == "active":
             loan.return_date = datetime.utcnow()
             loan.fine_amount = fine_amount
             loan.status = "returned"
+            HoldRepository(self.db).release_copies([loan.copy_id])
+            OutboxRepository(self.db).add_loan_events("loan.returned", [loan])
+            self.db.execute(
+                update(UserLoanSummary)
+                .where(UserLoanSummary.user_id == loan.user_id)
+                .values(
+                    active_loans=func.greatest(UserLoanSummary.active_loans - 1, 0),
+                    outstanding_fines=UserLoanSummary.outstanding_fines + fine_amount
+                )
+            )
             self.db.commit()
+            count_cache.invalidate("loans", "books")
         return loan
 
+    def _active_query(self):
+        return self.db.query(Loan).filter(Loan.status == "active")
+
+    def _overdue_query(self):
+        # Compare the bare column so idx_loan_active_loan_date can serve the range
+        cutoff = datetime.utcnow() - timedelta(days=14)
+        return self.db.query(Loan).filter(
+            Loan.status == "active",
+            Loan.loan_date < cutoff
+        )
+
+    def _user_query(self, user_id: int):
+        return self.db.query(Loan).filter(Loan.user_id == user_id)
+
+    def create_batch(self, loans: List[LoanCreate], max_active_loans: int = 3) -> List[Tuple[Optional[Loan], Optional[str]]]:
+        """Create many loans in one transaction, skipping the ones that fail validation.
+
+        User counters and enough free copies for every item are read and
+        locked with one query each, the items are validated in order against
+        those snapshots, and the accepted loans are written with set-based
+        statements. Returns one (loan, error) pair per item; error is one of
+        "user_not_found", "loan_limit", "book_not_found" or "book_unavailable".
+        """
+        book_ids = {item.book_id for item in loans}
+        user_ids = {item.user_id for item in loans}
+
+        # Make sure every live user has a counter row to lock, key-share
+        # locking the users against a concurrent soft delete
+        live_users = set(self.db.execute(
+            select(User.id)
+            .where(User.id.in_(user_ids), User.deleted_at.is_(None))
+            .with_for_update(key_share=True)
+        ).scalars())
+        if live_users:
+            self.db.execute(
+                insert(UserLoanSummary)
+                .values([{"user_id": user_id} for user_id in live_users])
+                .on_conflict_do_nothing()
+            )
+        active_by_user = dict(self.db.execute(
+            select(UserLoanSummary.user_id, UserLoanSummary.active_loans)
+            .where(UserLoanSummary.user_id.in_(live_users))
+            .with_for_update()
+        ).all())
+        existing_books = set(self.db.execute(
+            select(Book.id).where(Book.id.in_(book_ids), Book.deleted_at.is_(None))
+        ).scalars())
+        # Books with a copy set aside for one of these users by a ready hold
+        ready_holds = set(self.db.execute(
+            select(Hold.book_id, Hold.user_id)
+            .where(
+                Hold.book_id.in_(book_ids),
+                Hold.user_id.in_(user_ids),
+                Hold.status == "ready",
+                Hold.expires_at > datetime.utcnow()
+            )
+        ).all())
+        wanted = {}
+        for item in loans:
+            if (item.book_id, item.user_id) not in ready_holds:
+                wanted[item.book_id] = wanted.get(item.book_id, 0) + 1
+        free_copies = {}
+        if wanted:
+            for copy_id, book_id in self.db.execute(
+                LOCK_FREE_COPIES_SQL, {"book_ids": list(wanted), "wanted": list(wanted.values())}
+            ).all():
+                free_copies.setdefault(book_id, []).append(copy_id)
+        for copies in free_copies.values():
+            copies.sort()
+
+        hold_repository = HoldRepository(self.db)
+        due_date = datetime.utcnow() + timedelta(days=14)
+        results: List[Tuple[Optional[Loan], Optional[str]]] = []
+        accepted: List[Loan] = []
+        claimed: List[Tuple[int, int]] = []
+        for item in loans:
+            error = None
+            copy_id = None
+            if item.user_id not in active_by_user:
+                error = "user_not_found"
+            elif active_by_user[item.user_id] >= max_active_loans:
+                error = "loan_limit"
+            elif item.book_id not in existing_books:
+                error = "book_not_found"
+            else:
+                if (item.book_id, item.user_id) in ready_holds:
+                    ready_holds.discard((item.book_id, item.user_id))
+                    copy_id = hold_repository.fulfill(item.book_id, item.user_id)
+                if copy_id is None and free_copies.get(item.book_id):
+                    copy_id = free_copies[item.book_id].pop(0)
+                    claimed.append((item.book_id, copy_id))
+                if copy_id is None:
+                    error = "book_unavailable"
+
+            if error:
+                results.append((None, error))
+                continue
+
+            active_by_user[item.user_id] += 1
+            db_loan = Loan(book_id=item.book_id, copy_id=copy_id, user_id=item.user_id, due_date=due_date)
+            accepted.append(db_loan)
+            results.append((db_loan, None))
+
+        if not accepted:
+            self.db.rollback()
+            return results
+
+        self.db.add_all(accepted)
+        self.db.flush()
+        OutboxRepository(self.db).add_loan_events("loan.created", accepted)
+
+        if claimed:
+            self.db.execute(
+                update(BookCopy).where(BookCopy.id.in_([copy_id for _, copy_id in claimed])).values(status="on_loan")
+            )
+            claimed_by_book = {}
+            for book_id, _ in claimed:
+                claimed_by_book[book_id] = claimed_by_book.get(book_id, 0) + 1
+            taken = values(
+                column("book_id", Integer), column("taken", Integer), name="taken"
+            ).data(list(claimed_by_book.items()))
+            self.db.execute(
+                update(Book)
+                .where(Book.id == taken.c.book_id)
+                .values(available_copies=Book.available_copies - taken.c.taken)
+            )
+
+        new_loans_by_user = {}
+        for db_loan in accepted:
+            new_loans_by_user[db_loan.user_id] = new_loans_by_user.get(db_loan.user_id, 0) + 1
+        counts = values(
+            column("user_id", Integer), column("new_loans", Integer), name="counts"
+        ).data(list(new_loans_by_user.items()))
+        self.db.execute(
+            update(UserLoanSummary)
+            .where(UserLoanSummary.user_id == counts.c.user_id)
+            .values(
+                active_loans=UserLoanSummary.active_loans + counts.c.new_loans,
+                total_loans=UserLoanSummary.total_loans + counts.c.new_loans
+            )
+        )
+
+        accepted_ids = [db_loan.id for db_loan in accepted]
+        self.db.commit()
+        count_cache.invalidate("loans", "books")
+        self._reload(accepted_ids)
+        return results
+
+    def return_batch(
+        self, loan_ids: List[int], calculate_fines: Callable[[List[Tuple[datetime, str]]], List[Decimal]]
+    ) -> List[Optional[Loan]]:
+        """Return many loans in one transaction; one loan (or None if not active) per id.
+
+        calculate_fines receives the (due date, borrower's fine tier) of all
+        returnable loans at once and must return their fines in the same order.
+        """
+        active = {
+            loan.id: loan
+            for loan in self.db.query(Loan).filter(
+                Loan.id.in_(set(loan_ids)),
+                Loan.status == "active"
+            ).with_for_update().all()
+        }
+
+        returning: List[Loan] = []
+        results: List[Optional[Loan]] = []
+        for loan_id in loan_ids:
+            # pop() so a duplicated id is only returned once
+            loan = active.pop(loan_id, None)
+            if loan is not None:
+                returning.append(loan)
+            results.append(loan)
+
+        if not returning:
+            self.db.rollback()
+            return results
+
+        return_date = datetime.utcnow()
+        tiers = self.get_fine_tiers(loan.user_id for loan in returning)
+        fines = calculate_fines([(loan.due_date, tiers.get(loan.user_id)) for loan in returning])
+        totals_by_user = {}
+        for loan, fine_amount in zip(returning, fines):
+            loan.return_date = return_date
+            loan.fine_amount = fine_amount
+            loan.status = "returned"
+            returned, fines_total = totals_by_user.get(loan.user_id, (0, Decimal("0.00")))
+            totals_by_user[loan.user_id] = (returned + 1, fines_total + fine_amount)
+
+        HoldRepository(self.db).release_copies(loan.copy_id for loan in returning)
+        OutboxRepository(self.db).add_loan_events("loan.returned", returning)
+        totals = values(
+            column("user_id", Integer), column("returned", Integer), column("fines", Numeric(10, 2)), name="totals"
+        ).data([(user_id, returned, fines_total) for user_id, (returned, fines_total) in totals_by_user.items()])
+        self.db.execute(
+            update(UserLoanSummary)
+            .where(UserLoanSummary.user_id == totals.c.user_id)
+            .values(
+                active_loans=func.greatest(UserLoanSummary.active_loans - totals.c.returned, 0),
+                outstanding_fines=UserLoanSummary.outstanding_fines + totals.c.fines
+            )
+        )
+
+        returned_ids = [loan.id for loan in returning]
+        self.db.commit()
+        count_cache.invalidate("loans", "books")
+        self._reload(returned_ids)
+        return results
+
+    def _reload(self, loan_ids: List[int]) -> None:
+        # Commit expires the instances; reload them all with one query instead
+        # of one lazy refresh per loan.
+        self.db.query(Loan).filter(Loan.id.in_(loan_ids)).all()
+
+    def get_fine_tier(self, user_id: int) -> Optional[str]:
+        return self.db.execute(select(User.fine_tier).where(User.id == user_id)).scalar()
+
+    def get_fine_tiers(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        return dict(self.db.execute(select(User.id, User.fine_tier).where(User.id.in_(set(user_ids)))).all())
+
+    def project_fines(self, policy: FinePolicy, now: datetime):
+        """Price every overdue active loan under policy as of now, in one statement.
+
+        Returns one (tier, loans, total) row per borrower fine tier. The SQL
+        mirrors FinePolicy.fine: whole days past due less the grace days, at
+        the tier's rate, capped at the tier's maximum.
+        """
+        days_charged = func.greatest(extract("day", literal(now) - Loan.due_date) - policy.grace_days, 0)
+        daily_rate = literal(policy.default_rate.daily_rate, Numeric(10, 2))
+        max_fine = literal(policy.default_rate.max_fine, Numeric(10, 2))
+        borrowers = Loan.__table__.join(User, User.id == Loan.user_id)
+        if policy.tiers:
+            tiers = values(
+                column("tier", String), column("daily_rate", Numeric(10, 2)), column("max_fine", Numeric(10, 2)), name="tiers"
+            ).data([(tier, rate.daily_rate, rate.max_fine) for tier, rate in policy.tiers.items()])
+            borrowers = borrowers.outerjoin(tiers, tiers.c.tier == User.fine_tier)
+            daily_rate = func.coalesce(tiers.c.daily_rate, daily_rate)
+            # A tier without its own cap keeps the default one, as in FinePolicy
+            max_fine = func.coalesce(tiers.c.max_fine, max_fine)
+        # LEAST ignores NULLs, so without any cap the fine is not capped
+        fine = func.least(days_charged * daily_rate, max_fine)
+        return self.db.execute(
+            select(User.fine_tier.label("tier"), func.count().label("loans"), func.sum(fine).label("total"))
+            .select_from(borrowers)
+            .where(Loan.status == "active", Loan.due_date <= now - timedelta(days=policy.grace_days + 1))
+            .group_by(User.fine_tier)
+            .order_by(User.fine_tier)
+        ).all()
+
     def get_active_loans(self, skip: int = 0, limit: int = 10):
-        return self.db.query(Loan).filter(Loan.status == "active").offset(skip).limit(limit).all()
+        return self._active_query().with_entities(*LOAN_COLUMNS).order_by(Loan.id).offset(skip).limit(limit).all()
 
     def get_active_loans_count(self):
-        return self.db.query(Loan).filter(Loan.status == "active").count()
+        return count_cache.get_or_count(("loans", "active"), self._active_query().count)
 
     def get_overdue_loans(self, skip: int = 0, limit: int = 10):
-        current_time = datetime.utcnow()
-        return self.db.query(Loan).filter(
-            Loan.status == "active",
-            Loan.loan_date + timedelta(days=14) < current_time
-        ).offset(skip).limit(limit).all()
+        return self._overdue_query().with_entities(*LOAN_COLUMNS).order_by(Loan.id).offset(skip).limit(limit).all()
 
     def get_overdue_loans_count(self):
-        current_time = datetime.utcnow()
-        return self.db.query(Loan).filter(
-            Loan.status == "active",
-            Loan.loan_date + timedelta(days=14) < current_time
-        ).count()
+        # Loans also turn overdue with the clock, so this one is only ever up to the TTL late
+        return count_cache.get_or_count(("loans", "overdue"), self._overdue_query().count)
+
+    def get_user_loans(self, user_id: int, skip: int = 0, limit: int = 10, include_archived: bool = False):
+        if not include_archived:
+            return self._user_query(user_id).with_entities(*LOAN_COLUMNS).order_by(Loan.id).offset(skip).limit(limit).all()
+        history = self._history(user_id)
+        return self.db.execute(select(history).order_by(history.c.id).offset(skip).limit(limit)).all()
 
-    def get_user_loans(self, user_id: int, skip: int = 0, limit: int = 10):
-        return self.db.query(Loan).filter(Loan.user_id == user_id).offset(skip).limit(limit).all()
+    def get_user_loans_count(self, user_id: int, include_archived: bool = False):
+        count = self._user_query(user_id).count()
+        if include_archived:
+            count += self.db.query(LoanArchive).filter(LoanArchive.user_id == user_id).count()
+        return count
 
-    def get_user_loans_count(self, user_id: int):
-        return self.db.query(Loan).filter(Loan.user_id == user_id).count()
+    def archive_returned(self, older_than_months: int, batch_size: int = 1000) -> int:
+        """Move one batch of loans returned more than older_than_months ago to loan_archive.
+
+        Returns the number of moved loans; call repeatedly until it returns 0.
+        Rows are locked with SKIP LOCKED, so concurrent movers don't block each other.
+        """
+        moved = self.db.execute(
+            ARCHIVE_RETURNED_SQL, {"months": older_than_months, "batch_size": batch_size}
+        ).rowcount
+        self.db.commit()
+        count_cache.invalidate("loans")
+        return moved
+
+    def stream(self, status: Optional[str] = None, user_id: Optional[int] = None, batch_size: int = 1000, include_archived: bool = False):
+        """Iterate over loans through a server-side cursor, batch_size rows at a time.
+
+        status accepts the same scopes as the list endpoints: "active" or "overdue".
+        Archived loans are all returned, so include_archived only applies without a status.
+        """
+        if status == "active":
+            query = self._active_query()
+        elif status == "overdue":
+            query = self._overdue_query()
+        else:
+            query = self.db.query(Loan)
+        if user_id is not None:
+            query = query.filter(Loan.user_id == user_id)
+        hot = query.order_by(Loan.id).yield_per(batch_size)
+        if status or not include_archived:
+            return hot
+
+        archived = self.db.query(LoanArchive)
+        if user_id is not None:
+            archived = archived.filter(LoanArchive.user_id == user_id)
+        return chain(hot, archived.order_by(LoanArchive.id).yield_per(batch_size))
 
     def get_user_active_loans(self, user_id: int):
         return self.db.query(Loan).filter(
@@ -73,8 +526,8 @@ class LoanRepository:
         ).all()
 
     def check_book_availability(self, book_id: int):
-        active_loan = self.db.query(Loan).filter(
-            Loan.book_id == book_id,
-            Loan.status == "active"
-        ).first()
-        return active_loan is None
\ No newline at end of file
+        row = self.db.query(Book.available).filter(Book.id == book_id).first()
+        return bool(row and row.available)
+
+    def get_available_copies(self, book_ids: Iterable[int]) -> Dict[int, int]:
+        return dict(self.db.query(Book.id, Book.available_copies).filter(Book.id.in_(set(book_ids))).all())
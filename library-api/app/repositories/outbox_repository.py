@@ -0,0 +1,88 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, List
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from app.models.book import Book
+from app.models.loan import Loan
+from app.models.outbox_event import OutboxEvent
+from app.models.user import User
+
+LOAN_EVENT_FIELDS = ("id", "book_id", "copy_id", "user_id", "loan_date", "due_date", "return_date", "fine_amount", "status")
+BOOK_EVENT_FIELDS = ("id", "name", "description", "pages", "author_id", "total_copies")
+# Never the password hash
+USER_EVENT_FIELDS = ("id", "name", "email")
+DELETED_EVENT_FIELDS = ("id", "deleted_at")
+
+def _payload(entity, fields) -> dict:
+    payload = {}
+    for field in fields:
+        value = getattr(entity, field)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            # Money stays exact: "2.50", never 2.4999...
+            value = str(value)
+        payload[field] = value
+    return payload
+
+class OutboxRepository:
+    """Writes domain events into the caller's transaction, and hands them to OutboxRelay.
+
+    The add_* methods only stage rows on the session: they are committed, or
+    rolled back, together with the change they describe. Entities must have
+    been flushed so their ids are known.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_loan_events(self, event_type: str, loans: Iterable[Loan]) -> None:
+        self.db.add_all([
+            OutboxEvent(event_type=event_type, aggregate_id=loan.id, payload=_payload(loan, LOAN_EVENT_FIELDS))
+            for loan in loans
+        ])
+
+    def add_book_created(self, book: Book) -> None:
+        self.db.add(OutboxEvent(event_type="book.created", aggregate_id=book.id, payload=_payload(book, BOOK_EVENT_FIELDS)))
+
+    def add_user_created(self, user: User) -> None:
+        self.db.add(OutboxEvent(event_type="user.created", aggregate_id=user.id, payload=_payload(user, USER_EVENT_FIELDS)))
+
+    def add_book_deleted(self, book: Book) -> None:
+        self.db.add(OutboxEvent(event_type="book.deleted", aggregate_id=book.id, payload=_payload(book, DELETED_EVENT_FIELDS)))
+
+    def add_user_deleted(self, user: User) -> None:
+        self.db.add(OutboxEvent(event_type="user.deleted", aggregate_id=user.id, payload=_payload(user, DELETED_EVENT_FIELDS)))
+
+    def claim_pending(self, limit: int) -> List[OutboxEvent]:
+        """Lock the oldest unpublished events; rows held by another relay are skipped, not waited for."""
+        return self.db.execute(
+            select(OutboxEvent)
+            .where(OutboxEvent.published_at.is_(None))
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+    def mark_published(self, event_ids: List[int]) -> None:
+        self.db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(event_ids))
+            .values(published_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    def purge_published(self, published_before: datetime, limit: int) -> int:
+        """Delete up to limit events published before published_before; returns how many went."""
+        doomed = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.published_at < published_before)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        deleted = self.db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(doomed)).execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return deleted
@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, text
+from sqlalchemy.orm import Session
+from app.models.book import Book
+from app.models.book_related import BookRelated
+from app.models.report import ReportRefresh
+
+RELATED = "book_related"
+
+# Arbitrary constant for pg_advisory_xact_lock, so two refreshes never interleave
+REFRESH_LOCK_KEY = 4001
+
+# Who borrowed what, once per (user, book), over the whole loan history. Two
+# parallel arrays in one row are far cheaper to fetch than a row per pair.
+BORROW_PAIRS_SQL = text("""
+    SELECT coalesce(array_agg(user_id), '{}'), coalesce(array_agg(book_id), '{}')
+    FROM (
+        SELECT user_id, book_id FROM loan
+        UNION
+        SELECT user_id, book_id FROM loan_archive
+    ) AS pairs
+""")
+
+# The same pairs for an incremental refresh: only the readers of the books
+# the given users borrowed, which is all the counts of those books depend on.
+READER_PAIRS_SQL = text("""
+    WITH targets AS (
+        SELECT book_id FROM loan WHERE user_id = ANY(CAST(:user_ids AS integer[]))
+        UNION
+        SELECT book_id FROM loan_archive WHERE user_id = ANY(CAST(:user_ids AS integer[]))
+    ), readers AS (
+        SELECT user_id FROM loan WHERE book_id IN (SELECT book_id FROM targets)
+        UNION
+        SELECT user_id FROM loan_archive WHERE book_id IN (SELECT book_id FROM targets)
+    )
+    SELECT coalesce(array_agg(user_id), '{}'), coalesce(array_agg(book_id), '{}')
+    FROM (
+        SELECT user_id, book_id FROM loan WHERE user_id IN (SELECT user_id FROM readers)
+        UNION
+        SELECT user_id, book_id FROM loan_archive WHERE user_id IN (SELECT user_id FROM readers)
+    ) AS pairs
+""")
+
+INSERT_RELATED_SQL = text("""
+    INSERT INTO book_related (book_id, rank, related_book_id, shared_readers)
+    SELECT * FROM unnest(
+        CAST(:book_ids AS integer[]), CAST(:ranks AS integer[]),
+        CAST(:related_book_ids AS integer[]), CAST(:shared_readers AS integer[])
+    )
+""")
+
+class RecommendationRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_related(self, book_id: int, limit: int = 10):
+        return self.db.query(BookRelated.related_book_id, Book.name, BookRelated.shared_readers).join(
+            Book, Book.id == BookRelated.related_book_id
+        ).filter(
+            BookRelated.book_id == book_id,
+            BookRelated.rank <= limit,
+            Book.deleted_at.is_(None)
+        ).order_by(BookRelated.rank).all()
+
+    def get_refreshed_at(self) -> Optional[datetime]:
+        return self.db.query(ReportRefresh.refreshed_at).filter(ReportRefresh.name == RELATED).scalar()
+
+    def lock_refresh(self) -> datetime:
+        """Serialize refreshes for the rest of the transaction; returns its start time, the next watermark."""
+        self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY})
+        return self.db.execute(text("SELECT now() AT TIME ZONE 'utc'")).scalar()
+
+    def get_borrow_pairs(self, user_ids: Optional[List[int]] = None) -> Tuple[List[int], List[int]]:
+        """Distinct (user, book) borrows as two parallel lists: user ids and book ids.
+
+        With user_ids, only the borrows of users who share a book with one of
+        them; otherwise the whole history.
+        """
+        if user_ids is None:
+            pair_users, pair_books = self.db.execute(BORROW_PAIRS_SQL).one()
+        else:
+            pair_users, pair_books = self.db.execute(READER_PAIRS_SQL, {"user_ids": user_ids}).one()
+        return pair_users, pair_books
+
+    def get_users_borrowing_since(self, since: datetime) -> List[int]:
+        return list(self.db.execute(
+            text("SELECT DISTINCT user_id FROM loan WHERE loan_date >= :since"), {"since": since}
+        ).scalars())
+
+    def replace_related(self, book_ids: Optional[List[int]], columns: Dict[str, List[int]]) -> None:
+        """Swap the neighbours of book_ids (every book when None) for the given rows, not committed.
+
+        columns maps each book_related column to a list of values, one per row.
+        """
+        if book_ids is None:
+            self.db.execute(delete(BookRelated))
+        else:
+            self.db.execute(
+                text("DELETE FROM book_related WHERE book_id = ANY(CAST(:book_ids AS integer[]))"),
+                {"book_ids": book_ids}
+            )
+        if columns["book_ids"]:
+            self.db.execute(INSERT_RELATED_SQL, columns)
+
+    def finish_refresh(self, refreshed_at: datetime) -> None:
+        self.db.execute(
+            text("""
+                INSERT INTO report_refresh (name, refreshed_at) VALUES (:name, :refreshed_at)
+                ON CONFLICT (name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+            """),
+            {"name": RELATED, "refreshed_at": refreshed_at}
+        )
+        self.db.commit()
@@ -0,0 +1,146 @@
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.models.book import Book
+from app.models.report import ReportBookDaily, ReportLoanDaily, ReportNationalityDaily, ReportRefresh, ReportTopBooks
+
+CIRCULATION = "circulation"
+
+# Periods (in days, ending on the refresh day) whose top books are precomputed,
+# and how many ranks are kept for each
+TOP_BOOK_PERIODS = (7, 30, 90, 365)
+TOP_BOOK_RANKS = 100
+
+# Arbitrary constant for pg_advisory_xact_lock, so two refreshes never interleave
+REFRESH_LOCK_KEY = 3401
+
+# One row per loan event (creation or return) on or after :start, tagged with
+# the author's nationality. Archived loans are all returned, so filtering them
+# on return_date also finds the ones created inside the window.
+COLLECT_EVENTS_SQL = text("""
+    CREATE TEMP TABLE report_events ON COMMIT DROP AS
+    SELECT events.day, events.book_id,
+           coalesce(author.nationality, 'unknown') AS nationality,
+           events.created, events.returned, events.late, events.fine
+    FROM (
+        SELECT loan_date::date AS day, book_id, 1 AS created, 0 AS returned, 0 AS late, 0 AS fine
+        FROM loan WHERE loan_date >= :start
+        UNION ALL
+        SELECT return_date::date, book_id, 0, 1, (return_date > due_date)::int, coalesce(fine_amount, 0)
+        FROM loan WHERE status = 'returned' AND return_date >= :start
+        UNION ALL
+        SELECT loan_date::date, book_id, 1, 0, 0, 0
+        FROM loan_archive WHERE return_date >= :start AND loan_date >= :start
+        UNION ALL
+        SELECT return_date::date, book_id, 0, 1, (return_date > due_date)::int, coalesce(fine_amount, 0)
+        FROM loan_archive WHERE return_date >= :start
+    ) AS events
+    LEFT JOIN book ON book.id = events.book_id
+    LEFT JOIN author ON author.id = book.author_id
+""")
+
+REFRESH_STATEMENTS = [
+    text("DELETE FROM report_loan_daily WHERE day >= :start"),
+    text("DELETE FROM report_book_daily WHERE day >= :start"),
+    text("DELETE FROM report_nationality_daily WHERE day >= :start"),
+    text("""
+        INSERT INTO report_loan_daily (day, loans_created, loans_returned, late_returns, fines_total)
+        SELECT day, sum(created), sum(returned), sum(late), sum(fine)
+        FROM report_events GROUP BY day
+    """),
+    text("""
+        INSERT INTO report_book_daily (day, book_id, loans_created)
+        SELECT day, book_id, sum(created)
+        FROM report_events WHERE created = 1 GROUP BY day, book_id
+    """),
+    text("""
+        INSERT INTO report_nationality_daily (day, nationality, loans_created, loans_returned, late_returns, fines_total)
+        SELECT day, nationality, sum(created), sum(returned), sum(late), sum(fine)
+        FROM report_events GROUP BY day, nationality
+    """),
+    text("DELETE FROM report_top_books"),
+    text("""
+        INSERT INTO report_top_books (period_days, rank, book_id, loans)
+        SELECT periods.days, ranked.rank, ranked.book_id, ranked.loans
+        FROM unnest(CAST(:periods AS integer[])) AS periods(days)
+        CROSS JOIN LATERAL (
+            SELECT book_id, sum(loans_created) AS loans,
+                   row_number() OVER (ORDER BY sum(loans_created) DESC, book_id) AS rank
+            FROM report_book_daily
+            WHERE day > (now() AT TIME ZONE 'utc')::date - periods.days
+            GROUP BY book_id
+            ORDER BY loans DESC, book_id
+            LIMIT :ranks
+        ) AS ranked
+    """),
+]
+
+class ReportRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_refreshed_at(self) -> Optional[datetime]:
+        return self.db.query(ReportRefresh.refreshed_at).filter(ReportRefresh.name == CIRCULATION).scalar()
+
+    def refresh(self, start: date) -> int:
+        """Rebuild every rollup row for the days from start on, in one transaction.
+
+        Returns the number of loan events aggregated. The watermark is set to the
+        transaction's start time, so callers can derive the next window from it.
+        """
+        self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY})
+        params = {"start": start, "periods": list(TOP_BOOK_PERIODS), "ranks": TOP_BOOK_RANKS}
+        events = self.db.execute(COLLECT_EVENTS_SQL, params).rowcount
+        for statement in REFRESH_STATEMENTS:
+            self.db.execute(statement, params)
+        self.db.execute(
+            text("""
+                INSERT INTO report_refresh (name, refreshed_at) VALUES (:name, now() AT TIME ZONE 'utc')
+                ON CONFLICT (name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+            """),
+            {"name": CIRCULATION}
+        )
+        self.db.commit()
+        return events
+
+    def get_daily(self, start: date, end: date):
+        return self.db.query(
+            ReportLoanDaily.day,
+            ReportLoanDaily.loans_created,
+            ReportLoanDaily.loans_returned,
+            ReportLoanDaily.late_returns,
+            ReportLoanDaily.fines_total,
+        ).filter(
+            ReportLoanDaily.day.between(start, end)
+        ).order_by(ReportLoanDaily.day).all()
+
+    def get_top_books(self, start: date, end: date, limit: int = 10):
+        loans = func.sum(ReportBookDaily.loans_created).label("loans")
+        top = self.db.query(ReportBookDaily.book_id, loans).filter(
+            ReportBookDaily.day.between(start, end)
+        ).group_by(ReportBookDaily.book_id).order_by(loans.desc(), ReportBookDaily.book_id).limit(limit).subquery()
+
+        # Names are joined only for the top rows
+        return self.db.query(top.c.book_id, Book.name, top.c.loans).outerjoin(
+            Book, Book.id == top.c.book_id
+        ).order_by(top.c.loans.desc(), top.c.book_id).all()
+
+    def get_top_books_for_period(self, period_days: int, limit: int = 10):
+        return self.db.query(ReportTopBooks.book_id, Book.name, ReportTopBooks.loans).outerjoin(
+            Book, Book.id == ReportTopBooks.book_id
+        ).filter(
+            ReportTopBooks.period_days == period_days,
+            ReportTopBooks.rank <= limit
+        ).order_by(ReportTopBooks.rank).all()
+
+    def get_by_nationality(self, start: date, end: date):
+        return self.db.query(
+            ReportNationalityDaily.nationality,
+            func.sum(ReportNationalityDaily.loans_created).label("loans_created"),
+            func.sum(ReportNationalityDaily.loans_returned).label("loans_returned"),
+            func.sum(ReportNationalityDaily.late_returns).label("late_returns"),
+            func.sum(ReportNationalityDaily.fines_total).label("fines_total"),
+        ).filter(
+            ReportNationalityDaily.day.between(start, end)
+        ).group_by(ReportNationalityDaily.nationality).order_by(ReportNationalityDaily.nationality).all()
@@ -0,0 +1,35 @@
+import calendar
+import json
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.database.listener import REVOKED_TOKENS_CHANNEL
+from app.models.revoked_token import RevokedToken
+
+class TokenRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def revoke(self, jti: str, user_id: int, exp: int) -> None:
+        """Record the revocation of a token expiring at exp (epoch seconds) and tell every worker, in one transaction."""
+        self.db.execute(
+            insert(RevokedToken)
+            .values(jti=jti, user_id=user_id, expires_at=datetime.utcfromtimestamp(exp), revoked_at=datetime.utcnow())
+            .on_conflict_do_nothing()
+        )
+        # Rows of expired tokens no longer matter
+        self.db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+        self.db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": REVOKED_TOKENS_CHANNEL, "payload": json.dumps({"jti": jti, "exp": exp})}
+        )
+        self.db.commit()
+
+    def get_revoked(self) -> List[Tuple[str, int]]:
+        """(jti, exp) of every revoked token that has not expired yet."""
+        rows = self.db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at >= datetime.utcnow())
+        ).all()
+        return [(jti, calendar.timegm(expires_at.utctimetuple())) for jti, expires_at in rows]
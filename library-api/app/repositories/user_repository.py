@@ -1,24 +1,171 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, exists, func, select, text, update
 from sqlalchemy.orm import Session
+from app.cache import count_cache, entity_cache
+from app.models.book_copy import BookCopy
+from app.models.hold import Hold
+from app.models.loan import Loan
+from app.models.loan_archive import LoanArchive
 from app.models.user import User
+from app.models.user_loan_summary import UserLoanSummary
+from app.repositories.hold_repository import HoldRepository
+from app.repositories.outbox_repository import OutboxRepository
 from app.schemas.user import UserCreate
 
+RECONCILE_LOAN_SUMMARIES_SQL = text("""
+    INSERT INTO user_loan_summary (user_id, active_loans, total_loans, outstanding_fines)
+    SELECT "user".id,
+           count(history.id) FILTER (WHERE history.status = 'active'),
+           count(history.id),
+           coalesce(sum(history.fine_amount), 0)
+    FROM "user"
+    LEFT JOIN (
+        SELECT id, user_id, status, fine_amount FROM loan
+        UNION ALL
+        SELECT id, user_id, status, fine_amount FROM loan_archive
+    ) AS history ON history.user_id = "user".id
+    GROUP BY "user".id
+    ON CONFLICT (user_id) DO UPDATE
+    SET active_loans = EXCLUDED.active_loans,
+        total_loans = EXCLUDED.total_loans,
+        outstanding_fines = EXCLUDED.outstanding_fines
+    WHERE (user_loan_summary.active_loans, user_loan_summary.total_loans, user_loan_summary.outstanding_fines)
+          IS DISTINCT FROM (EXCLUDED.active_loans, EXCLUDED.total_loans, EXCLUDED.outstanding_fines)
+""")
+
+user_cache = entity_cache("user", version=2)
+
+class UserHasActiveLoansError(Exception):
+    def __init__(self, user_id: int):
+        super().__init__(f"User {user_id} has active loans")
+        self.user_id = user_id
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    def _live_query(self):
+        return self.db.query(User).filter(User.deleted_at.is_(None))
+
     def get_all(self, skip: int = 0, limit: int = 10):
-        return self.db.query(User).offset(skip).limit(limit).all()
+        return self._live_query().with_entities(User.id, User.name, User.email).order_by(User.id).offset(skip).limit(limit).all()
 
     def get_total_count(self):
-        return self.db.query(User).count()
+        return count_cache.get_or_count(("users",), self._live_query().count)
+
+    def stream(self, batch_size: int = 1000):
+        """Iterate over all users through a server-side cursor, batch_size rows at a time."""
+        return self._live_query().order_by(User.id).yield_per(batch_size)
+
+    @staticmethod
+    def _snapshot(user: User) -> dict:
+        # No password hash: it must not leave the database for a shared cache
+        return {"id": user.id, "name": user.name, "email": user.email}
 
     def get_by_id(self, user_id: int):
-        return self.db.query(User).filter(User.id == user_id).first()
+        """Cached, detached User without its password hash; don't modify it or add it to a session."""
+        def load():
+            user = self._live_query().filter(User.id == user_id).first()
+            return self._snapshot(user) if user else None
+
+        values = user_cache.get_or_load(user_id, load)
+        return User(**values) if values else None
+
+    def get_by_email(self, email: str):
+        """Uncached: used by login, which needs the current password hash."""
+        return self._live_query().filter(User.email == email).first()
+
+    def update_password_hash(self, user: User, hashed_password: str) -> None:
+        user.hashed_password = hashed_password
+        self.db.commit()
 
     def create(self, user_data: dict):
         db_user = User(**user_data)
         self.db.add(db_user)
+        self.db.flush()
+        OutboxRepository(self.db).add_user_created(db_user)
         self.db.commit()
         self.db.refresh(db_user)
+        user_cache.put(db_user.id, self._snapshot(db_user))
+        count_cache.invalidate("users")
         return db_user
 
+    def soft_delete(self, user_id: int) -> Optional[User]:
+        """Mark a user deleted; None when there is no such user.
+
+        Their open holds are cancelled, passing reserved copies on. Raises
+        UserHasActiveLoansError while they still have books out. The row lock
+        conflicts with the key-share lock a checkout takes on the user, so a
+        checkout and a delete of the same user never both succeed.
+        """
+        user = self._live_query().filter(User.id == user_id).with_for_update().first()
+        if user is None:
+            self.db.rollback()
+            return None
+        if self.db.query(exists().where(Loan.user_id == user_id, Loan.status == "active")).scalar():
+            self.db.rollback()
+            raise UserHasActiveLoansError(user_id)
+
+        cancelled_ids = self.db.execute(
+            update(Hold)
+            .where(Hold.user_id == user_id, Hold.status.in_(("waiting", "ready")))
+            .values(status="cancelled")
+            .returning(Hold.id)
+        ).scalars().all()
+        # Copies set aside for this user's ready holds go to the next holder
+        reserved = self.db.execute(
+            select(BookCopy.id).where(BookCopy.hold_id.in_(cancelled_ids))
+        ).scalars().all() if cancelled_ids else []
+        if reserved:
+            HoldRepository(self.db).release_copies(reserved)
+
+        user.deleted_at = datetime.utcnow()
+        OutboxRepository(self.db).add_user_deleted(user)
+        self.db.commit()
+        user_cache.invalidate(user_id)
+        # Cancelled holds may have put copies back on the shelf
+        count_cache.invalidate("users", "books")
+        return user
+
+    def purge_deleted(self, deleted_before: datetime, batch_size: int = 100) -> int:
+        """Hard-delete one batch of users soft-deleted before deleted_before, with their history.
+
+        Holds, loans, archived loans and counters go first, each delete
+        through an indexed user_id column, so no statement scans a table.
+        Returns the number of users removed; call repeatedly until it is
+        below batch_size.
+        """
+        user_ids = self.db.execute(
+            select(User.id)
+            .where(User.deleted_at < deleted_before)
+            .order_by(User.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not user_ids:
+            self.db.rollback()
+            return 0
+        for model in (Hold, Loan, LoanArchive, UserLoanSummary):
+            self.db.execute(delete(model).where(model.user_id.in_(user_ids)))
+        self.db.execute(delete(User).where(User.id.in_(user_ids)))
+        self.db.commit()
+        count_cache.invalidate("loans")
+        return len(user_ids)
+
+    def get_loan_summary(self, user_id: int):
+        """User and maintained loan counters in one read; None when the user doesn't exist."""
+        return self.db.query(
+            User.id.label("user_id"),
+            func.coalesce(UserLoanSummary.active_loans, 0).label("active_loans"),
+            func.coalesce(UserLoanSummary.total_loans, 0).label("total_loans"),
+            func.coalesce(UserLoanSummary.outstanding_fines, 0).label("outstanding_fines")
+        ).outerjoin(
+            UserLoanSummary, UserLoanSummary.user_id == User.id
+        ).filter(User.id == user_id, User.deleted_at.is_(None)).first()
+
+    def reconcile_loan_summaries(self) -> int:
+        """Recompute every user's loan counters from loan and loan_archive; returns the number of repaired rows."""
+        repaired = self.db.execute(RECONCILE_LOAN_SUMMARIES_SQL).rowcount
+        self.db.commit()
+        return repaired
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from app.schemas.author import Author
 
 class BookBase(BaseModel):
@@ -9,7 +9,8 @@ class BookBase(BaseModel):
     author_id: int
 
 class BookCreate(BookBase):
-    pass
+    # Physical copies put on the shelf with the new book
+    copies: int = Field(1, ge=0, le=1000)
 
 class Book(BookBase):
     id: int
@@ -22,4 +23,17 @@ class BookAvailability(BaseModel):
     book_id: int
     name: str
     available: bool
-    current_loan_id: Optional[int] = None
\ No newline at end of file
+    # Copies on the shelf and copies owned (lent out, reserved for a hold or
+    # on the shelf), read from counters kept on the book row
+    available_copies: int
+    total_copies: int
+
+class RelatedBook(BaseModel):
+    book_id: int
+    name: str
+    # Distinct users who borrowed both this book and the requested one
+    shared_readers: int
+
+class RelatedBooks(BaseModel):
+    book_id: int
+    items: List[RelatedBook]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class CopyCreate(BaseModel):
+    count: int = Field(1, ge=1, le=1000)
+
+class Copy(BaseModel):
+    id: int
+    book_id: int
+    # available, on_loan, reserved (for the ready hold hold_id) or withdrawn
+    status: str
+    hold_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
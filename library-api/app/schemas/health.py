@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+class HealthStatus(BaseModel):
+    status: str
+
+class DatabaseStatus(BaseModel):
+    ok: bool
+    # Latency of the last background `SELECT 1`, not of this request
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+    stale: bool
+    error: Optional[str] = None
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+
+class ReadinessStatus(BaseModel):
+    status: str
+    database: DatabaseStatus
+    pool: PoolStatus
+
+class CacheStats(BaseModel):
+    hits: int
+    shared_hits: int
+    misses: int
+    # Lookups that waited for a concurrent load of the same key instead of querying
+    coalesced: int
+    invalidations: int
+    evictions: int
+    shared_errors: int
+    entries: int
+    hit_ratio: Optional[float] = None
+
+class CountCacheStats(BaseModel):
+    hits: int
+    misses: int
+    # Lookups that waited for a concurrent count of the same total instead of counting
+    coalesced: int
+    invalidations: int
+    entries: int
+    hit_ratio: Optional[float] = None
+
+class CoalescingStats(BaseModel):
+    # GETs under /api/v1 that could have shared a concurrent identical request's response
+    requests: int
+    executions: int
+    coalesced: int
+    # Runs whose response was streamed, too large or failed, so it could not be shared
+    unshareable: int
+    in_flight: int
+    collapse_ratio: Optional[float] = None
+
+class EventStats(BaseModel):
+    # Event streams open in this worker
+    subscribers: int
+    published: int
+    delivered: int
+    # Streams dropped for falling more than EVENTS_BUFFER_SIZE events behind
+    evicted: int
+
+class Metrics(BaseModel):
+    caches: Dict[str, CacheStats]
+    counts: CountCacheStats
+    coalescing: CoalescingStats
+    events: EventStats
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class HoldCreate(BaseModel):
+    user_id: int
+
+class Hold(BaseModel):
+    id: int
+    book_id: int
+    user_id: int
+    # waiting, ready (a copy is reserved until expires_at), fulfilled, expired or cancelled
+    status: str
+    # Place in the book's queue while waiting, 1 being next
+    position: Optional[int] = None
+    created_at: datetime
+    ready_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from typing import List, Optional
+from app.schemas.money import Money
 
 class LoanBase(BaseModel):
     book_id: int
@@ -11,15 +13,48 @@ class LoanCreate(LoanBase):
 
 class Loan(LoanBase):
     id: int
+    # The physical copy lent out
+    copy_id: Optional[int] = None
     loan_date: datetime
     due_date: datetime
     return_date: Optional[datetime] = None
-    fine_amount: float = 0.0
+    fine_amount: Money = Decimal("0.00")
     status: str = "active"
 
     class Config:
         from_attributes = True
 
 class LoanReturn(BaseModel):
-    fine_amount: float
-    message: str
\ No newline at end of file
+    fine_amount: Money
+    message: str
+
+class LoanBatchCreate(BaseModel):
+    items: List[LoanCreate] = Field(..., min_length=1, max_length=100)
+
+class LoanBatchReturn(BaseModel):
+    loan_ids: List[int] = Field(..., min_length=1, max_length=100)
+
+class LoanBatchCreateItem(BaseModel):
+    index: int
+    book_id: int
+    user_id: int
+    success: bool
+    loan: Optional[Loan] = None
+    error: Optional[str] = None
+
+class LoanBatchCreateResult(BaseModel):
+    created: int
+    failed: int
+    results: List[LoanBatchCreateItem]
+
+class LoanBatchReturnItem(BaseModel):
+    loan_id: int
+    success: bool
+    fine_amount: Optional[Money] = None
+    error: Optional[str] = None
+
+class LoanBatchReturnResult(BaseModel):
+    returned: int
+    failed: int
+    total_fines: Money
+    results: List[LoanBatchReturnItem]
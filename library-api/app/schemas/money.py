@@ -0,0 +1,7 @@
+from decimal import Decimal
+from typing import Annotated
+from pydantic import PlainSerializer
+
+# Amounts in reais, exact to the cent. Responses still carry a JSON number:
+# a two-place Decimal converts to the float whose shortest form has the same digits
+Money = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
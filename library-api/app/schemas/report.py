@@ -0,0 +1,69 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from app.schemas.money import Money
+
+class ReportWindow(BaseModel):
+    start: date
+    end: date
+    # Time of the last rollup refresh; events after it are not counted yet
+    refreshed_at: Optional[datetime] = None
+
+class DailyCirculation(BaseModel):
+    day: date
+    loans_created: int
+    loans_returned: int
+    late_returns: int
+    fines_total: Money
+
+    class Config:
+        from_attributes = True
+
+class CirculationReport(ReportWindow):
+    items: List[DailyCirculation]
+
+class TopBook(BaseModel):
+    book_id: int
+    name: Optional[str] = None
+    loans: int
+
+    class Config:
+        from_attributes = True
+
+class TopBooksReport(ReportWindow):
+    items: List[TopBook]
+
+class DailyFines(BaseModel):
+    day: date
+    fines_total: Money
+
+    class Config:
+        from_attributes = True
+
+class FineRevenueReport(ReportWindow):
+    total: Money
+    items: List[DailyFines]
+
+class NationalityCirculation(BaseModel):
+    nationality: str
+    loans_created: int
+    loans_returned: int
+    late_returns: int
+    # Share of the returns in the window that came back after their due date
+    overdue_rate: float
+    fines_total: Money
+
+class NationalityReport(ReportWindow):
+    items: List[NationalityCirculation]
+
+class TierFines(BaseModel):
+    tier: str
+    loans: int
+    total: Money
+
+class ProjectedFinesReport(BaseModel):
+    # Instant the loans were priced at
+    as_of: datetime
+    overdue_loans: int
+    total: Money
+    items: List[TierFines]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr
+from app.schemas.money import Money
 
 class UserBase(BaseModel):
     name: str
@@ -13,9 +14,25 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserListItem(BaseModel):
+    """UserResponse as listed from the database. Emails were validated when
+    stored, and validating them again cost more than the rest of the page."""
+    name: str
+    email: str
+    id: int
+
 class User(UserBase):
     id: int
     hashed_password: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserLoanSummary(BaseModel):
+    user_id: int
+    active_loans: int
+    total_loans: int
+    outstanding_fines: Money
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,42 @@
+from app.auth import dummy_password_hash, hash_password, needs_rehash, revocation_list, token_codec, verify_password
+from app.repositories.token_repository import TokenRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.auth import Token
+from app.logging_config import get_logger
+from fastapi import HTTPException
+
+logger = get_logger(__name__)
+
+class AuthService:
+    def __init__(self, user_repository: UserRepository, token_repository: TokenRepository):
+        self.user_repository = user_repository
+        self.token_repository = token_repository
+
+    def login(self, email: str, password: str) -> Token:
+        logger.info("Logging in", user_email=email)
+        user = self.user_repository.get_by_email(email)
+        # Run the KDF for unknown emails too, so response time does not reveal which exist
+        hashed_password = user.hashed_password if user else dummy_password_hash()
+        if not verify_password(password, hashed_password) or user is None:
+            logger.warning("Login failed", user_email=email)
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid email or password",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        if needs_rehash(user.hashed_password):
+            self.user_repository.update_password_hash(user, hash_password(password))
+            logger.info("Password hash upgraded", user_id=user.id)
+
+        access_token, claims = token_codec.issue(user.id)
+        logger.info("Login succeeded", user_id=user.id, jti=claims["jti"])
+        return Token(access_token=access_token, expires_in=claims["exp"] - claims["iat"])
+
+    def logout(self, claims: dict) -> None:
+        user_id = int(claims["sub"])
+        logger.info("Revoking token", user_id=user_id, jti=claims["jti"])
+        self.token_repository.revoke(claims["jti"], user_id, claims["exp"])
+        # Effective in this worker at once; the others hear of it through NOTIFY
+        revocation_list.add(claims["jti"], claims["exp"])
+        logger.info("Token revoked", user_id=user_id, jti=claims["jti"])
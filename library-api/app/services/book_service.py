@@ -1,8 +1,10 @@
-from app.repositories.book_repository import BookRepository
+from app.repositories.book_repository import BOOK_FIELD_COLUMNS, BookInUseError, BookRepository
 from app.repositories.author_repository import AuthorRepository
 from app.schemas.book import BookCreate
 from app.logging_config import get_logger
+from datetime import datetime, timedelta
 from fastapi import HTTPException
+from typing import List, Optional
 
 logger = get_logger(__name__)
 
@@ -11,13 +13,44 @@ class BookService:
         self.book_repository = book_repository
         self.author_repository = author_repository
 
-    def get_all_books(self, skip: int = 0, limit: int = 10):
-        logger.debug("Fetching books from repository", skip=skip, limit=limit)
-        return self.book_repository.get_all(skip, limit)
+    def get_all_books(self, skip: int = 0, limit: int = 10, available: Optional[bool] = None):
+        logger.debug("Fetching books from repository", skip=skip, limit=limit, available=available)
+        # Every field, as dicts straight from the joined columns rather than Book entities
+        # that would each lazy-load their author
+        return self.get_books_fields(list(BOOK_FIELD_COLUMNS), skip, limit, available)
 
-    def get_books_count(self):
-        count = self.book_repository.get_total_count()
-        logger.debug("Retrieved books count", total_count=count)
+    def parse_fields(self, fields: str) -> List[str]:
+        """Validate a ?fields= list; "author" stands for all of the author's fields."""
+        requested = []
+        for field in (part.strip() for part in fields.split(",")):
+            expanded = [name for name in BOOK_FIELD_COLUMNS if name.startswith("author.")] if field == "author" else [field]
+            for name in expanded:
+                if name not in BOOK_FIELD_COLUMNS:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Unknown field '{name}'; allowed: {', '.join(BOOK_FIELD_COLUMNS)}, author"
+                    )
+                if name not in requested:
+                    requested.append(name)
+        return requested
+
+    def get_books_fields(self, fields: List[str], skip: int = 0, limit: int = 10, available: Optional[bool] = None):
+        """Listing narrowed to `fields`, as dicts with author fields nested under "author"."""
+        logger.debug("Fetching book fields from repository", fields=fields, skip=skip, limit=limit, available=available)
+        items = []
+        for row in self.book_repository.get_fields(fields, skip, limit, available):
+            item = {}
+            for field, value in zip(fields, row):
+                if field.startswith("author."):
+                    item.setdefault("author", {})[field[len("author."):]] = value
+                else:
+                    item[field] = value
+            items.append(item)
+        return items
+
+    def get_books_count(self, available: Optional[bool] = None):
+        count = self.book_repository.get_total_count(available)
+        logger.debug("Retrieved books count", total_count=count, available=available)
         return count
 
     def get_book(self, book_id: int):
@@ -39,26 +72,61 @@ class BookService:
         logger.info("Book created successfully", book_id=created_book.id, book_name=created_book.name)
         return created_book
 
+    def delete_book(self, book_id: int):
+        logger.info("Deleting book", book_id=book_id)
+        try:
+            deleted_book = self.book_repository.soft_delete(book_id)
+        except BookInUseError:
+            logger.warning("Book has copies on loan, not deleted", book_id=book_id)
+            raise HTTPException(status_code=400, detail="Book has copies on loan")
+        if deleted_book is None:
+            logger.warning("Book not found for deletion", book_id=book_id)
+            raise HTTPException(status_code=404, detail="Book not found")
+        logger.info("Book deleted successfully", book_id=book_id)
+        return deleted_book
+
+    def purge_deleted_books(self, older_than_days: int, batch_size: int = 100) -> int:
+        logger.info("Purging deleted books", older_than_days=older_than_days, batch_size=batch_size)
+        deleted_before = datetime.utcnow() - timedelta(days=older_than_days)
+        total = 0
+        while True:
+            purged = self.book_repository.purge_deleted(deleted_before, batch_size)
+            total += purged
+            if purged:
+                logger.debug("Purged book batch", purged=purged, total_purged=total)
+            if purged < batch_size:
+                break
+        logger.info("Deleted books purged", total_purged=total)
+        return total
+
     def check_availability(self, book_id: int):
         logger.debug("Checking book availability", book_id=book_id)
         
-        book = self.book_repository.get_by_id(book_id)
-        if not book:
+        # Read straight from the book row: the cached book leaves availability out
+        availability = self.book_repository.check_availability(book_id)
+        if not availability:
             logger.warning("Book not found for availability check", book_id=book_id)
             raise HTTPException(status_code=404, detail="Book not found")
         
-        availability_info = self.book_repository.check_availability(book_id)
-        
         logger.info(
             "Book availability checked",
             book_id=book_id,
-            available=availability_info["available"],
-            current_loan_id=availability_info["current_loan_id"]
+            available_copies=availability["available_copies"],
+            total_copies=availability["total_copies"]
         )
         
-        return {
-            "book_id": book_id,
-            "name": book.name,
-            "available": availability_info["available"],
-            "current_loan_id": availability_info["current_loan_id"]
-        }
\ No newline at end of file
+        return {"book_id": book_id, **availability}
+
+    def check_availability_batch(self, book_ids: List[int]):
+        logger.debug("Checking availability for books", book_count=len(book_ids))
+        rows = self.book_repository.get_availability_batch(book_ids)
+        return [
+            {
+                "book_id": row.id,
+                "name": row.name,
+                "available": row.available,
+                "available_copies": row.available_copies,
+                "total_copies": row.total_copies
+            }
+            for row in rows
+        ]
\ No newline at end of file
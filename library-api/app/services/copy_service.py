@@ -0,0 +1,46 @@
+from app.repositories.copy_repository import CopyRepository, CopyNotAvailableError
+from app.logging_config import get_logger
+from fastapi import HTTPException
+
+logger = get_logger(__name__)
+
+class CopyService:
+    def __init__(self, repository: CopyRepository):
+        self.repository = repository
+        self.pickup_hours = 48
+
+    def get_copies(self, book_id: int, skip: int = 0, limit: int = 10):
+        logger.debug("Fetching book copies", book_id=book_id, skip=skip, limit=limit)
+        return self.repository.get_by_book(book_id, skip, limit)
+
+    def get_copies_count(self, book_id: int):
+        count = self.repository.get_count_by_book(book_id)
+        logger.debug("Retrieved book copies count", book_id=book_id, total_count=count)
+        return count
+
+    def add_copies(self, book_id: int, count: int):
+        logger.info("Adding book copies", book_id=book_id, count=count)
+        copies = self.repository.add(book_id, count, self.pickup_hours)
+        if copies is None:
+            logger.warning("Book not found for new copies", book_id=book_id)
+            raise HTTPException(status_code=404, detail="Book not found")
+        logger.info(
+            "Book copies added successfully",
+            book_id=book_id,
+            count=count,
+            reserved=sum(1 for copy in copies if copy.status == "reserved")
+        )
+        return copies
+
+    def withdraw_copy(self, book_id: int, copy_id: int):
+        logger.info("Withdrawing book copy", book_id=book_id, copy_id=copy_id)
+        try:
+            copy = self.repository.withdraw(book_id, copy_id)
+        except CopyNotAvailableError as e:
+            logger.warning("Copy not on the shelf for withdrawal", book_id=book_id, copy_id=copy_id, status=e.status)
+            raise HTTPException(status_code=400, detail=f"Copy is {e.status.replace('_', ' ')}; only copies on the shelf can be withdrawn")
+        if copy is None:
+            logger.warning("Copy not found for withdrawal", book_id=book_id, copy_id=copy_id)
+            raise HTTPException(status_code=404, detail="Copy not found")
+        logger.info("Book copy withdrawn successfully", book_id=book_id, copy_id=copy_id)
+        return copy
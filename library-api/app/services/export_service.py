@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Optional
+from pydantic_core import to_jsonable_python
+from sqlalchemy.orm import Session
+from app.database.session import SessionLocal
+from app.repositories.book_repository import BookRepository
+from app.repositories.loan_repository import LoanRepository
+from app.repositories.user_repository import UserRepository
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Flat columns written for each exportable entity. Nested relationships
+# (e.g. Book.author) are left out so no extra query is issued per row.
+EXPORT_FIELDS = {
+    "loans": ["id", "book_id", "copy_id", "user_id", "loan_date", "due_date", "return_date", "fine_amount", "status"],
+    "books": ["id", "name", "description", "pages", "author_id"],
+    "users": ["id", "name", "email"],
+}
+
+
+def _jsonable(value):
+    # Money as a JSON number, like the API responses (app.schemas.money)
+    return float(value) if isinstance(value, Decimal) else to_jsonable_python(value)
+
+
+def serialize_rows(rows: Iterable, fields: List[str], fmt: str, chunk_rows: int = 500) -> Iterator[str]:
+    """Render rows as NDJSON or CSV text, yielding one chunk every chunk_rows rows."""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+
+    pending = 0
+    for row in rows:
+        values = [_jsonable(getattr(row, field)) for field in fields]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(fields, values)), ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class ExportService:
+    """Streams full tables out of the database without paging.
+
+    Each export opens its own session, because the stream keeps being
+    consumed after the request handler (and its request-scoped session)
+    has returned.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, batch_size: int = 1000):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    def export_loans(self, fmt: str, status: Optional[str] = None, user_id: Optional[int] = None, include_archived: bool = True) -> Iterator[str]:
+        return self._export(
+            "loans",
+            fmt,
+            lambda db: LoanRepository(db).stream(
+                status=status,
+                user_id=user_id,
+                batch_size=self.batch_size,
+                include_archived=include_archived
+            ),
+            status=status,
+            user_id=user_id,
+            include_archived=include_archived
+        )
+
+    def export_books(self, fmt: str, available: Optional[bool] = None) -> Iterator[str]:
+        return self._export(
+            "books",
+            fmt,
+            lambda db: BookRepository(db).stream(batch_size=self.batch_size, available=available),
+            available=available
+        )
+
+    def export_users(self, fmt: str) -> Iterator[str]:
+        return self._export("users", fmt, lambda db: UserRepository(db).stream(batch_size=self.batch_size))
+
+    def _export(self, entity: str, fmt: str, query: Callable[[Session], Iterable], **filters) -> Iterator[str]:
+        if fmt not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return self._stream(entity, fmt, query, filters)
+
+    def _stream(self, entity: str, fmt: str, query: Callable[[Session], Iterable], filters: dict) -> Iterator[str]:
+        logger.info("Starting export", entity=entity, format=fmt, **filters)
+        db = self.session_factory()
+        try:
+            yield from serialize_rows(query(db), EXPORT_FIELDS[entity], fmt)
+            logger.info("Export finished", entity=entity, format=fmt)
+        except GeneratorExit:
+            logger.warning("Export aborted by consumer", entity=entity, format=fmt)
+            raise
+        except Exception as e:
+            logger.error("Export failed", entity=entity, format=fmt, error=str(e))
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,73 @@
+from app.repositories.hold_repository import (
+    HoldRepository,
+    BookAvailableError,
+    DuplicateHoldError,
+    HoldTargetNotFoundError,
+)
+from app.schemas.hold import Hold
+from app.logging_config import get_logger
+from fastapi import HTTPException
+
+logger = get_logger(__name__)
+
+class HoldService:
+    """Per-book FIFO queues for books with no copy on the shelf.
+
+    A return sets the copy aside for the oldest waiting hold (HoldRepository.release_copies),
+    which then has pickup_hours to check it out before it passes to the next one.
+    """
+
+    def __init__(self, repository: HoldRepository):
+        self.repository = repository
+        self.pickup_hours = 48
+
+    def _to_schema(self, hold) -> Hold:
+        result = Hold.model_validate(hold)
+        result.position = self.repository.get_position(hold)
+        return result
+
+    def get_hold(self, hold_id: int) -> Hold:
+        logger.debug("Fetching hold by ID", hold_id=hold_id)
+        hold = self.repository.get_by_id(hold_id)
+        if not hold:
+            logger.warning("Hold not found", hold_id=hold_id)
+            raise HTTPException(status_code=404, detail="Hold not found")
+        return self._to_schema(hold)
+
+    def place_hold(self, book_id: int, user_id: int) -> Hold:
+        logger.info("Placing hold", book_id=book_id, user_id=user_id)
+        try:
+            hold = self.repository.create(book_id, user_id)
+        except HoldTargetNotFoundError as e:
+            logger.warning(f"{e.entity} not found for hold", book_id=book_id, user_id=user_id)
+            raise HTTPException(status_code=404, detail=f"{e.entity} not found")
+        except BookAvailableError:
+            logger.warning("Hold placed on an available book", book_id=book_id, user_id=user_id)
+            raise HTTPException(status_code=400, detail="Book is available; check it out instead")
+        except DuplicateHoldError:
+            logger.warning("User already holds book", book_id=book_id, user_id=user_id)
+            raise HTTPException(status_code=400, detail="User already has an open hold on this book")
+        result = self._to_schema(hold)
+        logger.info("Hold placed successfully", hold_id=hold.id, book_id=book_id, user_id=user_id, position=result.position)
+        return result
+
+    def cancel_hold(self, hold_id: int) -> Hold:
+        logger.info("Cancelling hold", hold_id=hold_id)
+        hold = self.repository.cancel(hold_id, self.pickup_hours)
+        if not hold:
+            logger.warning("Open hold not found for cancellation", hold_id=hold_id)
+            raise HTTPException(status_code=404, detail="Open hold not found")
+        logger.info("Hold cancelled successfully", hold_id=hold_id, book_id=hold.book_id)
+        return self._to_schema(hold)
+
+    def expire_holds(self, batch_size: int = 100) -> int:
+        """Pass on every copy whose holder missed the pickup deadline."""
+        total = 0
+        while True:
+            expired = self.repository.expire_ready(self.pickup_hours, batch_size)
+            total += expired
+            if expired < batch_size:
+                break
+        if total:
+            logger.info("Expired ready holds", expired=total)
+        return total
@@ -1,23 +1,35 @@
-from app.repositories.loan_repository import LoanRepository
+from app.repositories.loan_repository import (
+    LoanRepository,
+    BookNotFoundError,
+    BookUnavailableError,
+    LoanLimitExceededError,
+    UserNotFoundError,
+)
 from app.schemas.loan import LoanCreate
+from app.events import EventBroker, event_broker
+from app.fines import FinePolicy, fine_policy
 from app.logging_config import get_logger
-from datetime import datetime, timedelta
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
 from fastapi import HTTPException
 
 logger = get_logger(__name__)
 
 class LoanService:
-    def __init__(self, repository: LoanRepository):
+    def __init__(self, repository: LoanRepository, events: Optional[EventBroker] = None, policy: Optional[FinePolicy] = None):
         self.repository = repository
-        self.daily_fine = 2.0
+        self.events = events or event_broker
+        self.fine_policy = policy or fine_policy
+        self.max_active_loans = 3
 
-    def get_all_loans(self, skip: int = 0, limit: int = 10):
-        logger.debug("Fetching all loans from repository", skip=skip, limit=limit)
-        return self.repository.get_all(skip, limit)
+    def get_all_loans(self, skip: int = 0, limit: int = 10, include_archived: bool = False):
+        logger.debug("Fetching all loans from repository", skip=skip, limit=limit, include_archived=include_archived)
+        return self.repository.get_all(skip, limit, include_archived)
 
-    def get_loans_count(self):
-        count = self.repository.get_total_count()
-        logger.debug("Retrieved loans count", total_count=count)
+    def get_loans_count(self, include_archived: bool = False):
+        count = self.repository.get_total_count(include_archived)
+        logger.debug("Retrieved loans count", total_count=count, include_archived=include_archived)
         return count
 
     def get_loan(self, loan_id: int):
@@ -27,17 +39,24 @@ class LoanService:
     def create_loan(self, loan: LoanCreate):
         logger.info("Creating loan", user_id=loan.user_id, book_id=loan.book_id)
         
-        if not self.repository.check_book_availability(loan.book_id):
+        # The loan limit and availability are both enforced atomically by the
+        # repository, through conditional updates of the user summary and book rows
+        try:
+            created_loan = self.repository.create(loan, self.max_active_loans)
+        except UserNotFoundError:
+            logger.warning("User not found for loan", user_id=loan.user_id)
+            raise HTTPException(status_code=404, detail="User not found")
+        except LoanLimitExceededError:
+            logger.warning("User has maximum active loans", user_id=loan.user_id, max_active_loans=self.max_active_loans)
+            raise HTTPException(status_code=400, detail=f"User already has {self.max_active_loans} active loans")
+        except BookNotFoundError:
+            logger.warning("Book not found for loan", book_id=loan.book_id)
+            raise HTTPException(status_code=404, detail="Book not found")
+        except BookUnavailableError:
             logger.warning("Book not available for loan", book_id=loan.book_id)
             raise HTTPException(status_code=400, detail="Book is not available")
-        
-        user_active_loans = self.repository.get_user_active_loans(loan.user_id)
-        if len(user_active_loans) >= 3:
-            logger.warning("User has maximum active loans", user_id=loan.user_id, active_loans_count=len(user_active_loans))
-            raise HTTPException(status_code=400, detail="User already has 3 active loans")
-        
-        created_loan = self.repository.create(loan)
         logger.info("Loan created successfully", loan_id=created_loan.id, user_id=loan.user_id, book_id=loan.book_id)
+        self._publish("loan.created", [created_loan])
         return created_loan
 
     def return_book(self, loan_id: int):
@@ -48,13 +67,81 @@ class LoanService:
             logger.warning("Active loan not found for return", loan_id=loan_id)
             raise HTTPException(status_code=404, detail="Active loan not found")
         
-        fine_amount = self._calculate_fine(loan.due_date)
-        logger.info("Fine calculated", loan_id=loan_id, fine_amount=fine_amount, due_date=loan.due_date.isoformat())
+        tier = self.repository.get_fine_tier(loan.user_id)
+        fine_amount = self.fine_policy.fine(loan.due_date, tier=tier)
+        logger.info("Fine calculated", loan_id=loan_id, fine_amount=str(fine_amount), fine_tier=tier, due_date=loan.due_date.isoformat())
         
         returned_loan = self.repository.return_book(loan_id, fine_amount)
-        logger.info("Book returned successfully", loan_id=loan_id, fine_amount=fine_amount)
+        logger.info("Book returned successfully", loan_id=loan_id, fine_amount=str(fine_amount))
+        self._publish("loan.returned", [returned_loan])
         return returned_loan
 
+    def archive_returned_loans(self, older_than_months: int, batch_size: int = 1000) -> int:
+        logger.info("Archiving returned loans", older_than_months=older_than_months, batch_size=batch_size)
+        total = 0
+        while True:
+            moved = self.repository.archive_returned(older_than_months, batch_size)
+            total += moved
+            if moved:
+                logger.debug("Archived loan batch", moved=moved, total_moved=total)
+            if moved < batch_size:
+                break
+        logger.info("Returned loans archived", total_moved=total)
+        return total
+
+    def create_loans_batch(self, loans: List[LoanCreate]):
+        logger.info("Creating loans in batch", item_count=len(loans))
+        
+        batch = self.repository.create_batch(loans, self.max_active_loans)
+        messages = {
+            "user_not_found": "User not found",
+            "loan_limit": f"User already has {self.max_active_loans} active loans",
+            "book_not_found": "Book not found",
+            "book_unavailable": "Book is not available",
+        }
+        results = [
+            {
+                "index": index,
+                "book_id": item.book_id,
+                "user_id": item.user_id,
+                "success": created is not None,
+                "loan": created,
+                "error": messages[error] if error else None
+            }
+            for index, (item, (created, error)) in enumerate(zip(loans, batch))
+        ]
+        created_count = sum(1 for result in results if result["success"])
+        self._publish("loan.created", [created for created, _ in batch if created is not None])
+        
+        logger.info("Batch loans processed", created=created_count, failed=len(results) - created_count)
+        return {"created": created_count, "failed": len(results) - created_count, "results": results}
+
+    def return_books_batch(self, loan_ids: List[int]):
+        logger.info("Processing batch book return", item_count=len(loan_ids))
+        
+        now = datetime.utcnow()
+        returned = self.repository.return_batch(loan_ids, lambda loans: self.fine_policy.fines(loans, now))
+        results = [
+            {
+                "loan_id": loan_id,
+                "success": loan is not None,
+                "fine_amount": loan.fine_amount if loan is not None else None,
+                "error": None if loan is not None else "Active loan not found"
+            }
+            for loan_id, loan in zip(loan_ids, returned)
+        ]
+        returned_count = sum(1 for result in results if result["success"])
+        self._publish("loan.returned", [loan for loan in returned if loan is not None])
+        total_fines = sum((result["fine_amount"] for result in results if result["success"]), Decimal("0.00"))
+        
+        logger.info("Batch return processed", returned=returned_count, failed=len(results) - returned_count, total_fines=str(total_fines))
+        return {
+            "returned": returned_count,
+            "failed": len(results) - returned_count,
+            "total_fines": total_fines,
+            "results": results
+        }
+
     def get_active_loans(self, skip: int = 0, limit: int = 10):
         logger.debug("Fetching active loans", skip=skip, limit=limit)
         return self.repository.get_active_loans(skip, limit)
@@ -73,20 +160,46 @@ class LoanService:
         logger.debug("Retrieved overdue loans count", overdue_count=count)
         return count
 
-    def get_user_loans(self, user_id: int, skip: int = 0, limit: int = 10):
-        logger.debug("Fetching user loans", user_id=user_id, skip=skip, limit=limit)
-        return self.repository.get_user_loans(user_id, skip, limit)
+    def get_user_loans(self, user_id: int, skip: int = 0, limit: int = 10, include_archived: bool = False):
+        logger.debug("Fetching user loans", user_id=user_id, skip=skip, limit=limit, include_archived=include_archived)
+        return self.repository.get_user_loans(user_id, skip, limit, include_archived)
 
-    def get_user_loans_count(self, user_id: int):
-        count = self.repository.get_user_loans_count(user_id)
+    def get_user_loans_count(self, user_id: int, include_archived: bool = False):
+        count = self.repository.get_user_loans_count(user_id, include_archived)
         logger.debug("Retrieved user loans count", user_id=user_id, user_loans_count=count)
         return count
 
-    def _calculate_fine(self, due_date: datetime) -> float:
-        if datetime.utcnow() <= due_date:
-            return 0.0
-        
-        days_overdue = (datetime.utcnow() - due_date).days
-        fine = days_overdue * self.daily_fine
-        logger.debug("Fine calculation", days_overdue=days_overdue, daily_fine=self.daily_fine, total_fine=fine)
-        return fine
\ No newline at end of file
+    def _publish(self, event_type: str, loans: list) -> None:
+        """Broadcast loan.created/loan.returned events, with each book's copies on the shelf afterwards."""
+        if not loans:
+            return
+        # A returned copy stays off the shelf when it was handed to a waiting hold
+        available_copies = self.repository.get_available_copies(loan.book_id for loan in loans)
+        self.events.publish(self.repository.db, [
+            {
+                "type": event_type,
+                "loan_id": loan.id,
+                "book_id": loan.book_id,
+                "copy_id": loan.copy_id,
+                "user_id": loan.user_id,
+                "available": available_copies.get(loan.book_id, 0) > 0,
+                "available_copies": available_copies.get(loan.book_id, 0),
+                "at": (loan.return_date if event_type == "loan.returned" else loan.loan_date).isoformat()
+            }
+            for loan in loans
+        ])
+
+    def get_projected_fines(self):
+        """Fines every overdue active loan would owe if returned now, by fine tier."""
+        as_of = datetime.utcnow()
+        logger.debug("Projecting fines of active loans", as_of=as_of.isoformat())
+        items = [
+            {"tier": row.tier, "loans": row.loans, "total": row.total}
+            for row in self.repository.project_fines(self.fine_policy, as_of)
+        ]
+        return {
+            "as_of": as_of,
+            "overdue_loans": sum(item["loans"] for item in items),
+            "total": sum((item["total"] for item in items), Decimal("0.00")),
+            "items": items
+        }
\ No newline at end of file
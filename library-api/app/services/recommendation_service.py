@@ -0,0 +1,113 @@
+from datetime import timedelta
+from typing import List, Optional
+from fastapi import HTTPException
+from app.repositories.book_repository import BookRepository
+from app.repositories.recommendation_repository import RecommendationRepository
+from app.schemas.book import RelatedBooks
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Neighbours kept per book, i.e. the largest ?limit the endpoint serves
+TOP_K = 20
+
+class RecommendationService:
+    """"Readers also borrowed" lists, precomputed from the loan history.
+
+    For the user x book borrow matrix B, (B^T B)[a, b] counts the users who
+    borrowed both a and b. refresh() computes that product with sparse
+    matrices, a block of books at a time, keeps the TOP_K largest entries of
+    each row and stores them in book_related, so the endpoint is a single
+    primary key read.
+    """
+
+    def __init__(self, repository: RecommendationRepository, book_repository: BookRepository = None):
+        self.repository = repository
+        self.book_repository = book_repository
+
+    def get_related(self, book_id: int, limit: int = 10) -> RelatedBooks:
+        logger.debug("Fetching related books", book_id=book_id, limit=limit)
+        if self.book_repository and not self.book_repository.get_by_id(book_id):
+            logger.warning("Book not found for related books", book_id=book_id)
+            raise HTTPException(status_code=404, detail="Book not found")
+        rows = self.repository.get_related(book_id, limit)
+        return RelatedBooks(
+            book_id=book_id,
+            items=[{"book_id": row.related_book_id, "name": row.name, "shared_readers": row.shared_readers} for row in rows]
+        )
+
+    def refresh(self, full: bool = False, lookback_days: int = 1, min_shared: int = 1, block_size: int = 2000) -> int:
+        """Recompute the neighbours of every book whose co-occurrence counts may have changed.
+
+        A new loan of user u only changes the counts between books u borrowed,
+        so an incremental run recomputes the books of users with loans since
+        lookback_days before the last refresh, loading only the borrows of
+        those books' readers. The first run, or full=True, recomputes every
+        book. Returns the number of books recomputed.
+        """
+        # Numerical dependencies are only needed here, not by the API
+        import numpy as np
+        from scipy import sparse
+
+        refreshed_at = None if full else self.repository.get_refreshed_at()
+        started_at = self.repository.lock_refresh()
+
+        active_users = None
+        if refreshed_at is not None:
+            since = refreshed_at - timedelta(days=lookback_days)
+            active_users = self.repository.get_users_borrowing_since(since)
+        # Incremental runs only load the readers of the books they recompute
+        pair_users, pair_books = self.repository.get_borrow_pairs(active_users)
+        user_ids, user_index = np.unique(np.array(pair_users, dtype=np.int64), return_inverse=True)
+        book_ids, book_index = np.unique(np.array(pair_books, dtype=np.int64), return_inverse=True)
+        borrows = sparse.csr_matrix(
+            (np.ones(len(pair_users), dtype=np.int32), (user_index, book_index)),
+            shape=(len(user_ids), len(book_ids))
+        )
+        by_book = borrows.T.tocsr()
+
+        if active_users is None:
+            targets = np.arange(len(book_ids))
+            replaced: Optional[List[int]] = None
+        else:
+            active = np.isin(user_ids, active_users)
+            targets = np.unique(borrows[np.flatnonzero(active)].indices)
+            replaced = book_ids[targets].tolist()
+
+        logger.info(
+            "Refreshing related books",
+            full=refreshed_at is None,
+            borrow_pairs=len(pair_users),
+            books=len(targets)
+        )
+
+        sources, ranks, related, shared_readers = [], [], [], []
+        for offset in range(0, len(targets), block_size):
+            block = targets[offset:offset + block_size]
+            counts = (by_book[block] @ borrows).tocsr()
+            for position, book in enumerate(block):
+                start, end = counts.indptr[position], counts.indptr[position + 1]
+                neighbours = counts.indices[start:end]
+                shared = counts.data[start:end]
+                keep = (neighbours != book) & (shared >= min_shared)
+                neighbours, shared = neighbours[keep], shared[keep]
+                # Most shared readers first, ties by book id (book_ids is sorted)
+                order = np.lexsort((neighbours, -shared))[:TOP_K]
+                sources.append(np.full(len(order), book_ids[book]))
+                ranks.append(np.arange(1, len(order) + 1))
+                related.append(book_ids[neighbours[order]])
+                shared_readers.append(shared[order])
+
+        columns = {
+            name: np.concatenate(values).tolist() if values else []
+            for name, values in (
+                ("book_ids", sources),
+                ("ranks", ranks),
+                ("related_book_ids", related),
+                ("shared_readers", shared_readers),
+            )
+        }
+        self.repository.replace_related(replaced, columns)
+        self.repository.finish_refresh(started_at)
+        logger.info("Related books refreshed", books=len(targets), neighbours=len(columns["book_ids"]))
+        return len(targets)
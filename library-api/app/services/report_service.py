@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from app.repositories.report_repository import ReportRepository, TOP_BOOK_PERIODS, TOP_BOOK_RANKS
+from app.schemas.report import CirculationReport, FineRevenueReport, NationalityCirculation, NationalityReport, TopBooksReport
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class ReportService:
+    """Circulation reports served from the daily rollup tables.
+
+    Reads never touch loan; the rollups are brought up to date by refresh(),
+    run on a schedule (python -m app.cli refresh-reports).
+    """
+
+    def __init__(self, repository: ReportRepository):
+        self.repository = repository
+        self.default_days = 30
+        self.max_days = 366
+
+    def _window(self, start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+        end = end or datetime.utcnow().date()
+        start = start or end - timedelta(days=self.default_days - 1)
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must be on or before end")
+        if (end - start).days >= self.max_days:
+            raise HTTPException(status_code=400, detail=f"Report window cannot exceed {self.max_days} days")
+        return start, end
+
+    def get_circulation(self, start: Optional[date] = None, end: Optional[date] = None) -> CirculationReport:
+        start, end = self._window(start, end)
+        logger.debug("Fetching daily circulation report", start=start, end=end)
+        return CirculationReport(
+            start=start,
+            end=end,
+            refreshed_at=self.repository.get_refreshed_at(),
+            items=self.repository.get_daily(start, end)
+        )
+
+    def get_top_books(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: int = 10,
+        period_days: int = 30
+    ) -> TopBooksReport:
+        refreshed_at = self.repository.get_refreshed_at()
+
+        if start is None and end is None:
+            # Fixed periods are ranked at refresh time, so this is a primary key read
+            if period_days not in TOP_BOOK_PERIODS:
+                raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(map(str, TOP_BOOK_PERIODS))}")
+            if limit > TOP_BOOK_RANKS:
+                raise HTTPException(status_code=400, detail=f"limit cannot exceed {TOP_BOOK_RANKS}")
+            end = refreshed_at.date() if refreshed_at else datetime.utcnow().date()
+            start = end - timedelta(days=period_days - 1)
+            logger.debug("Fetching precomputed top books", period_days=period_days, limit=limit)
+            items = self.repository.get_top_books_for_period(period_days, limit)
+        else:
+            start, end = self._window(start, end)
+            logger.debug("Fetching top books report", start=start, end=end, limit=limit)
+            items = self.repository.get_top_books(start, end, limit)
+
+        return TopBooksReport(start=start, end=end, refreshed_at=refreshed_at, items=items)
+
+    def get_fine_revenue(self, start: Optional[date] = None, end: Optional[date] = None) -> FineRevenueReport:
+        start, end = self._window(start, end)
+        logger.debug("Fetching fine revenue report", start=start, end=end)
+        days = self.repository.get_daily(start, end)
+        return FineRevenueReport(
+            start=start,
+            end=end,
+            refreshed_at=self.repository.get_refreshed_at(),
+            total=sum((day.fines_total for day in days), Decimal("0.00")),
+            items=[day for day in days if day.fines_total]
+        )
+
+    def get_by_nationality(self, start: Optional[date] = None, end: Optional[date] = None) -> NationalityReport:
+        start, end = self._window(start, end)
+        logger.debug("Fetching circulation by nationality report", start=start, end=end)
+        items = [
+            NationalityCirculation(
+                nationality=row.nationality,
+                loans_created=row.loans_created,
+                loans_returned=row.loans_returned,
+                late_returns=row.late_returns,
+                overdue_rate=round(row.late_returns / row.loans_returned, 4) if row.loans_returned else 0.0,
+                fines_total=row.fines_total
+            )
+            for row in self.repository.get_by_nationality(start, end)
+        ]
+        return NationalityReport(start=start, end=end, refreshed_at=self.repository.get_refreshed_at(), items=items)
+
+    def refresh(self, full: bool = False, lookback_days: int = 2) -> int:
+        """Bring the rollups up to date.
+
+        An incremental run rebuilds the days from lookback_days before the last
+        refresh on, which also picks up loans committed late or returned since.
+        The first run, or full=True, rebuilds everything.
+        """
+        refreshed_at = None if full else self.repository.get_refreshed_at()
+        start = date.min if refreshed_at is None else (refreshed_at - timedelta(days=lookback_days)).date()
+
+        logger.info("Refreshing report rollups", start=start.isoformat(), full=refreshed_at is None)
+        events = self.repository.refresh(start)
+        logger.info("Report rollups refreshed", start=start.isoformat(), events=events)
+        return events
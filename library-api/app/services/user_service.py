@@ -1,7 +1,9 @@
-from app.repositories.user_repository import UserRepository
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from app.repositories.user_repository import UserHasActiveLoansError, UserRepository
 from app.schemas.user import UserCreate
+from app.auth import hash_password
 from app.logging_config import get_logger
-import hashlib
 
 logger = get_logger(__name__)
 
@@ -22,10 +24,14 @@ class UserService:
         logger.debug("Fetching user by ID", user_id=user_id)
         return self.repository.get_by_id(user_id)
 
+    def get_loan_summary(self, user_id: int):
+        logger.debug("Fetching user loan summary", user_id=user_id)
+        return self.repository.get_loan_summary(user_id)
+
     def create_user(self, user: UserCreate):
         logger.info("Creating user", user_name=user.name, user_email=user.email)
         
-        hashed_password = hashlib.sha256(user.password.encode()).hexdigest()
+        hashed_password = hash_password(user.password)
         user_data = user.dict()
         user_data['hashed_password'] = hashed_password
         del user_data['password']
@@ -38,9 +44,27 @@ class UserService:
 
     def delete_user(self, user_id: int):
         logger.info("Deleting user", user_id=user_id)
-        deleted_user = self.repository.delete(user_id)
-        if deleted_user:
-            logger.info("User deleted successfully", user_id=user_id)
-        else:
+        try:
+            deleted_user = self.repository.soft_delete(user_id)
+        except UserHasActiveLoansError:
+            logger.warning("User has active loans, not deleted", user_id=user_id)
+            raise HTTPException(status_code=400, detail="User has active loans")
+        if deleted_user is None:
             logger.warning("User not found for deletion", user_id=user_id)
-        return deleted_user
\ No newline at end of file
+            raise HTTPException(status_code=404, detail="User not found")
+        logger.info("User deleted successfully", user_id=user_id)
+        return deleted_user
+
+    def purge_deleted_users(self, older_than_days: int, batch_size: int = 100) -> int:
+        logger.info("Purging deleted users", older_than_days=older_than_days, batch_size=batch_size)
+        deleted_before = datetime.utcnow() - timedelta(days=older_than_days)
+        total = 0
+        while True:
+            purged = self.repository.purge_deleted(deleted_before, batch_size)
+            total += purged
+            if purged:
+                logger.debug("Purged user batch", purged=purged, total_purged=total)
+            if purged < batch_size:
+                break
+        logger.info("Deleted users purged", total_purged=total)
+        return total
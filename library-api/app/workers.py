@@ -0,0 +1,14 @@
+from uvicorn.workers import UvicornWorker
+
+class LibraryUvicornWorker(UvicornWorker):
+    """Uvicorn worker for gunicorn pinned to uvloop and httptools.
+
+    The stock worker picks them only when importable; pinning makes a missing
+    uvicorn[standard] install fail at boot instead of silently running slower.
+    """
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "loop": "uvloop",
+        "http": "httptools",
+    }
@@ -0,0 +1,97 @@
+"""Measure what token authentication adds to a request.
+
+Usage:
+    python -m benchmarks.auth --iterations 20000 --requests 2000 --revoked 10000
+
+Times, in microseconds: verifying a token on its own (signature, expiry and
+revocation lookup against --revoked revoked tokens), and a request through a
+minimal FastAPI app with and without the require_token dependency, sent
+in-process and interleaved so drift affects both alike. For scale,
+it also times one PBKDF2 password check, which a login pays once and a naive
+implementation would pay on every request. Needs no database.
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from typing import Callable, List, Optional
+
+def _per_call_us(fn: Callable[[], object], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+async def _requests_us(app, variants: dict, requests: int) -> dict:
+    """Median microseconds per request of each path -> headers variant, alternating between them."""
+    import httpx
+
+    samples = {path: [] for path in variants}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for round_ in range(requests + 50):
+            for path, headers in variants.items():
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                elapsed = (time.perf_counter() - started) * 1e6
+                assert response.status_code == 200, response.text
+                # The first 50 rounds warm up
+                if round_ >= 50:
+                    samples[path].append(elapsed)
+    return {path: statistics.median(values) for path, values in samples.items()}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.auth", description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000, help="Token verifications timed")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests timed per variant")
+    parser.add_argument("--revoked", type=int, default=10000, help="Revoked tokens held in memory")
+    args = parser.parse_args(argv)
+
+    from fastapi import Depends, FastAPI
+    from app.auth import TokenCodec, hash_password, require_token, revocation_list, token_codec, verify_password
+
+    exp = int(time.time()) + 3600
+    revocation_list.replace((secrets.token_hex(16), exp) for _ in range(args.revoked))
+    token, _ = token_codec.issue(1)
+
+    def verify():
+        claims = token_codec.decode(token)
+        return revocation_list.is_revoked(claims["jti"])
+
+    rotated = TokenCodec([("next", secrets.token_bytes(32)), ("current", token_codec.keys[token_codec.signing_kid])])
+    old_key_token, _ = TokenCodec([("current", token_codec.keys[token_codec.signing_kid])]).issue(1)
+
+    app = FastAPI()
+
+    @app.get("/open")
+    def open_route():
+        return {"ok": True}
+
+    @app.get("/protected", dependencies=[Depends(require_token)])
+    def protected_route():
+        return {"ok": True}
+
+    verify_us = _per_call_us(verify, args.iterations)
+    rotated_us = _per_call_us(lambda: rotated.decode(old_key_token), args.iterations)
+    issue_us = _per_call_us(lambda: token_codec.issue(1), args.iterations)
+    medians = asyncio.run(_requests_us(
+        app, {"/open": {}, "/protected": {"Authorization": f"Bearer {token}"}}, args.requests
+    ))
+    open_us, protected_us = medians["/open"], medians["/protected"]
+    hashed = hash_password("benchmark-password")
+    kdf_started = time.perf_counter()
+    verify_password("benchmark-password", hashed)
+    kdf_us = (time.perf_counter() - kdf_started) * 1e6
+
+    print(f"\n{'operation':48} {'us':>10}")
+    print(f"{'verify token (' + str(args.revoked) + ' revoked)':48} {verify_us:>10.1f}")
+    print(f"{'verify token signed with a previous key':48} {rotated_us:>10.1f}")
+    print(f"{'issue token':48} {issue_us:>10.1f}")
+    print(f"{'request without auth (median)':48} {open_us:>10.1f}")
+    print(f"{'request with require_token (median)':48} {protected_us:>10.1f}")
+    print(f"{'  overhead per request':48} {protected_us - open_us:>10.1f}")
+    print(f"{'PBKDF2 password check (login only)':48} {kdf_us:>10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
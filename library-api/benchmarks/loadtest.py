@@ -0,0 +1,255 @@
+"""Replay a weighted mix of the endpoints in openapi.yaml against a running server.
+
+Usage:
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --duration 60 \
+        --baseline benchmarks/baseline.json
+
+Reports throughput and p50/p95/p99 latency per route. With --baseline, the run
+is compared route by route and the exit code is 1 when p95 latency grows or
+throughput drops by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import yaml
+
+SPEC_PATH = Path(__file__).resolve().parents[2] / "openapi.yaml"
+
+# Relative weight of each operation in the default mix. Operations found in the
+# spec but missing here are not replayed; pass --mix to override.
+DEFAULT_MIX = {
+    "GET /books": 25,
+    "GET /books/{book_id}": 20,
+    "GET /books/{book_id}/availability": 15,
+    "GET /users": 5,
+    "GET /users/{user_id}": 10,
+    "GET /users/{user_id}/loans": 5,
+    "GET /loans": 5,
+    "GET /loans/active": 5,
+    "GET /loans/overdue": 10,
+}
+
+# Path parameter -> list endpoint whose "total" bounds the generated ids.
+ID_SOURCES = {
+    "book_id": "/books",
+    "user_id": "/users",
+    "loan_id": "/loans",
+}
+
+PATH_PARAM = re.compile(r"{(\w+)}")
+
+class Operation:
+    def __init__(self, method: str, path: str, spec: dict):
+        self.method = method
+        self.path = path
+        self.name = f"{method} {path}"
+        self.query_params = [p for p in spec.get("parameters", []) if p.get("in") == "query"]
+        body = spec.get("requestBody", {}).get("content", {}).get("application/json", {})
+        self.body_schema = body.get("schema", {}).get("$ref", "").rsplit("/", 1)[-1] or None
+
+def load_operations(spec_path: Path) -> Dict[str, Operation]:
+    spec = yaml.safe_load(spec_path.read_text(encoding="utf-8"))
+    operations = {}
+    for path, methods in spec.get("paths", {}).items():
+        for method, operation in methods.items():
+            op = Operation(method.upper(), path, operation)
+            operations[op.name] = op
+    return operations
+
+class RequestFactory:
+    """Builds concrete, reproducible requests for spec operations."""
+
+    def __init__(self, rng: random.Random, id_bounds: Dict[str, int], max_page: int):
+        self.rng = rng
+        self.id_bounds = id_bounds
+        self.max_page = max_page
+        self.bodies: Dict[str, Callable[[], dict]] = {
+            "LoanCreate": lambda: {"book_id": self._id("book_id"), "user_id": self._id("user_id")},
+            "UserCreate": lambda: {
+                "name": "Bench User",
+                "email": f"bench-{self.rng.getrandbits(48):x}@example.com",
+                "password": "bench-password",
+            },
+            "BookCreate": lambda: {"name": "Bench Book", "pages": 100, "author_id": 1},
+        }
+
+    def _id(self, param: str) -> int:
+        return self.rng.randint(1, max(1, self.id_bounds.get(param, 1)))
+
+    def build(self, op: Operation) -> dict:
+        url = PATH_PARAM.sub(lambda m: str(self._id(m.group(1))), op.path)
+        params = {}
+        for param in op.query_params:
+            if param["name"] == "page":
+                params["page"] = self.rng.randint(1, self.max_page)
+        request = {"method": op.method, "url": url, "params": params}
+        if op.body_schema:
+            request["json"] = self.bodies[op.body_schema]()
+        return request
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> dict:
+    routes = {}
+    for route, latencies in sorted(samples.items()):
+        latencies.sort()
+        routes[route] = {
+            "count": len(latencies),
+            "errors": errors.get(route, 0),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+    everything = sorted(l for values in samples.values() for l in values)
+    total = {
+        "count": len(everything),
+        "errors": sum(errors.values()),
+        "rps": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 50), 2),
+        "p95_ms": round(percentile(everything, 95), 2),
+        "p99_ms": round(percentile(everything, 99), 2),
+    }
+    return {"routes": routes, "total": total}
+
+async def discover_id_bounds(client: httpx.AsyncClient, prefix: str) -> Dict[str, int]:
+    bounds = {}
+    for param, path in ID_SOURCES.items():
+        response = await client.get(f"{prefix}{path}", params={"size": 1})
+        response.raise_for_status()
+        bounds[param] = response.json()["total"]
+    return bounds
+
+async def run_load(args, operations: Dict[str, Operation], mix: Dict[str, float]) -> dict:
+    rng = random.Random(args.seed)
+    names = [name for name in mix if name in operations]
+    missing = sorted(set(mix) - set(names))
+    if missing:
+        print(f"Skipping operations not in the spec: {', '.join(missing)}")
+    weights = [mix[name] for name in names]
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    # Sent on every request when the server runs with AUTH_ENABLED
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else None
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout, headers=headers) as client:
+        id_bounds = await discover_id_bounds(client, args.prefix)
+        factory = RequestFactory(rng, id_bounds, args.max_page)
+
+        started = time.perf_counter()
+        warmup_ends = started + args.warmup
+        deadline = warmup_ends + args.duration
+
+        async def worker():
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    return
+                name = rng.choices(names, weights)[0]
+                request = factory.build(operations[name])
+                request["url"] = args.prefix + request["url"]
+                sent = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    failed = response.status_code >= 500
+                except httpx.HTTPError:
+                    failed = True
+                latency_ms = (time.perf_counter() - sent) * 1000
+                if sent >= warmup_ends:
+                    samples[name].append(latency_ms)
+                    if failed:
+                        errors[name] += 1
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - warmup_ends
+
+    result = summarize(samples, errors, elapsed)
+    result["meta"] = {
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "id_bounds": id_bounds,
+        "mix": {name: mix[name] for name in names},
+    }
+    return result
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    print(f"\n{'route':45} {'p95 base':>10} {'p95 now':>10} {'rps base':>10} {'rps now':>10}")
+    for route, base in sorted(baseline.get("routes", {}).items()):
+        now = current["routes"].get(route)
+        if not now:
+            continue
+        print(f"{route:45} {base['p95_ms']:>10} {now['p95_ms']:>10} {base['rps']:>10} {now['rps']:>10}")
+        if now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {base['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{route}: throughput {base['rps']} -> {now['rps']} req/s")
+    return regressions
+
+def print_report(result: dict) -> None:
+    print(f"\n{'route':45} {'count':>8} {'err':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, stats in rows:
+        print(
+            f"{route:45} {stats['count']:>8} {stats['errors']:>5} {stats['rps']:>9} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+        )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--prefix", default="/api/v1", help="Prefix the spec paths are mounted under")
+    parser.add_argument("--spec", type=Path, default=SPEC_PATH)
+    parser.add_argument("--mix", type=Path, help='JSON object of {"METHOD /path": weight}')
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the measurement")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--token", help="Bearer token (POST /auth/token) for a server with AUTH_ENABLED")
+    parser.add_argument("--max-page", type=int, default=10, help="Highest page requested on list endpoints")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Compare against this stored report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression, 0.2 = 20%%")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new --baseline")
+    args = parser.parse_args(argv)
+
+    operations = load_operations(args.spec)
+    mix = json.loads(args.mix.read_text()) if args.mix else DEFAULT_MIX
+    result = asyncio.run(run_load(args, operations, mix))
+    print_report(result)
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.baseline and args.save_baseline:
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+    elif args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""Measure what turning a page of list results into JSON costs, per schema.
+
+Usage:
+    python -m benchmarks.serialization --items 100 --iterations 500
+
+For each paginated schema in app/schemas, times, in microseconds per page:
+the ORM path list endpoints used to take (entities validated into
+PaginatedResponse, then dumped, validated again against the response_model
+and encoded by FastAPI) and page_json (rows validated once as dicts and
+serialized by pydantic-core). Namedtuples stand in for SQLAlchemy Rows, and
+transient entities for loaded ones. Both paths must produce the same JSON.
+Needs no database.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+def _per_call_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def _cases(count: int) -> dict:
+    """schema name -> (response schema, page_json schema, entities, rows) with count items each."""
+    import app.cli  # noqa: F401 (registers every mapper)
+    from app.models.author import Author as AuthorModel
+    from app.models.book import Book as BookModel
+    from app.models.book_copy import BookCopy
+    from app.models.loan import Loan as LoanModel
+    from app.models.user import User as UserModel
+    from app.schemas.book import Book
+    from app.schemas.copy import Copy
+    from app.schemas.loan import Loan
+    from app.schemas.user import UserListItem, UserResponse
+
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    loans = [
+        dict(id=i, book_id=i % 500 + 1, copy_id=i, user_id=i % 300 + 1, loan_date=now - timedelta(days=i % 30),
+             due_date=now - timedelta(days=i % 30) + timedelta(days=14), return_date=now if i % 3 == 0 else None,
+             fine_amount=Decimal("2.50") if i % 3 == 0 else Decimal("0.00"), status="returned" if i % 3 == 0 else "active")
+        for i in range(1, count + 1)
+    ]
+    users = [dict(id=i, name=f"User {i}", email=f"user-{i}@example.com") for i in range(1, count + 1)]
+    copies = [
+        dict(id=i, book_id=1, status="reserved" if i % 5 == 0 else "available", hold_id=i if i % 5 == 0 else None, created_at=now)
+        for i in range(1, count + 1)
+    ]
+    authors = [dict(id=i, name=f"Author {i}", biography="Synthetic biography", nationality="Portuguesa") for i in range(1, 11)]
+    books = [
+        dict(id=i, name=f"Book {i}", description="Synthetic description. " * 4, pages=100 + i, author_id=i % 10 + 1)
+        for i in range(1, count + 1)
+    ]
+
+    def rows(items: List[dict]) -> list:
+        Row = namedtuple("Row", list(items[0]))
+        return [Row(**item) for item in items]
+
+    author_entities = {author["id"]: AuthorModel(**author) for author in authors}
+    # Book listings come from joined columns as dicts, author nested (BookService.get_books_fields)
+    book_rows = [dict(book, author=authors[book["author_id"] - 1]) for book in books]
+    return {
+        "Loan": (Loan, Loan, [LoanModel(**loan) for loan in loans], rows(loans)),
+        "UserResponse": (UserResponse, UserListItem, [UserModel(hashed_password="x", **user) for user in users], rows(users)),
+        "Copy": (Copy, Copy, [BookCopy(**copy) for copy in copies], rows(copies)),
+        "Book": (Book, Book, [BookModel(author=author_entities[book["author_id"]], **book) for book in books], book_rows),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization", description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="Items per page")
+    parser.add_argument("--iterations", type=int, default=500, help="Pages serialized per path and schema")
+    args = parser.parse_args(argv)
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from app.schemas.pagination import PaginatedResponse, page_json
+
+    print(f"\n{'schema':14} {'ORM + response_model':>22} {'page_json':>12} {'speedup':>9}")
+    loop = asyncio.new_event_loop()
+    for name, (schema, row_schema, entities, rows) in _cases(args.items).items():
+        field = create_response_field(name="response", type_=PaginatedResponse[schema])
+
+        def orm_path() -> bytes:
+            page = PaginatedResponse[schema](items=entities, total=len(entities), page=1, size=args.items, pages=1)
+            content = loop.run_until_complete(serialize_response(field=field, response_content=page, is_coroutine=True))
+            return JSONResponse(content).body
+
+        def rows_path() -> bytes:
+            return page_json(row_schema, rows, len(rows), 1, args.items, 1)
+
+        assert json.loads(orm_path()) == json.loads(rows_path()), name
+        orm_us = _per_call_us(orm_path, args.iterations)
+        rows_us = _per_call_us(rows_path, args.iterations)
+        print(f"{name:14} {orm_us:>22.1f} {rows_us:>12.1f} {orm_us / rows_us:>8.1f}x")
+    loop.close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+"""Measure the cold import of app.main and check it against the startup target.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 10 --baseline-ref 266b740
+
+Each run imports the app in a fresh interpreter with -X importtime. The report
+lists the median wall time and the import time spent per top-level package.
+The target is a baseline median plus --margin: the recorded BASELINE_MS, or,
+with --baseline-ref, the median of the same number of imports of that git
+revision, measured alternately with the working tree so both see the same load.
+The command exits with status 1 when the median exceeds the target, or when a
+module that must stay lazy (--forbid) was imported by the app at startup.
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+# Median `import app.main` of the tree before the startup work (266b740), measured
+# on a single vCPU alternately with the current tree over 15 runs each
+BASELINE_MS = 1350
+
+# Allowance over the baseline for the routes added since (auth, copies, holds,
+# events) and for run-to-run noise
+DEFAULT_MARGIN = 0.25
+
+# Documented cold-start target (see README, "Startup")
+DEFAULT_TARGET_MS = round(BASELINE_MS * (1 + DEFAULT_MARGIN))
+
+# Command-only or optional dependencies that must not load with the API. rich is
+# not listed: structlog imports it whenever it is installed, which is why it
+# lives in requirements-dev.txt instead of the image.
+DEFAULT_FORBIDDEN = ["alembic", "mako", "numpy", "scipy"]
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - started) * 1000
+print(f"WALL_MS {elapsed:.1f}")
+print("MODULES " + " ".join(sorted(sys.modules)))
+"""
+
+def run_once(project_dir: Path = PROJECT_DIR) -> Tuple[float, Dict[str, int], List[str]]:
+    env = dict(os.environ, PYTHONPATH=str(project_dir), LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=project_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    wall_ms = 0.0
+    modules: List[str] = []
+    for line in result.stdout.splitlines():
+        if line.startswith("WALL_MS "):
+            wall_ms = float(line.split()[1])
+        elif line.startswith("MODULES "):
+            modules = line.split()[1:]
+
+    # stderr lines: "import time: self [us] | cumulative | imported package"
+    self_us: Dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        self_us[name.strip().split(".")[0]] += int(own)
+    return wall_ms, self_us, modules
+
+def export_revision(ref: str, destination: Path) -> Path:
+    """Extract this directory as it was at git revision `ref` into `destination`."""
+    # Run from a subdirectory, git archive only includes that subdirectory
+    archive = subprocess.run(["git", "archive", "--format=tar", ref], cwd=PROJECT_DIR, capture_output=True, check=True)
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(destination)
+    return destination
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, help=f"Fixed target instead of the baseline plus margin ({DEFAULT_TARGET_MS} ms)")
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN, help="Allowed fraction over the baseline median")
+    parser.add_argument("--baseline-ref", help="Measure the baseline on this git revision instead of using BASELINE_MS")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the breakdown")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN, help="Top-level modules that must stay unimported")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_dir = export_revision(args.baseline_ref, Path(tmp)) if args.baseline_ref else None
+        walls = []
+        baseline_walls = []
+        totals: Dict[str, List[int]] = defaultdict(list)
+        modules: List[str] = []
+        for _ in range(args.runs):
+            if baseline_dir:
+                baseline_walls.append(run_once(baseline_dir)[0])
+            wall_ms, self_us, modules = run_once()
+            walls.append(wall_ms)
+            for package, us in self_us.items():
+                totals[package].append(us)
+
+    baseline_ms = statistics.median(baseline_walls) if baseline_walls else BASELINE_MS
+    target_ms = args.target_ms if args.target_ms is not None else baseline_ms * (1 + args.margin)
+    median_ms = statistics.median(walls)
+    breakdown = sorted(((statistics.median(values) / 1000, package) for package, values in totals.items()), reverse=True)
+
+    print(f"\n{'package':30} {'import ms':>10}")
+    for ms, package in breakdown[:args.top]:
+        print(f"{package:30} {ms:>10.1f}")
+    print(f"\nimport app.main: median {median_ms:.0f} ms over {args.runs} runs (min {min(walls):.0f}, max {max(walls):.0f}), target {target_ms:.0f} ms")
+    source = f"{args.baseline_ref}, measured" if args.baseline_ref else "recorded"
+    print(f"baseline: median {baseline_ms:.0f} ms ({source})")
+
+    failures = []
+    if median_ms > target_ms:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds the {target_ms:.0f} ms target")
+    loaded = sorted({name.split(".")[0] for name in modules} & set(args.forbid))
+    if loaded:
+        failures.append(f"imported at startup but should load lazily: {', '.join(loaded)}")
+
+    if failures:
+        print("\nStartup check failed:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    print("\nStartup check passed")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+"""Gunicorn settings for the production server: gunicorn -c gunicorn.conf.py app.main:app
+
+Every value can be overridden from the environment; see the README.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# One worker per core by default. Endpoints are sync and run in each worker's
+# thread pool, so CPU rather than connections bounds throughput.
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Read by app.database.session to split DB_MAX_CONNECTIONS between workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "app.workers.LibraryUvicornWorker"
+
+# Import create_app() once in the master; workers fork with it loaded
+preload_app = True
+
+# Graceful recycling: a worker exits after max_requests (+ jitter, so they don't
+# all restart at once) and gets graceful_timeout to finish in-flight requests
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+backlog = int(os.getenv("BACKLOG", "2048"))
+
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+accesslog = None  # LoggingMiddleware already logs every request
+
+def post_fork(server, worker):
+    # The master imported the app, and with it the engine; pooled connections
+    # must not be shared across the fork
+    from app.database.session import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,44 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.database.session import DATABASE_URL
+from app.models import Base, author, book, book_copy, book_related, hold, idempotency_key, loan, loan_archive, outbox_event, report, revoked_token, user, user_loan_summary  # noqa: F401 - register every table on Base.metadata
+
+config = context.config
+
+# app.cli runs migrations in-process with its own logging setup already in place
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# app.database.migrations.upgrade passes the URL of the engine it was given
+url = config.attributes.get("url", DATABASE_URL)
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        compare_type=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    engine = create_engine(url, poolclass=pool.NullPool)
+
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
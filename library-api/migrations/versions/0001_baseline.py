@@ -0,0 +1,69 @@
+"""Baseline: the schema the original app/database/init.sql created
+
+Databases that were initialized from init.sql already have these tables;
+`python -m app.cli migrate` stamps them at this revision instead of running it.
+Columns and tables init.sql gained later (availability, loan summaries, the
+loan archive) come in the 0001a-0001c revisions, which skip what a database
+already has.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "author",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("biography", sa.Text()),
+        sa.Column("nationality", sa.String(100)),
+    )
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+    )
+    op.create_table(
+        "book",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("pages", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), sa.ForeignKey("author.id"), nullable=False),
+    )
+    op.create_table(
+        "loan",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("loan_date", sa.DateTime(), server_default=sa.func.current_timestamp()),
+        sa.Column("due_date", sa.DateTime(), nullable=False),
+        sa.Column("return_date", sa.DateTime()),
+        sa.Column("fine_amount", sa.Numeric(10, 2), server_default=sa.text("0.0")),
+        sa.Column("status", sa.String(20), server_default="active"),
+    )
+
+    op.create_index("idx_book_author_id", "book", ["author_id"])
+    op.create_index("idx_loan_book_id", "loan", ["book_id"])
+    op.create_index("idx_loan_user_id", "loan", ["user_id"])
+    op.create_index("idx_loan_status", "loan", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_table("loan")
+    op.drop_table("book")
+    op.drop_table("user")
+    op.drop_table("author")
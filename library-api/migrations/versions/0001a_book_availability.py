@@ -0,0 +1,48 @@
+"""Availability state maintained on the book row
+
+init.sql gained these columns after databases had been created from it, and
+init.sql never ran again against those, so they may or may not be there.
+Whatever exists is kept; the rest is added and backfilled from active loans.
+
+Revision ID: 0001a_book_availability
+Revises: 0001_baseline
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001a_book_availability"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("book")}
+    if "available" not in columns:
+        op.add_column("book", sa.Column("available", sa.Boolean(), nullable=False, server_default=sa.true()))
+        op.add_column("book", sa.Column("current_loan_id", sa.Integer()))
+        op.execute("""
+            UPDATE book SET available = FALSE, current_loan_id = loan.id
+            FROM loan
+            WHERE loan.book_id = book.id AND loan.status = 'active'
+        """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_book_available",
+            "book",
+            ["id"],
+            postgresql_where=sa.text("available = TRUE"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_book_available", table_name="book", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("book", "current_loan_id")
+    op.drop_column("book", "available")
@@ -0,0 +1,40 @@
+"""Per-user loan counters behind GET /users/{id}/summary
+
+Like 0001a, only creates the table when init.sql did not, and then fills it
+from the loan history.
+
+Revision ID: 0001b_user_loan_summary
+Revises: 0001a_book_availability
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001b_user_loan_summary"
+down_revision: Union[str, None] = "0001a_book_availability"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("user_loan_summary"):
+        return
+    op.create_table(
+        "user_loan_summary",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), primary_key=True, autoincrement=False),
+        sa.Column("active_loans", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_loans", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("outstanding_fines", sa.Numeric(10, 2), nullable=False, server_default=sa.text("0")),
+    )
+    op.execute("""
+        INSERT INTO user_loan_summary (user_id, active_loans, total_loans, outstanding_fines)
+        SELECT user_id, count(*) FILTER (WHERE status = 'active'), count(*), coalesce(sum(fine_amount), 0)
+        FROM loan
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_loan_summary")
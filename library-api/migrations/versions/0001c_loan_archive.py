@@ -0,0 +1,52 @@
+"""Archive table for old returned loans, and the index the archival job scans
+
+Like 0001a, skips what init.sql already created. The loan index is built
+concurrently so the table stays writable meanwhile.
+
+Revision ID: 0001c_loan_archive
+Revises: 0001b_user_loan_summary
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001c_loan_archive"
+down_revision: Union[str, None] = "0001b_user_loan_summary"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("loan_archive"):
+        op.create_table(
+            "loan_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("book_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("loan_date", sa.DateTime()),
+            sa.Column("due_date", sa.DateTime(), nullable=False),
+            sa.Column("return_date", sa.DateTime()),
+            sa.Column("fine_amount", sa.Numeric(10, 2), server_default=sa.text("0.0")),
+            sa.Column("status", sa.String(20), server_default="returned"),
+            sa.Column("archived_at", sa.DateTime(), server_default=sa.func.current_timestamp()),
+        )
+    op.create_index("idx_loan_archive_book_id", "loan_archive", ["book_id"], if_not_exists=True)
+    op.create_index("idx_loan_archive_user_id", "loan_archive", ["user_id"], if_not_exists=True)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_loan_returned_return_date",
+            "loan",
+            ["return_date"],
+            postgresql_where=sa.text("status = 'returned'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_loan_returned_return_date", table_name="loan", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("loan_archive")
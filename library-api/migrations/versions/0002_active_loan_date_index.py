@@ -0,0 +1,38 @@
+"""Partial index on loan(loan_date) for active loans
+
+Serves the overdue scan (status = 'active' AND loan_date < cutoff). Built
+with CREATE INDEX CONCURRENTLY so the loan table stays writable meanwhile;
+that statement cannot run inside a transaction, hence the autocommit block.
+
+Revision ID: 0002_active_loan_date_index
+Revises: 0001c_loan_archive
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002_active_loan_date_index"
+down_revision: Union[str, None] = "0001c_loan_archive"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # if_not_exists lets a rerun finish after an interrupted build; drop an
+        # INVALID leftover index by hand first (see \d loan)
+        op.create_index(
+            "idx_loan_active_loan_date",
+            "loan",
+            ["loan_date"],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_loan_active_loan_date", table_name="loan", postgresql_concurrently=True, if_exists=True)
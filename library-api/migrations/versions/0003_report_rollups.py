@@ -0,0 +1,79 @@
+"""Daily circulation rollups for /reports
+
+Adds the rollup tables filled by `python -m app.cli refresh-reports`, and the
+indexes its incremental window scans use on loan and loan_archive (built
+concurrently, outside the migration transaction).
+
+Revision ID: 0003_report_rollups
+Revises: 0002_active_loan_date_index
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003_report_rollups"
+down_revision: Union[str, None] = "0002_active_loan_date_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_loan_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("loans_created", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("loans_returned", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("late_returns", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("fines_total", sa.Numeric(12, 2), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_table(
+        "report_book_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("book_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("loans_created", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_table(
+        "report_nationality_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("nationality", sa.String(100), primary_key=True),
+        sa.Column("loans_created", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("loans_returned", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("late_returns", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("fines_total", sa.Numeric(12, 2), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_table(
+        "report_top_books",
+        sa.Column("period_days", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("rank", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("loans", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "report_refresh",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index("idx_loan_loan_date", "loan", ["loan_date"], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            "idx_loan_archive_return_date",
+            "loan_archive",
+            ["return_date"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_loan_archive_return_date", table_name="loan_archive", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_loan_loan_date", table_name="loan", postgresql_concurrently=True, if_exists=True)
+
+    op.drop_table("report_refresh")
+    op.drop_table("report_top_books")
+    op.drop_table("report_nationality_daily")
+    op.drop_table("report_book_daily")
+    op.drop_table("report_loan_daily")
@@ -0,0 +1,34 @@
+"""Precomputed "readers also borrowed" neighbours
+
+Adds book_related, filled by `python -m app.cli refresh-related` and read by
+GET /books/{book_id}/related through its primary key.
+
+Revision ID: 0004_book_related
+Revises: 0003_report_rollups
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004_book_related"
+down_revision: Union[str, None] = "0003_report_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "book_related",
+        sa.Column("book_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("rank", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("related_book_id", sa.Integer(), nullable=False),
+        sa.Column("shared_readers", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    # Forget the watermark too, so the next refresh after an upgrade is a full one
+    op.execute("DELETE FROM report_refresh WHERE name = 'book_related'")
+    op.drop_table("book_related")
@@ -0,0 +1,38 @@
+"""Hold queue for unavailable books
+
+Revision ID: 0005_holds
+Revises: 0004_book_related
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0005_holds"
+down_revision: Union[str, None] = "0004_book_related"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hold",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="waiting"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("ready_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("idx_hold_queue", "hold", ["book_id", "id"], postgresql_where=sa.text("status = 'waiting'"))
+    op.create_index(
+        "uq_hold_open", "hold", ["book_id", "user_id"], unique=True,
+        postgresql_where=sa.text("status IN ('waiting', 'ready')")
+    )
+    op.create_index("idx_hold_ready_expires_at", "hold", ["expires_at"], postgresql_where=sa.text("status = 'ready'"))
+
+
+def downgrade() -> None:
+    op.drop_table("hold")
@@ -0,0 +1,121 @@
+"""Physical copies per book, with maintained availability counters
+
+Revision ID: 0006_book_copies
+Revises: 0005_holds
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0006_book_copies"
+down_revision: Union[str, None] = "0005_holds"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "book_copy",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("book.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="available"),
+        sa.Column("hold_id", sa.Integer(), sa.ForeignKey("hold.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("idx_book_copy_book_id", "book_copy", ["book_id"])
+    op.create_index("idx_book_copy_available", "book_copy", ["book_id", "id"], postgresql_where=sa.text("status = 'available'"))
+    op.create_index("uq_book_copy_hold_id", "book_copy", ["hold_id"], unique=True, postgresql_where=sa.text("hold_id IS NOT NULL"))
+
+    # Every existing book was meant to be a single item. Give each active loan
+    # a copy of its own (one per book, unless availability had drifted), and
+    # each book without one a copy set aside for its ready hold, or on the shelf
+    op.add_column("loan", sa.Column("copy_id", sa.Integer(), sa.ForeignKey("book_copy.id"), nullable=True))
+    op.add_column("loan_archive", sa.Column("copy_id", sa.Integer(), nullable=True))
+    op.execute("INSERT INTO book_copy (book_id, status) SELECT book_id, 'on_loan' FROM loan WHERE status = 'active' ORDER BY book_id, id")
+    op.execute("""
+        UPDATE loan SET copy_id = copies.id
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY book_id ORDER BY id) AS rank, book_id FROM book_copy
+        ) AS copies,
+        (
+            SELECT id, row_number() OVER (PARTITION BY book_id ORDER BY id) AS rank, book_id
+            FROM loan WHERE status = 'active'
+        ) AS active
+        WHERE loan.id = active.id AND copies.book_id = active.book_id AND copies.rank = active.rank
+    """)
+    op.execute("""
+        INSERT INTO book_copy (book_id, status, hold_id)
+        SELECT book.id, CASE WHEN ready.id IS NOT NULL THEN 'reserved' ELSE 'available' END, ready.id
+        FROM book
+        LEFT JOIN LATERAL (
+            SELECT id FROM hold WHERE hold.book_id = book.id AND hold.status = 'ready' ORDER BY id LIMIT 1
+        ) AS ready ON TRUE
+        WHERE NOT EXISTS (SELECT 1 FROM loan WHERE loan.book_id = book.id AND loan.status = 'active')
+        ORDER BY book.id
+    """)
+    # Past loans are attributed to the book's first copy
+    for table in ("loan", "loan_archive"):
+        op.execute(f"""
+            UPDATE {table} SET copy_id = first_copy.id
+            FROM (SELECT book_id, min(id) AS id FROM book_copy GROUP BY book_id) AS first_copy
+            WHERE first_copy.book_id = {table}.book_id AND {table}.copy_id IS NULL
+        """)
+    op.alter_column("loan", "copy_id", nullable=False)
+
+    # Commits the copies above; built concurrently so loan stays writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_loan_active_copy_id",
+            "loan",
+            ["copy_id"],
+            unique=True,
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+    # The counters and the new available column commit together in a transaction of their own
+    op.add_column("book", sa.Column("total_copies", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("book", sa.Column("available_copies", sa.Integer(), nullable=False, server_default="0"))
+    op.execute("""
+        UPDATE book
+        SET total_copies = counts.total_copies, available_copies = counts.available_copies
+        FROM (
+            SELECT book_id, count(*) AS total_copies, count(*) FILTER (WHERE status = 'available') AS available_copies
+            FROM book_copy GROUP BY book_id
+        ) AS counts
+        WHERE counts.book_id = book.id
+    """)
+
+    # available becomes a function of the counter, so the two cannot drift apart
+    op.drop_index("idx_book_available", table_name="book")
+    op.drop_column("book", "available")
+    op.drop_column("book", "current_loan_id")
+    op.add_column(
+        "book",
+        sa.Column("available", sa.Boolean(), sa.Computed("available_copies > 0", persisted=True), nullable=False)
+    )
+    op.create_index("idx_book_available", "book", ["id"], postgresql_where=sa.text("available = TRUE"))
+
+
+def downgrade() -> None:
+    op.drop_index("idx_book_available", table_name="book")
+    op.drop_column("book", "available")
+    op.add_column("book", sa.Column("available", sa.Boolean(), nullable=False, server_default=sa.true()))
+    op.add_column("book", sa.Column("current_loan_id", sa.Integer()))
+    op.execute("""
+        UPDATE book
+        SET available = book.available_copies > 0,
+            current_loan_id = (SELECT max(id) FROM loan WHERE loan.book_id = book.id AND loan.status = 'active')
+    """)
+    op.create_index("idx_book_available", "book", ["id"], postgresql_where=sa.text("available = TRUE"))
+    op.drop_column("book", "available_copies")
+    op.drop_column("book", "total_copies")
+
+    with op.get_context().autocommit_block():
+        op.drop_index("uq_loan_active_copy_id", table_name="loan", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("loan", "copy_id")
+    op.drop_column("loan_archive", "copy_id")
+    op.drop_table("book_copy")
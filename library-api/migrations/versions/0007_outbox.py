@@ -0,0 +1,37 @@
+"""Transactional outbox of domain events
+
+Revision ID: 0007_outbox
+Revises: 0006_book_copies
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0007_outbox"
+down_revision: Union[str, None] = "0006_book_copies"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_event",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("aggregate_id", sa.Integer(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("idx_outbox_event_pending", "outbox_event", ["id"], postgresql_where=sa.text("published_at IS NULL"))
+    op.create_index(
+        "idx_outbox_event_published_at", "outbox_event", ["published_at"],
+        postgresql_where=sa.text("published_at IS NOT NULL")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("outbox_event")
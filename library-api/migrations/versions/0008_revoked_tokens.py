@@ -0,0 +1,30 @@
+"""Revoked access tokens
+
+Revision ID: 0008_revoked_tokens
+Revises: 0007_outbox
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0008_revoked_tokens"
+down_revision: Union[str, None] = "0007_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_token",
+        sa.Column("jti", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("idx_revoked_token_expires_at", "revoked_token", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("revoked_token")
@@ -0,0 +1,68 @@
+"""Soft delete for books and users, with the indexes hard purges need
+
+Revision ID: 0009_soft_delete
+Revises: 0008_revoked_tokens
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0009_soft_delete"
+down_revision: Union[str, None] = "0008_revoked_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("book", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.add_column("user", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+
+    # Built concurrently so book, user, hold and loan stay writable meanwhile;
+    # if_not_exists lets a rerun finish after an interrupted build
+    with op.get_context().autocommit_block():
+        for name, table, columns, where, unique in (
+            ("idx_book_live", "book", ["id"], "deleted_at IS NULL", False),
+            ("idx_book_deleted_at", "book", ["deleted_at"], "deleted_at IS NOT NULL", False),
+            ("uq_user_email", "user", ["email"], "deleted_at IS NULL", True),
+            ("idx_user_live", "user", ["id"], "deleted_at IS NULL", False),
+            ("idx_user_deleted_at", "user", ["deleted_at"], "deleted_at IS NOT NULL", False),
+            # Referencing columns without a full index make every parent delete scan the child table
+            ("idx_hold_book_id", "hold", ["book_id"], None, False),
+            ("idx_hold_user_id", "hold", ["user_id"], None, False),
+            ("idx_loan_copy_id", "loan", ["copy_id"], None, False),
+        ):
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+    # Email uniqueness now comes from uq_user_email, which only covers live users
+    op.drop_constraint("user_email_key", "user", type_="unique")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("idx_loan_copy_id", "loan"),
+            ("idx_hold_user_id", "hold"),
+            ("idx_hold_book_id", "hold"),
+            ("idx_user_deleted_at", "user"),
+            ("idx_user_live", "user"),
+            ("idx_book_deleted_at", "book"),
+            ("idx_book_live", "book"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    # Fails if an email was registered again after its user was deleted
+    op.create_unique_constraint("user_email_key", "user", ["email"])
+    with op.get_context().autocommit_block():
+        op.drop_index("uq_user_email", table_name="user", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("user", "deleted_at")
+    op.drop_column("book", "deleted_at")
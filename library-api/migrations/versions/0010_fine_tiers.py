@@ -0,0 +1,24 @@
+"""Per-user fine tiers
+
+Revision ID: 0010_fine_tiers
+Revises: 0009_soft_delete
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0010_fine_tiers"
+down_revision: Union[str, None] = "0009_soft_delete"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default: Postgres adds the column without rewriting the table
+    op.add_column("user", sa.Column("fine_tier", sa.String(length=20), nullable=False, server_default="standard"))
+
+
+def downgrade() -> None:
+    op.drop_column("user", "fine_tier")
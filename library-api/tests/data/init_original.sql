@@ -1,4 +1,4 @@
--- SQL script to initialize the database schema for a library management system
+-- init.sql as first released (database/init.sql before any schema change)
 
 CREATE TABLE IF NOT EXISTS author (
     id SERIAL PRIMARY KEY,
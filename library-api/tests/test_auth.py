@@ -0,0 +1,77 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+import app.auth as auth
+from app.auth import InvalidTokenError, RevocationList, TokenCodec
+
+@pytest.fixture
+def codec():
+    return TokenCodec([("k1", b"secret")], ttl_seconds=60)
+
+def _signed(codec: TokenCodec, claims) -> str:
+    """A token carrying arbitrary claims, correctly signed with the codec's key."""
+    signing_input = codec._signing_header + "." + auth._b64encode(json.dumps(claims).encode())
+    return signing_input + "." + codec._sign(codec.signing_kid, signing_input)
+
+def test_issued_token_decodes(codec):
+    token, claims = codec.issue(7)
+    assert codec.decode(token) == claims
+
+@pytest.mark.parametrize("claims", [
+    {"sub": "7", "exp": time.time() + 60},
+    {"jti": "a", "exp": time.time() + 60},
+    {"sub": "seven", "jti": "a", "exp": time.time() + 60},
+    {"sub": "7", "jti": "a"},
+    ["sub", "jti", "exp"],
+])
+def test_missing_or_invalid_claims_are_rejected(codec, claims):
+    with pytest.raises(InvalidTokenError):
+        codec.decode(_signed(codec, claims))
+
+def test_expired_token_is_rejected(codec):
+    token, _ = codec.issue(7, now=time.time() - 120)
+    with pytest.raises(InvalidTokenError, match="expired"):
+        codec.decode(token)
+
+def test_token_without_jti_is_unauthorized(codec, monkeypatch):
+    monkeypatch.setattr(auth, "token_codec", codec)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_signed(codec, {"sub": "7", "exp": time.time() + 60}))
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(auth.require_token(SimpleNamespace(state=SimpleNamespace()), credentials))
+    assert raised.value.status_code == 401
+
+def test_revoked_token_is_unauthorized(codec, monkeypatch):
+    token, claims = codec.issue(7)
+    revoked = RevocationList()
+    revoked.add(claims["jti"], claims["exp"])
+    monkeypatch.setattr(auth, "token_codec", codec)
+    monkeypatch.setattr(auth, "revocation_list", revoked)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(auth.require_token(SimpleNamespace(state=SimpleNamespace()), HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+    assert raised.value.detail == "Token revoked"
+
+def test_expired_revocations_are_pruned_in_batches():
+    revoked = RevocationList(prune_threshold=4)
+    past = int(time.time()) - 1
+    for jti in "abc":
+        revoked.add(jti, past)
+    assert len(revoked) == 3
+
+    revoked.add("live", int(time.time()) + 60)
+    assert len(revoked) == 1
+    assert revoked.is_revoked("live") and not revoked.is_revoked("a")
+
+def test_prune_threshold_grows_with_live_entries():
+    revoked = RevocationList(prune_threshold=2)
+    future = int(time.time()) + 60
+    for number in range(100):
+        revoked.add(str(number), future)
+
+    assert len(revoked) == 100
+    assert revoked._prune_at > 100
@@ -0,0 +1,159 @@
+import threading
+import time
+import pytest
+from app.cache import CountCache, EntityCache, LocalBackend, SharedBackend
+
+def _cache(**kwargs) -> EntityCache:
+    return EntityCache("test", version=1, **kwargs)
+
+def _run_concurrently(count: int, target) -> list:
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_misses_share_one_load():
+    cache = _cache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"id": 1}
+
+    results = _run_concurrently(5, lambda: cache.get_or_load(1, load))
+
+    assert calls == [1]
+    assert results == [{"id": 1}] * 5
+    assert cache.stats()["coalesced"] == 4
+
+def test_failed_load_is_not_shared():
+    cache = _cache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait()
+        raise RuntimeError("connection lost")
+
+    errors = []
+
+    def owner():
+        try:
+            cache.get_or_load(1, failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=owner)
+    thread.start()
+    started.wait()
+    waiter = threading.Thread(target=lambda: errors.append(cache.get_or_load(1, lambda: {"id": 1})))
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    thread.join()
+    waiter.join()
+
+    # The waiter loaded with its own loader instead of inheriting the failure
+    assert [type(e) for e in errors] == [RuntimeError, dict]
+
+def test_invalidation_during_load_is_not_stored():
+    cache = _cache()
+
+    def load():
+        cache.invalidate(1)
+        return {"id": 1, "name": "before the update"}
+
+    assert cache.get_or_load(1, load) == {"id": 1, "name": "before the update"}
+    assert cache.get_or_load(1, lambda: {"id": 1, "name": "after"}) == {"id": 1, "name": "after"}
+
+def test_none_is_not_cached():
+    cache = _cache()
+    assert cache.get_or_load(1, lambda: None) is None
+    assert cache.get_or_load(1, lambda: {"id": 1}) == {"id": 1}
+
+def test_local_entries_are_bounded():
+    cache = _cache(max_entries=2)
+    for entity_id in range(3):
+        cache.put(entity_id, {"id": entity_id})
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_load(0, lambda: {"id": 0, "reloaded": True}) == {"id": 0, "reloaded": True}
+
+def test_other_workers_read_through_the_shared_backend():
+    backend = LocalBackend()
+    writer = _cache(backend=backend)
+    reader = _cache(backend=backend)
+    writer.put(1, {"id": 1})
+
+    assert reader.get_or_load(1, lambda: pytest.fail("loaded")) == {"id": 1}
+    assert reader.stats()["shared_hits"] == 1
+
+def test_snapshot_version_is_part_of_the_key():
+    backend = LocalBackend()
+    EntityCache("test", version=1, backend=backend).put(1, {"id": 1, "old": True})
+    current = EntityCache("test", version=2, backend=backend)
+
+    assert current.get_or_load(1, lambda: {"id": 1}) == {"id": 1}
+
+def test_shared_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SharedBackend()
+
+def test_count_is_reused_until_invalidated():
+    counts = CountCache(ttl=60)
+    calls = []
+    counter = lambda: calls.append(1) or 10
+
+    assert counts.get_or_count(("books", None), counter) == 10
+    assert counts.get_or_count(("books", None), counter) == 10
+    assert calls == [1]
+
+    counts.invalidate("books")
+    assert counts.get_or_count(("books", None), lambda: 11) == 11
+
+def test_invalidation_only_drops_its_group():
+    counts = CountCache(ttl=60)
+    counts.get_or_count(("books", None), lambda: 10)
+    counts.get_or_count(("users",), lambda: 5)
+
+    counts.invalidate("books")
+    assert counts.get_or_count(("users",), lambda: pytest.fail("recounted")) == 5
+
+def test_count_expires_after_ttl():
+    counts = CountCache(ttl=0.01)
+    counts.get_or_count(("users",), lambda: 5)
+    time.sleep(0.02)
+    assert counts.get_or_count(("users",), lambda: 6) == 6
+
+def test_concurrent_counts_share_one_query():
+    counts = CountCache(ttl=60)
+    calls = []
+
+    def count():
+        calls.append(1)
+        time.sleep(0.1)
+        return 10
+
+    assert _run_concurrently(5, lambda: counts.get_or_count(("loans", "active"), count)) == [10] * 5
+    assert calls == [1]
+    assert counts.stats()["coalesced"] == 4
+
+def test_count_started_before_an_invalidation_is_not_stored():
+    counts = CountCache(ttl=60)
+
+    def count():
+        counts.invalidate("loans")
+        return 10
+
+    assert counts.get_or_count(("loans", "active"), count) == 10
+    assert counts.get_or_count(("loans", "active"), lambda: 11) == 11
+
+def test_zero_ttl_always_counts():
+    counts = CountCache(ttl=0)
+    counts.get_or_count(("users",), lambda: 5)
+    assert counts.get_or_count(("users",), lambda: 6) == 6
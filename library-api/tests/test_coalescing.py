@@ -0,0 +1,141 @@
+import asyncio
+from app.middleware.coalescing import CoalescingMiddleware, RequestCoalescer
+
+class Endpoint:
+    """ASGI app that counts its runs and answers with the run number after delay seconds."""
+
+    def __init__(self, delay: float = 0.05, fail: bool = False, first_status: int = 200):
+        self.delay = delay
+        self.fail = fail
+        self.first_status = first_status
+        self.runs = 0
+
+    async def __call__(self, scope, receive, send):
+        self.runs += 1
+        run = self.runs
+        await asyncio.sleep(self.delay)
+        if self.fail and run == 1:
+            raise RuntimeError("endpoint failed")
+        status = self.first_status if run == 1 else 200
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": str(run).encode()})
+
+def _scope(path: str = "/api/v1/books", method: str = "GET", query: bytes = b"", authorization: bytes = b"") -> dict:
+    headers = [(b"authorization", authorization)] if authorization else []
+    return {"type": "http", "method": method, "path": path, "query_string": query, "headers": headers}
+
+async def _request(middleware, scope: dict, delay: float = 0.0) -> bytes:
+    await asyncio.sleep(delay)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    return b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+
+def _middleware(endpoint, max_body_bytes: int = 1024):
+    coalescer = RequestCoalescer(max_body_bytes=max_body_bytes)
+    return CoalescingMiddleware(endpoint, coalescer), coalescer
+
+async def _gather(*requests):
+    return await asyncio.gather(*requests)
+
+def test_identical_gets_share_one_run():
+    endpoint = Endpoint()
+    middleware, coalescer = _middleware(endpoint)
+
+    bodies = asyncio.run(_gather(*(_request(middleware, _scope(), delay=0.01 * i) for i in range(4))))
+
+    assert bodies == [b"1"] * 4
+    assert endpoint.runs == 1
+    stats = coalescer.stats()
+    assert (stats["requests"], stats["executions"], stats["coalesced"], stats["in_flight"]) == (4, 1, 3, 0)
+
+def test_different_queries_and_credentials_run_separately():
+    endpoint = Endpoint()
+    middleware, _ = _middleware(endpoint)
+
+    asyncio.run(_gather(
+        _request(middleware, _scope()),
+        _request(middleware, _scope(query=b"page=2")),
+        _request(middleware, _scope(authorization=b"Bearer a")),
+        _request(middleware, _scope(authorization=b"Bearer b")),
+    ))
+    assert endpoint.runs == 4
+
+def test_get_after_a_write_does_not_join_an_earlier_flight():
+    reads = Endpoint(delay=0.2)
+
+    async def app(scope, receive, send):
+        if scope["method"] == "GET":
+            return await reads(scope, receive, send)
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware, _ = _middleware(app)
+
+    async def write_then_read():
+        await _request(middleware, _scope(method="POST"), delay=0.02)
+        return await _request(middleware, _scope())
+
+    # The first GET is still running when the write completes
+    first, after_write = asyncio.run(_gather(_request(middleware, _scope()), write_then_read()))
+    assert (first, after_write) == (b"1", b"2")
+
+def test_paths_outside_the_prefix_are_not_coalesced():
+    endpoint = Endpoint()
+    middleware, coalescer = _middleware(endpoint)
+
+    asyncio.run(_gather(_request(middleware, _scope(path="/health")), _request(middleware, _scope(path="/health"))))
+    assert endpoint.runs == 2
+    assert coalescer.stats()["requests"] == 0
+
+def test_oversized_response_is_not_shared():
+    endpoint = Endpoint()
+    middleware, coalescer = _middleware(endpoint, max_body_bytes=0)
+
+    bodies = asyncio.run(_gather(_request(middleware, _scope()), _request(middleware, _scope(), delay=0.01)))
+
+    assert bodies == [b"1", b"2"]
+    assert coalescer.stats()["unshareable"] == 1
+
+def test_followers_run_themselves_when_the_leader_fails():
+    endpoint = Endpoint(fail=True)
+    middleware, _ = _middleware(endpoint)
+
+    async def leader():
+        try:
+            return await _request(middleware, _scope())
+        except RuntimeError:
+            return None
+
+    bodies = asyncio.run(_gather(leader(), _request(middleware, _scope(), delay=0.01)))
+    assert bodies == [None, b"2"]
+
+def test_followers_run_themselves_when_the_leader_returns_a_server_error():
+    endpoint = Endpoint(first_status=500)
+    middleware, coalescer = _middleware(endpoint)
+
+    bodies = asyncio.run(_gather(_request(middleware, _scope()), _request(middleware, _scope(), delay=0.01)))
+
+    assert bodies == [b"1", b"2"]
+    assert endpoint.runs == 2
+    assert coalescer.stats()["unshareable"] == 1
+
+def test_event_streams_go_to_each_request():
+    runs = 0
+
+    async def stream(scope, receive, send):
+        nonlocal runs
+        runs += 1
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.body", "body": b"data: 1\n\n", "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware, _ = _middleware(stream)
+    bodies = asyncio.run(_gather(_request(middleware, _scope(path="/api/v1/events")), _request(middleware, _scope(path="/api/v1/events"), delay=0.01)))
+
+    assert bodies == [b"data: 1\n\n"] * 2
+    assert runs == 2
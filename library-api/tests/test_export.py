@@ -0,0 +1,33 @@
+import csv
+import io
+import json
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from app.services.export_service import EXPORT_FIELDS, serialize_rows
+
+LoanRow = namedtuple("LoanRow", "id book_id copy_id user_id loan_date due_date return_date fine_amount status")
+
+LOANS = [
+    LoanRow(1, 10, 100, 7, datetime(2026, 10, 1, 9, 30), datetime(2026, 10, 15, 9, 30), None, Decimal("0.00"), "active"),
+    # Loans archived before copies existed have no copy
+    LoanRow(2, 11, None, 7, datetime(2025, 9, 1), datetime(2025, 9, 15), datetime(2025, 9, 20), Decimal("10.10"), "returned"),
+]
+
+def test_loans_csv_has_the_copy_column():
+    rows = list(csv.reader(io.StringIO("".join(serialize_rows(LOANS, EXPORT_FIELDS["loans"], "csv")))))
+
+    assert rows[0] == ["id", "book_id", "copy_id", "user_id", "loan_date", "due_date", "return_date", "fine_amount", "status"]
+    assert [row[2] for row in rows[1:]] == ["100", ""]
+
+def test_loans_ndjson_carries_the_copy_and_money_as_numbers():
+    lines = [json.loads(line) for line in "".join(serialize_rows(LOANS, EXPORT_FIELDS["loans"], "ndjson")).splitlines()]
+
+    assert [line["copy_id"] for line in lines] == [100, None]
+    assert lines[1]["fine_amount"] == 10.1
+    assert lines[0]["loan_date"] == "2026-10-01T09:30:00"
+
+def test_rows_are_flushed_in_chunks():
+    chunks = list(serialize_rows(LOANS, EXPORT_FIELDS["loans"], "ndjson", chunk_rows=1))
+
+    assert len(chunks) == 2
@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from app.fines import FinePolicy, FineRate
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+def _due(days_ago: float) -> datetime:
+    return NOW - timedelta(days=days_ago)
+
+def test_whole_days_after_grace_are_charged():
+    policy = FinePolicy(Decimal("2.00"), grace_days=2)
+
+    assert policy.fine(_due(-1), NOW) == Decimal("0.00")
+    assert policy.fine(_due(2.9), NOW) == Decimal("0.00")
+    assert policy.fine(_due(5.5), NOW) == Decimal("6.00")
+
+def test_tiers_override_rate_and_cap():
+    policy = FinePolicy(Decimal("2.00"), max_fine=Decimal("15.00"), tiers={"student": FineRate(Decimal("1.00"), Decimal("5.00"))})
+
+    assert policy.fine(_due(10), NOW, "student") == Decimal("5.00")
+    assert policy.fine(_due(10), NOW, "standard") == Decimal("15.00")
+    assert policy.fine(_due(10), NOW, None) == Decimal("15.00")
+
+def test_tier_without_cap_keeps_the_default_cap():
+    policy = FinePolicy(Decimal("2.00"), max_fine=Decimal("15.00"), tiers={"staff": FineRate(Decimal("3.00"))})
+
+    assert policy.rate_for("staff") == FineRate(Decimal("3.00"), Decimal("15.00"))
+    assert policy.fine(_due(10), NOW, "staff") == Decimal("15.00")
+
+@pytest.mark.parametrize("tiers", ["student:-1.00", "student:1.00:-5", "student:1.00:5,staff:-0.01"])
+def test_negative_tier_rates_and_caps_are_rejected(tiers):
+    with pytest.raises(ValueError):
+        FinePolicy.from_env(daily_rate="2.00", grace_days=0, max_fine="", tiers=tiers)
+
+@pytest.mark.parametrize("daily_rate, grace_days, max_fine", [("-2.00", 0, ""), ("2.00", -1, ""), ("2.00", 0, "-1")])
+def test_negative_defaults_are_rejected(daily_rate, grace_days, max_fine):
+    with pytest.raises(ValueError):
+        FinePolicy.from_env(daily_rate=daily_rate, grace_days=grace_days, max_fine=max_fine, tiers="")
+
+def test_tiers_parse_from_env():
+    policy = FinePolicy.from_env(daily_rate="2", grace_days=1, max_fine="20", tiers="student:1.005:10, staff:0")
+
+    assert policy.default_rate == FineRate(Decimal("2.00"), Decimal("20.00"))
+    assert policy.tiers == {"student": FineRate(Decimal("1.01"), Decimal("10.00")), "staff": FineRate(Decimal("0.00"), Decimal("20.00"))}
+
+def test_malformed_tier_is_rejected():
+    with pytest.raises(ValueError):
+        FinePolicy.from_env(daily_rate="2.00", grace_days=0, max_fine="", tiers="student")
+
+@pytest.fixture
+def db():
+    import app.cli  # noqa: F401 (registers every mapper)
+    from app.database.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        session.connection()
+    except OperationalError:
+        session.close()
+        pytest.skip("database unavailable")
+    yield session
+    session.rollback()
+    session.close()
+
+@pytest.mark.parametrize("policy", [
+    FinePolicy(Decimal("2.00")),
+    FinePolicy(Decimal("2.00"), grace_days=3, max_fine=Decimal("15.00")),
+    # Tier without its own cap: the default cap applies in both
+    FinePolicy(Decimal("2.00"), max_fine=Decimal("15.00"), tiers={"standard": FineRate(Decimal("0.75"))}),
+    FinePolicy(Decimal("2.00"), max_fine=Decimal("15.00"), tiers={"standard": FineRate(Decimal("0.75"), Decimal("40.00")), "student": FineRate(Decimal("0"))}),
+])
+def test_project_fines_matches_policy(db, policy):
+    from app.models.loan import Loan
+    from app.models.user import User
+    from app.repositories.loan_repository import LoanRepository
+
+    active = db.execute(
+        select(Loan.due_date, User.fine_tier).join(User, User.id == Loan.user_id).where(Loan.status == "active")
+    ).all()
+    if not active:
+        pytest.skip("no active loans to price")
+    # Far enough ahead that every active loan is overdue and long ones reach their cap
+    now = max(due_date for due_date, _ in active) + timedelta(days=30, hours=5)
+
+    expected = defaultdict(lambda: [0, Decimal("0.00")])
+    for due_date, tier in active:
+        if policy.days_charged(due_date, now) > 0:
+            expected[tier][0] += 1
+            expected[tier][1] += policy.fine(due_date, now, tier)
+
+    projected = {row.tier: [row.loans, row.total] for row in LoanRepository(db).project_fines(policy, now)}
+    assert projected == dict(expected)
@@ -0,0 +1,161 @@
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from app.idempotency import IdempotencyStore
+
+class Created(BaseModel):
+    id: int
+
+class FakeRepository:
+    """IdempotencyRepository over a dict: what other workers committed, as the database would hold it."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.released = 0
+
+    def claim(self, scope, principal, key, fingerprint, expires_at):
+        row = self.rows.get((scope, principal, key))
+        if row is None:
+            self.rows[(scope, principal, key)] = SimpleNamespace(fingerprint=fingerprint, status_code=None, body=None)
+            return None
+        return row
+
+    def complete(self, scope, principal, key, status_code, body):
+        row = self.rows[(scope, principal, key)]
+        row.status_code, row.body = status_code, body
+
+    def remember(self, scope, principal, key, fingerprint, expires_at, status_code, body):
+        self.rows[(scope, principal, key)] = SimpleNamespace(fingerprint=fingerprint, status_code=status_code, body=body)
+
+    def release(self):
+        self.released += 1
+
+def _fingerprint(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+def test_retry_replays_without_running_again():
+    store = IdempotencyStore()
+    calls = []
+    handler = lambda: calls.append(1) or Created(id=len(calls))
+
+    first = store.execute("loans", "", "k", b"{}", handler)
+    second = store.execute("loans", "", "k", b"{}", handler)
+
+    assert calls == [1]
+    assert (first.replayed, second.replayed) == (False, True)
+    assert second.body == first.body == b'{"id":1}'
+
+def test_keys_are_scoped_by_principal():
+    store = IdempotencyStore()
+    first = store.execute("loans", "1", "k", b"{}", lambda: Created(id=1))
+    second = store.execute("loans", "2", "k", b"{}", lambda: Created(id=2))
+
+    assert not second.replayed
+    assert (first.body, second.body) == (b'{"id":1}', b'{"id":2}')
+
+def test_different_payload_is_rejected():
+    store = IdempotencyStore()
+    store.execute("users", "", "k", b"a", lambda: Created(id=1))
+
+    with pytest.raises(HTTPException) as raised:
+        store.execute("users", "", "k", b"b", lambda: Created(id=2))
+    assert raised.value.status_code == 422
+
+def test_client_errors_are_remembered_and_server_errors_released():
+    store = IdempotencyStore()
+
+    def bad_request():
+        raise HTTPException(status_code=400, detail="Book is not available")
+
+    with pytest.raises(HTTPException):
+        store.execute("loans", "", "client", b"{}", bad_request)
+    replay = store.execute("loans", "", "client", b"{}", lambda: Created(id=1))
+    assert (replay.status_code, replay.body, replay.replayed) == (400, b'{"detail":"Book is not available"}', True)
+
+    def broken():
+        raise HTTPException(status_code=500, detail="Database error occurred")
+
+    with pytest.raises(HTTPException):
+        store.execute("loans", "", "server", b"{}", broken)
+    retry = store.execute("loans", "", "server", b"{}", lambda: Created(id=2))
+    assert (retry.status_code, retry.replayed) == (200, False)
+
+def test_concurrent_duplicates_run_the_handler_once():
+    store = IdempotencyStore()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return Created(id=1)
+
+    outcomes = []
+    threads = [threading.Thread(target=lambda: outcomes.append(store.execute("loans", "", "k", b"{}", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert sorted(outcome.replayed for outcome in outcomes) == [False, True, True, True, True]
+
+def test_max_entries_holds_despite_a_running_entry_at_the_front():
+    store = IdempotencyStore(max_entries=3)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return Created(id=0)
+
+    running = threading.Thread(target=lambda: store.execute("loans", "", "running", b"{}", blocking))
+    running.start()
+    started.wait(5)
+    for i in range(10):
+        store.execute("loans", "", f"k{i}", b"{}", lambda: Created(id=1))
+        assert len(store._entries) <= 3
+    release.set()
+    running.join(5)
+
+def test_outcome_stored_by_another_worker_is_replayed():
+    repository = FakeRepository({("loans", "", "k"): SimpleNamespace(fingerprint=_fingerprint(b"{}"), status_code=200, body=b'{"id":7}')})
+    store = IdempotencyStore()
+
+    outcome = store.execute("loans", "", "k", b"{}", lambda: pytest.fail("handler must not run"), repository)
+
+    assert (outcome.status_code, outcome.body, outcome.replayed) == (200, b'{"id":7}', True)
+
+def test_outcome_is_stored_in_the_repository():
+    repository = FakeRepository()
+    store = IdempotencyStore()
+
+    store.execute("loans", "3", "k", b"{}", lambda: Created(id=9), repository)
+
+    assert repository.rows[("loans", "3", "k")].body == b'{"id":9}'
+    # A fresh worker, with nothing in memory, replays it from the repository
+    outcome = IdempotencyStore().execute("loans", "3", "k", b"{}", lambda: pytest.fail("handler must not run"), repository)
+    assert outcome.replayed
+
+def test_pending_key_on_another_worker_times_out_with_409():
+    repository = FakeRepository()
+    repository.claim("loans", "", "k", _fingerprint(b"{}"), None)
+    store = IdempotencyStore(wait_timeout=0.1, poll_interval=0.01)
+
+    with pytest.raises(HTTPException) as raised:
+        store.execute("loans", "", "k", b"{}", lambda: pytest.fail("handler must not run"), repository)
+    assert raised.value.status_code == 409
+
+def test_key_stored_with_another_payload_is_rejected():
+    repository = FakeRepository()
+    repository.claim("loans", "", "k", _fingerprint(b"a"), None)
+
+    with pytest.raises(HTTPException) as raised:
+        IdempotencyStore().execute("loans", "", "k", b"b", lambda: pytest.fail("handler must not run"), repository)
+    assert raised.value.status_code == 422
@@ -0,0 +1,27 @@
+import json
+import queue
+import pytest
+from app.outbox import FileSink, OutboxSink, QueueSink, create_sink
+
+def test_sink_is_abstract():
+    with pytest.raises(TypeError):
+        OutboxSink()
+
+def test_file_sink_appends_one_document_per_line(tmp_path):
+    path = tmp_path / "outbox" / "events.ndjson"
+    sink = create_sink(f"file:{path}")
+    assert isinstance(sink, FileSink)
+    sink.publish([{"id": 1}, {"id": 2}])
+    sink.publish([{"id": 3}])
+    sink.close()
+
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+def test_full_queue_fails_the_batch():
+    sink = QueueSink(maxsize=1, timeout=0.01)
+    with pytest.raises(queue.Full):
+        sink.publish([{"id": 1}, {"id": 2}])
+
+def test_unknown_sink_is_rejected():
+    with pytest.raises(ValueError):
+        create_sink("kafka://broker")
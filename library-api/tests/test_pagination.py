@@ -0,0 +1,52 @@
+import json
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from pydantic import ValidationError
+from app.schemas.loan import Loan
+from app.schemas.pagination import PaginatedResponse, page_adapter, page_json, page_response
+from app.schemas.user import UserListItem, UserResponse
+
+LoanRow = namedtuple("LoanRow", "id book_id copy_id user_id loan_date due_date return_date fine_amount status")
+
+LOANS = [
+    LoanRow(1, 10, 100, 7, datetime(2026, 10, 1, 9, 30), datetime(2026, 10, 15, 9, 30), None, Decimal("0.00"), "active"),
+    LoanRow(2, 11, 101, 7, datetime(2026, 9, 1), datetime(2026, 9, 15), datetime(2026, 9, 20), Decimal("10.10"), "returned"),
+]
+
+def test_rows_serialize_like_the_response_model():
+    expected = PaginatedResponse[Loan](items=[row._asdict() for row in LOANS], total=12, page=2, size=2, pages=6).model_dump_json()
+
+    assert json.loads(page_json(Loan, LOANS, 12, 2, 2, 6)) == json.loads(expected)
+
+def test_fines_stay_json_numbers():
+    page = json.loads(page_json(Loan, LOANS, 2, 1, 10, 1))
+    assert [item["fine_amount"] for item in page["items"]] == [0.0, 10.1]
+
+def test_dicts_and_rows_give_the_same_page():
+    assert page_json(Loan, [row._asdict() for row in LOANS], 2, 1, 10, 1) == page_json(Loan, LOANS, 2, 1, 10, 1)
+
+def test_list_item_matches_the_documented_response():
+    User = namedtuple("User", "id name email")
+    rows = [User(1, "Ana", "ana@example.com")]
+    listed = json.loads(page_json(UserListItem, rows, 1, 1, 10, 1))
+    documented = json.loads(PaginatedResponse[UserResponse](items=[rows[0]._asdict()], total=1, page=1, size=10, pages=1).model_dump_json())
+
+    assert listed == documented
+
+def test_empty_page():
+    assert json.loads(page_json(Loan, [], 0, 1, 10, 0)) == {"items": [], "total": 0, "page": 1, "size": 10, "pages": 0}
+
+def test_rows_are_still_validated():
+    with pytest.raises(ValidationError):
+        page_json(Loan, [LOANS[0]._replace(loan_date="not a date")], 1, 1, 10, 1)
+
+def test_adapter_is_built_once_per_item_type():
+    assert page_adapter(Loan) is page_adapter(Loan)
+
+def test_page_response_is_sent_as_json():
+    response = page_response(Loan, LOANS, 2, 1, 10, 1)
+
+    assert response.media_type == "application/json"
+    assert response.body == page_json(Loan, LOANS, 2, 1, 10, 1)
@@ -0,0 +1,32 @@
+import pytest
+from structlog.testing import capture_logs
+from app.database.session import LISTENER_CONNECTIONS, pool_limits
+
+@pytest.mark.parametrize("budget, workers", [(30, 1), (30, 4), (30, 7), (100, 16)])
+def test_workers_stay_within_the_budget(monkeypatch, budget, workers):
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", str(budget))
+    monkeypatch.setenv("WEB_CONCURRENCY", str(workers))
+
+    with capture_logs() as logs:
+        pool_size, max_overflow = pool_limits()
+
+    assert logs == []
+    assert workers * (pool_size + max_overflow + LISTENER_CONNECTIONS) <= budget
+
+def test_defaults_leave_the_listener_its_connection(monkeypatch):
+    monkeypatch.delenv("DB_MAX_CONNECTIONS", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+
+    assert pool_limits() == (9, 20)
+
+def test_too_small_a_budget_is_reported(monkeypatch):
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "30")
+    monkeypatch.setenv("WEB_CONCURRENCY", "16")
+
+    with capture_logs() as logs:
+        pool_size, max_overflow = pool_limits()
+
+    # Requests still get two connections next to the probe's
+    assert pool_size + max_overflow == 3
+    assert [log["log_level"] for log in logs] == ["warning"]
+    assert logs[0]["required"] == 64